@@ -4,19 +4,27 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 import pandas as pd
-import joblib
 import json
 from datetime import datetime
 from typing import Dict, Any
 import logging
-import markdown2
 import os
 
+from src.api.cache import ResponseCache, file_version
+from src.api.documents import DocumentCache
+from src.api.responses import format_menu_predictions
+from src.api.streaming import ndjson_response, open_csv_stream
+from src.data.flight_archive import open_flights
+from src.data_processing.day_plan import DayPlanStore
+from src.data_processing.fleet_registry import FleetRegistry
+from src.models.artifacts import load_artifact
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Southwest Airlines Beverage Predictor")
+# Swagger UI lives at /api-docs so /docs serves the project documentation
+app = FastAPI(title="Southwest Airlines Beverage Predictor", docs_url="/api-docs")
 
 # Mount templates directory
 templates = Jinja2Templates(directory="templates")
@@ -28,159 +36,185 @@ app.mount("/data", StaticFiles(directory="data"), name="data")
 model_path = Path("models/beverage_predictor.joblib")
 predictor = None
 
+# Columns required in /predict uploads
+PREDICT_REQUIRED_COLUMNS = [
+    "flight_number", "date", "departure_time",
+    "origin_airport", "destination_airport", "passenger_count"
+]
+
+# Memory-mapped flight archive (or the indexed flight files until one is built),
+# opened once per process and shared between workers through the page cache
+flight_store = open_flights("data/historical")
+
+# ICAO24 -> aircraft type -> seat capacity, for passenger estimates
+fleet_registry = FleetRegistry.load_or_default("data/fleet_registry.npz")
+
+# Markdown documents rendered into their pages once per file version
+document_cache = DocumentCache(templates)
+HOME_PAGE = {
+    "template": "index.html",
+    "path": Path("docs/research_paper.md"),
+    "content_key": "research_content",
+    "extras": ['fenced-code-blocks', 'tables']
+}
+
+# Documents served by /docs
+DOC_PATHS = {
+    "research_paper": os.path.join("docs", "research_paper.md"),
+    "data_format": os.path.join("docs", "data_format.md"),
+    "testing": os.path.join("docs", "testing.md")
+}
+
+def docs_page_spec(doc: str) -> Dict[str, Any]:
+    """Document cache arguments for a /docs page."""
+    return {
+        "template": "docs.html",
+        "path": DOC_PATHS[doc],
+        "content_key": "doc_content",
+        "context": {"current_doc": doc}
+    }
+
+# Precomputed per-flight beverage plans, written by `python -m src.data_processing.day_plan`
+day_plans = DayPlanStore("data/plans")
+
+# Predictions page contexts keyed by the requested (date, flight), and model
+# output keyed by the selected (date, flight number); both are dropped when
+# the flight data or model file changes
+page_cache = ResponseCache(max_entries=256, ttl=300)
+prediction_cache = ResponseCache(max_entries=1024, ttl=300)
+
 @app.on_event("startup")
 async def startup_event():
     global predictor
+    document_cache.prerender([HOME_PAGE] + [docs_page_spec(doc) for doc in DOC_PATHS])
     try:
-        predictor = joblib.load(model_path)
-        logger.info("Model loaded successfully")
+        # The menu predictor holds no arrays, so there is nothing to memory-map
+        predictor, model_load_stats = load_artifact(model_path, mmap_mode=None)
+        logger.info(
+            f"Model loaded successfully in {model_load_stats['seconds']:.2f}s "
+            f"({model_load_stats['rss_bytes'] / 1e6:.1f} MB resident)"
+        )
     except Exception as e:
         logger.error(f"Error loading model: {e}")
         raise HTTPException(status_code=500, detail="Error loading model")
 
 @app.get("/", response_class=HTMLResponse)
 async def home_page(request: Request):
-    # Read and convert markdown to HTML
-    research_paper_path = Path("docs/research_paper.md")
-    with open(research_paper_path) as f:
-        content = f.read()
-        html_content = markdown2.markdown(content, extras=['fenced-code-blocks', 'tables'])
-    
-    return templates.TemplateResponse("index.html", {
-        "request": request,
-        "research_content": html_content
-    })
+    # Serve the cached research paper page, revalidated by ETag
+    page = document_cache.page(**HOME_PAGE)
+    return document_cache.response(request, page)
 
 @app.get("/upload", response_class=HTMLResponse)
 async def upload_page(request: Request):
     return templates.TemplateResponse("upload.html", {"request": request})
 
-@app.get("/predictions", response_class=HTMLResponse)
-async def predictions_page(request: Request, flight: str = None, date: str = None):
-    try:
-        # Load all flight data from historical directory
-        flights = []
-        historical_dir = Path("data/historical")
-        
-        # If no date is provided, use the most recent date from our data
-        all_dates = set()
-        for file_path in historical_dir.glob("*_flights.json"):
-            if "_progress" not in str(file_path):
-                try:
-                    with open(file_path, "r") as f:
-                        airport_flights = json.load(f)
-                        if isinstance(airport_flights, list):
-                            for f in airport_flights:
-                                if isinstance(f, dict) and f.get("firstSeen"):
-                                    flight_date = datetime.fromtimestamp(f["firstSeen"]).strftime('%Y-%m-%d')
-                                    all_dates.add(flight_date)
-                except Exception as e:
-                    logger.warning(f"Error reading dates from {file_path}: {e}")
-                    continue
+def data_version() -> tuple:
+    """Version of the data behind the cached pages: flight data, plans, model file and loaded model."""
+    flight_store.refresh()
+    return (flight_store.version, day_plans.version, file_version(model_path), id(predictor))
+
+def build_predictions_context(flight: str = None, date: str = None) -> Dict[str, Any]:
+    """Build the predictions page context for a date and flight."""
+    # Look up available dates from the flight archive
+    sorted_dates = flight_store.available_dates()
+    
+    if not sorted_dates:
+        logger.warning("No valid dates found in historical data")
+        return {"error": "No flight data available"}
         
-        if not all_dates:
-            logger.warning("No valid dates found in historical data")
-            return templates.TemplateResponse("predictions.html", {
-                "request": request,
-                "error": "No flight data available"
-            })
-            
-        # Sort dates and get the most recent one
-        sorted_dates = sorted(all_dates, reverse=True)
-        most_recent_date = sorted_dates[0] if sorted_dates else None
+    # Dates are sorted most recent first
+    most_recent_date = sorted_dates[0]
+    
+    # Use provided date if valid, otherwise use most recent
+    if date and date in sorted_dates:
+        selected_date = date
+    else:
+        selected_date = most_recent_date
         
-        # Use provided date if valid, otherwise use most recent
-        if date and date in all_dates:
-            selected_date = date
-        else:
-            selected_date = most_recent_date
-            
-        # Now load flights for the selected date
-        for file_path in historical_dir.glob("*_flights.json"):
-            if "_progress" not in str(file_path):
-                try:
-                    with open(file_path, "r") as f:
-                        airport_flights = json.load(f)
-                        if isinstance(airport_flights, list):
-                            for f in airport_flights:
-                                if isinstance(f, dict) and f.get("callsign", "").startswith("SWA"):
-                                    if f.get("estDepartureAirport") and f.get("estArrivalAirport"):
-                                        flight_date = datetime.fromtimestamp(f["firstSeen"]).strftime('%Y-%m-%d')
-                                        if flight_date == selected_date:
-                                            flight_info = {
-                                                'flight_number': f["callsign"].replace("SWA", "WN"),
-                                                'origin_airport': f["estDepartureAirport"],
-                                                'destination_airport': f["estArrivalAirport"],
-                                                'date': flight_date,
-                                                'departure_time': datetime.fromtimestamp(f["firstSeen"]).strftime('%H:%M'),
-                                                'passenger_count': 150  # Estimated based on typical 737 load factor
-                                            }
-                                            flights.append(flight_info)
-                except Exception as e:
-                    logger.warning(f"Error processing file {file_path}: {e}")
-                    continue
+    # Now load flights for the selected date (already sorted by departure time)
+    flights = flight_store.flights_on(selected_date)
+    passenger_counts = fleet_registry.estimate_passengers([f['icao24'] for f in flights])
+    for flight_info, passenger_count in zip(flights, passenger_counts.tolist()):
+        flight_info['passenger_count'] = passenger_count  # Seat capacity at a typical load factor
 
-        if not flights:
-            logger.warning(f"No flights found for date {selected_date}")
-            return templates.TemplateResponse("predictions.html", {
-                "request": request,
-                "error": f"No flights found for date {selected_date}",
-                "available_dates": sorted_dates,
-                "selected_date": selected_date
-            })
+    if not flights:
+        logger.warning(f"No flights found for date {selected_date}")
+        return {
+            "error": f"No flights found for date {selected_date}",
+            "available_dates": sorted_dates,
+            "selected_date": selected_date
+        }
 
-        # Sort flights by departure time
-        flights.sort(key=lambda x: x['departure_time'])
+    # Initialize variables
+    selected_flight = None
+    predictions = None
+    total_beverages = 0
+    beverages_per_passenger = 0
+    flight_duration = "0h 0m"
+    
+    # If a specific flight is selected or use the first flight
+    if flight:
+        selected_flight = next((f for f in flights if f['flight_number'] == flight), None)
+    
+    if not selected_flight and flights:
+        selected_flight = flights[0]
         
-        # Initialize variables
-        selected_flight = None
-        predictions = None
+    # Read the selected flight's predictions from the day plan, falling back to the model
+    raw_predictions = None
+    if selected_flight:
+        plan = day_plans.read(selected_date)
+        if plan is not None:
+            raw_predictions = plan.flight_predictions(selected_flight['flight_number'], selected_flight['first_seen'])
+    
+    if selected_flight and raw_predictions is None and predictor:
+        raw_predictions = prediction_cache.get_or_compute(
+            (selected_date, selected_flight['flight_number']),
+            lambda: predictor.predict(pd.DataFrame([selected_flight])),
+            version=data_version()
+        )
+    
+    if raw_predictions is not None:
+        predictions = {}
         total_beverages = 0
-        beverages_per_passenger = 0
-        flight_duration = "0h 0m"
-        
-        # If a specific flight is selected or use the first flight
-        if flight:
-            selected_flight = next((f for f in flights if f['flight_number'] == flight), None)
-        
-        if not selected_flight and flights:
-            selected_flight = flights[0]
-            
-        # Get predictions for selected flight
-        if selected_flight and predictor:
-            df = pd.DataFrame([selected_flight])
-            raw_predictions = predictor.predict(df)
-            predictions = {}
-            total_beverages = 0
-            for beverage, quantity in raw_predictions.items():
-                confidence = min(95, max(70, 85 + quantity/10))
-                status = 'optimal' if quantity > 0 else 'critical'
-                trend = 'up' if quantity > 100 else 'down' if quantity < 50 else 'stable'
-                trend_color = 'success' if trend == 'up' else 'danger' if trend == 'down' else 'secondary'
-                
-                predictions[beverage] = {
-                    'quantity': int(quantity),
-                    'confidence': int(confidence),
-                    'status': status,
-                    'trend': trend,
-                    'trend_color': trend_color
-                }
-                total_beverages += quantity
+        for beverage, quantity in raw_predictions.items():
+            confidence = min(95, max(70, 85 + quantity/10))
+            status = 'optimal' if quantity > 0 else 'critical'
+            trend = 'up' if quantity > 100 else 'down' if quantity < 50 else 'stable'
+            trend_color = 'success' if trend == 'up' else 'danger' if trend == 'down' else 'secondary'
             
-            beverages_per_passenger = round(total_beverages / selected_flight['passenger_count'], 1)
-            flight_duration = "2h 15m"  # TODO: Calculate actual flight duration based on route
+            predictions[beverage] = {
+                'quantity': int(quantity),
+                'confidence': int(confidence),
+                'status': status,
+                'trend': trend,
+                'trend_color': trend_color
+            }
+            total_beverages += quantity
         
-        return templates.TemplateResponse("predictions.html", {
-            "request": request,
-            "flights": flights,
-            "selected_flight": selected_flight,
-            "predictions": predictions,
-            "total_beverages": int(total_beverages),
-            "beverages_per_passenger": beverages_per_passenger,
-            "flight_duration": flight_duration,
-            "selected_date": selected_date,
-            "available_dates": sorted_dates
-        })
+        beverages_per_passenger = round(total_beverages / selected_flight['passenger_count'], 1)
+        flight_duration = "2h 15m"  # TODO: Calculate actual flight duration based on route
+    
+    return {
+        "flights": flights,
+        "selected_flight": selected_flight,
+        "predictions": predictions,
+        "total_beverages": int(total_beverages),
+        "beverages_per_passenger": beverages_per_passenger,
+        "flight_duration": flight_duration,
+        "selected_date": selected_date,
+        "available_dates": sorted_dates
+    }
+
+@app.get("/predictions", response_class=HTMLResponse)
+async def predictions_page(request: Request, flight: str = None, date: str = None):
+    try:
+        # Repeated views of the same date and flight reuse the cached context
+        context = page_cache.get_or_compute(
+            (date, flight),
+            lambda: build_predictions_context(flight, date),
+            version=data_version()
+        )
+        return templates.TemplateResponse("predictions.html", {"request": request, **context})
         
     except Exception as e:
         logger.error(f"Error loading flight data: {e}")
@@ -189,6 +223,22 @@ async def predictions_page(request: Request, flight: str = None, date: str = Non
             "error": str(e)
         })
 
+@app.get("/plans/{date}")
+async def day_plan(date: str):
+    """Precomputed beverage plan for a date, with station and hub totals."""
+    plan = day_plans.read(date)
+    if plan is None:
+        raise HTTPException(status_code=404, detail=f"No plan for date {date}")
+    return plan.to_dict()
+
+@app.get("/cache-stats")
+async def cache_stats():
+    """Hit/miss counters of the page and prediction caches."""
+    return {
+        "pages": page_cache.stats(),
+        "predictions": prediction_cache.stats()
+    }
+
 @app.get("/model-info", response_class=HTMLResponse)
 async def model_info_page(request: Request):
     # Get model information
@@ -221,18 +271,26 @@ async def model_info_page(request: Request):
     })
 
 @app.post("/predict")
-async def predict(request: Request, file: UploadFile = File(...)):
+async def predict(request: Request, file: UploadFile = File(...), stream: bool = False):
+    # Stream per-flight NDJSON predictions chunk by chunk for large uploads
+    if stream:
+        try:
+            chunks = await open_csv_stream(file, required_columns=PREDICT_REQUIRED_COLUMNS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return ndjson_response(
+            chunks,
+            lambda chunk: format_menu_predictions(
+                chunk["flight_number"], predictor.predict_batch(chunk)
+            )
+        )
+    
     try:
         # Read and validate CSV
         content = await file.read()
         df = pd.read_csv(pd.io.common.BytesIO(content))
         
-        required_columns = [
-            "flight_number", "date", "departure_time",
-            "origin_airport", "destination_airport", "passenger_count"
-        ]
-        
-        missing_cols = [col for col in required_columns if col not in df.columns]
+        missing_cols = [col for col in PREDICT_REQUIRED_COLUMNS if col not in df.columns]
         if missing_cols:
             raise HTTPException(
                 status_code=400,
@@ -313,33 +371,17 @@ def transform_consumption_data(df: pd.DataFrame) -> pd.DataFrame:
 @app.get("/docs")
 async def docs_page(request: Request, doc: str = None):
     """Render the documentation page with the selected document."""
-    docs_dir = "docs"
     current_doc = doc or "research_paper"  # Default to research paper if no doc specified
     
     try:
-        # Map doc parameter to actual file paths
-        doc_paths = {
-            "research_paper": os.path.join(docs_dir, "research_paper.md"),
-            "data_format": os.path.join(docs_dir, "data_format.md"),
-            "testing": os.path.join(docs_dir, "testing.md")
-        }
-        
-        if current_doc not in doc_paths:
+        if current_doc not in DOC_PATHS:
             raise HTTPException(status_code=404, detail="Document not found")
             
-        # Read and convert the markdown file
-        with open(doc_paths[current_doc], 'r') as f:
-            content = f.read()
-            html_content = markdown2.markdown(content)
-            
-        return templates.TemplateResponse(
-            "docs.html",
-            {
-                "request": request,
-                "doc_content": html_content,
-                "current_doc": current_doc
-            }
-        )
+        # Rendered once per file version and served precompressed
+        page = document_cache.page(**docs_page_spec(current_doc))
+        return document_cache.response(request, page)
+    except HTTPException:
+        raise
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Document not found")
     except Exception as e:
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for the RandomForest feature pipeline.
+
+Compares the compiled FeaturePipeline against the previous pandas implementation
+of ``_prepare_features`` and reports the per-row feature cost.
+
+Usage:
+    python -m benchmarks.feature_pipeline [--rows 1000 100000 1000000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.models.predictor import BeveragePredictor
+
+
+def legacy_prepare_features(flight_data: pd.DataFrame, feature_columns) -> np.ndarray:
+    """Feature preparation as implemented before the compiled pipeline."""
+    df = flight_data.copy()
+    df['flight_datetime'] = pd.to_datetime(df['timestamp'], unit='s')
+    df['is_weekend'] = df['flight_datetime'].dt.dayofweek >= 5
+    df['hour_of_day'] = df['flight_datetime'].dt.hour
+    df['is_summer'] = df['flight_datetime'].dt.month.isin([6, 7, 8])
+    for col in ['is_weekend', 'is_holiday', 'is_summer', 'is_business_route', 'is_vacation_route']:
+        if col in df.columns:
+            df[col] = df[col].astype(int)
+    for col in feature_columns:
+        if col not in df.columns:
+            df[col] = 0
+    return df[feature_columns].values
+
+
+def make_flights(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Generate a random flight schedule."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'flight_number': np.arange(n_rows),
+        'timestamp': rng.integers(1704067200, 1735689600, n_rows),
+        'duration_hours': rng.choice([1.5, 2.5, 3.5, 4.5], n_rows),
+        'passenger_count': rng.integers(100, 180, n_rows),
+        'is_business_route': rng.integers(0, 2, n_rows),
+        'is_vacation_route': rng.integers(0, 2, n_rows)
+    })
+
+
+def best_of(func, repeat: int) -> float:
+    """Return the fastest wall time of several runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    predictor = BeveragePredictor()
+    pipeline = predictor.feature_pipeline
+    columns = predictor.feature_columns
+
+    print(f"{'rows':>10} {'legacy ns/row':>14} {'pipeline ns/row':>16} {'reused ns/row':>14} {'speedup':>8}")
+    for n_rows in args.rows:
+        flights = make_flights(n_rows)
+        buffer = np.empty((n_rows, len(columns)), dtype=np.float32)
+
+        expected = legacy_prepare_features(flights, columns).astype(np.float32)
+        np.testing.assert_array_equal(pipeline.transform(flights), expected)
+
+        legacy = best_of(lambda: legacy_prepare_features(flights, columns), args.repeat)
+        fresh = best_of(lambda: pipeline.transform(flights), args.repeat)
+        reused = best_of(lambda: pipeline.transform(flights, out=buffer), args.repeat)
+
+        print(f"{n_rows:>10} {legacy / n_rows * 1e9:>14.1f} {fresh / n_rows * 1e9:>16.1f} "
+              f"{reused / n_rows * 1e9:>14.1f} {legacy / reused:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark of the BeveragePredictor model engines.
+
+Trains every engine on the same synthetic flights and reports holdout accuracy,
+training time, single-row and batch prediction latency and artifact size, for
+the joblib model and for its compact export (``src.models.compact``, whose
+fit time is the export time).
+
+Usage:
+    python -m benchmarks.model_engines [--rows 50000] [--engines random_forest hist_gradient_boosting]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, r2_score
+
+from benchmarks.feature_pipeline import best_of, make_flights
+from src.models.compact import CompactPredictor
+from src.models.engines import ENGINES
+from src.models.predictor import BeveragePredictor
+
+# Share of passengers ordering from each category, as in the consumption generator
+CATEGORY_SHARES = {'soft_drinks': 0.30, 'hot_beverages': 0.20, 'water_juice': 0.35, 'alcoholic': 0.15}
+
+
+def make_targets(flights: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """Synthetic per-category consumption following the generator's main effects."""
+    rng = np.random.default_rng(seed)
+    duration = flights['duration_hours'].to_numpy()
+    rate = np.select([duration < 2, duration < 4], [0.8, 1.2], 1.5)
+    hour = (flights['timestamp'].to_numpy() % 86400) // 3600
+    is_morning = (hour >= 6) & (hour < 10)
+    drinks = flights['passenger_count'].to_numpy() * rate
+    targets = {}
+    for category, share in CATEGORY_SHARES.items():
+        modifier = np.ones(len(flights))
+        if category == 'hot_beverages':
+            modifier = np.where(is_morning, 1.5, 1.0)
+        elif category == 'alcoholic':
+            modifier = np.where(flights['is_business_route'] == 1, 0.8, 1.0) * np.where(is_morning, 0.5, 1.0)
+        targets[category] = drinks * share * modifier * rng.uniform(0.9, 1.1, len(flights))
+    return pd.DataFrame(targets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000, help="Training rows")
+    parser.add_argument('--test-rows', type=int, default=10_000, help="Holdout rows")
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    train_flights = make_flights(args.rows, seed=0)
+    train_targets = make_targets(train_flights, seed=0)
+    test_flights = make_flights(args.test_rows, seed=1)
+    test_targets = make_targets(test_flights, seed=1).to_numpy()
+    single = test_flights.iloc[:1]
+
+    print(f"{'engine':>32} {'MAE':>7} {'R2':>6} {'fit s':>7} {'1-row ms':>9} "
+          f"{'batch us/row':>13} {'artifact MB':>12}")
+
+    def report(name, model, fit_seconds, save):
+        predictions = model.predict(test_flights)
+        mae = mean_absolute_error(test_targets, predictions)
+        r2 = r2_score(test_targets, predictions)
+        single_row = best_of(lambda: model.predict(single), args.repeat)
+        batch = best_of(lambda: model.predict(test_flights), max(1, args.repeat // 5))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model.joblib')
+            save(path)
+            size = os.path.getsize(path)
+
+        print(f"{name:>32} {mae:>7.2f} {r2:>6.3f} {fit_seconds:>7.2f} {single_row * 1e3:>9.2f} "
+              f"{batch / len(test_flights) * 1e6:>13.2f} {size / 1e6:>12.2f}")
+
+    for engine in args.engines:
+        predictor = BeveragePredictor(engine=engine)
+        start = time.perf_counter()
+        predictor.train(train_flights, train_targets)
+        fit_seconds = time.perf_counter() - start
+        report(engine, predictor, fit_seconds, predictor.save_model)
+
+        start = time.perf_counter()
+        compact = CompactPredictor.from_predictor(predictor)
+        report(f"{engine} (compact)", compact, time.perf_counter() - start, compact.save)
+
+
+if __name__ == '__main__':
+    main()
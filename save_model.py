@@ -1,6 +1,6 @@
-import joblib
+from src.models.artifacts import save_artifact
 from src.models.beverage_predictor import BeveragePredictor
 
 # Create and save a dummy model
 predictor = BeveragePredictor()
-joblib.dump(predictor, 'models/beverage_predictor.joblib') 
\ No newline at end of file
+save_artifact(predictor, 'models/beverage_predictor.joblib') 
\ No newline at end of file
@@ -7,8 +7,10 @@ setup(
     install_requires=[
         "requests>=2.26.0",
         "pandas>=1.3.0",
+        "pyarrow>=14.0.0",
         "numpy>=1.21.0",
-        "scikit-learn>=0.24.2",
+        # src.models.compact reads tree internals (missing_go_to_left, HGB predictors)
+        "scikit-learn>=1.3,<1.10",
         "sqlalchemy>=1.4.23",
         "psycopg2-binary>=2.9.1",
         "python-dotenv>=0.19.0",
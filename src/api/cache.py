@@ -0,0 +1,147 @@
+"""
+In-process response cache for the web pages.
+
+Historical flights and the model only change when the collector writes new data
+or a model is retrained, so page contexts and predictions for the same request
+can be reused. Entries expire after a TTL, the least recently used entry is
+evicted once the cache is full, and the whole cache is dropped when the data
+version (flight index/archive version, model file mtime) changes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+
+def file_version(path: Union[str, Path]) -> Optional[Tuple[int, int]]:
+    """Get a file's (mtime_ns, size) signature, or None if it does not exist."""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ResponseCache:
+    """Thread-safe TTL/LRU cache invalidated by a data version."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached entries
+            ttl: Seconds an entry stays valid
+            clock: Monotonic time source (seconds)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # key -> (expires_at, value), in LRU order
+        self._entries: OrderedDict = OrderedDict()
+        self._version: Any = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: Any):
+        """Drop every entry if the data version changed."""
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: Any = None) -> Tuple[bool, Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+            version: Current data version; entries cached under another version are dropped
+
+        Returns:
+            Tuple of (found, value)
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any, version: Any = None):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache; callers must not mutate it afterwards
+            version: Data version the value was computed from
+        """
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], version: Any = None) -> Any:
+        """
+        Return the cached value for a key, computing and caching it on a miss.
+
+        The computation runs outside the lock, so concurrent misses for the same
+        key may both compute; the last result wins.
+
+        Args:
+            key: Cache key
+            compute: Function producing the value
+            version: Current data version
+
+        Returns:
+            Cached or freshly computed value
+        """
+        found, value = self.get(key, version)
+        if found:
+            return value
+        value = compute()
+        self.set(key, value, version)
+        return value
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl
+            }
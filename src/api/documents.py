@@ -0,0 +1,167 @@
+"""
+Rendered markdown document cache for the landing and documentation pages.
+
+Each page is rendered once per version of its markdown file: the markdown is
+converted, the page template rendered, and the HTML compressed with gzip (and
+brotli when it is installed) up front. Files are re-read only when their
+modification time or size changes, and re-rendered only when their content
+hash changes. Responses carry an ETag, so browsers revalidate with a 304.
+"""
+
+import gzip
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import markdown2
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.templating import Jinja2Templates
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class RenderedPage:
+    """Rendered HTML page with its precompressed bodies and ETag."""
+
+    def __init__(self, html: str, content_hash: str):
+        self.body = html.encode('utf-8')
+        self.content_hash = content_hash
+        # Weak, since the same ETag covers the identity and compressed bodies
+        self.etag = f'W/"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.encoded = {'gzip': gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.encoded['br'] = brotli.compress(self.body)
+
+
+def _accepted_encodings(accept_encoding: str) -> List[str]:
+    """Parse an Accept-Encoding header into the encodings the client accepts."""
+    encodings = []
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q=') and quality[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        if name:
+            encodings.append(name.strip().lower())
+    return encodings
+
+
+class DocumentCache:
+    """Cache of markdown documents rendered into page templates."""
+
+    def __init__(self, templates: Jinja2Templates):
+        """
+        Initialize the cache.
+
+        Args:
+            templates: Templates used to render the pages
+        """
+        self.templates = templates
+        self._lock = threading.Lock()
+        # (template, path, extras) -> (file signature, RenderedPage)
+        self._pages: Dict[Tuple, Tuple[Tuple[int, int], RenderedPage]] = {}
+        self.renders = 0
+
+    def page(
+        self,
+        template: str,
+        path: Union[str, Path],
+        content_key: str,
+        extras: Optional[List[str]] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> RenderedPage:
+        """
+        Get a page with a markdown document rendered into a template.
+
+        Args:
+            template: Template name
+            path: Markdown file path
+            content_key: Template variable that receives the document's HTML
+            extras: markdown2 extras
+            context: Additional template variables; must be the same for every
+                call with the same template and path
+
+        Returns:
+            Rendered page
+
+        Raises:
+            FileNotFoundError: If the markdown file does not exist
+        """
+        path = Path(path)
+        key = (template, str(path), tuple(extras or ()))
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._pages.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        source = path.read_bytes()
+        content_hash = hashlib.sha256(source).hexdigest()
+        if cached is not None and cached[1].content_hash == content_hash:
+            # Touched but unchanged
+            page = cached[1]
+        else:
+            html_content = markdown2.markdown(source.decode('utf-8'), extras=extras or [])
+            html = self.templates.get_template(template).render(
+                **(context or {}), **{content_key: html_content}
+            )
+            page = RenderedPage(html, content_hash)
+            self.renders += 1
+            logger.info(f"Rendered {path} into {template}")
+
+        with self._lock:
+            self._pages[key] = (signature, page)
+        return page
+
+    def prerender(self, pages: List[Dict[str, Any]]):
+        """
+        Render pages ahead of the first request.
+
+        Args:
+            pages: Keyword arguments for ``page``, one dictionary per page
+        """
+        for kwargs in pages:
+            try:
+                self.page(**kwargs)
+            except FileNotFoundError:
+                logger.warning(f"Cannot prerender missing document {kwargs.get('path')}")
+
+    @staticmethod
+    def response(request: Request, page: RenderedPage) -> Response:
+        """
+        Build the response for a page, honouring If-None-Match and Accept-Encoding.
+
+        Args:
+            request: Incoming request
+            page: Rendered page
+
+        Returns:
+            304 if the client's copy is current, otherwise the (compressed) page
+        """
+        headers = {
+            'ETag': page.etag,
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding'
+        }
+        if_none_match = request.headers.get('if-none-match', '')
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        tags = [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+        if page.etag[2:] in tags or '*' in tags:
+            return Response(status_code=304, headers=headers)
+
+        accepted = _accepted_encodings(request.headers.get('accept-encoding', ''))
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in page.encoded:
+                headers['Content-Encoding'] = encoding
+                return Response(page.encoded[encoding], media_type='text/html', headers=headers)
+        return Response(page.body, media_type='text/html', headers=headers)
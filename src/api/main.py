@@ -1,5 +1,4 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query
 import pandas as pd
 import io
 import sys
@@ -10,7 +9,10 @@ import logging
 # Add the src directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from src.models.predictor import BeveragePredictor
+from src.models.compact import load_predictor
+from src.models.predictor import CATEGORY_MODEL_PATH, BeveragePredictor
+from src.api.responses import FastJSONResponse, RESPONSE_FORMATS, format_predictions
+from src.api.streaming import ndjson_response, open_csv_stream
 
 app = FastAPI(
     title="Southwest Airlines Beverage Inventory AI",
@@ -18,11 +20,15 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Initialize the predictor
+# Columns a streamed upload must have: flight numbers for the output and
+# timestamps for the time features of the feature pipeline
+STREAM_REQUIRED_COLUMNS = ["flight_number", "timestamp"]
+
+# Initialize the predictor, preferring the compact export (python -m src.models.compact)
 predictor = None
 try:
-    predictor = BeveragePredictor.load_model('models/beverage_predictor.joblib')
-    logging.info("Loaded existing model")
+    predictor = load_predictor(CATEGORY_MODEL_PATH)
+    logging.info(f"Loaded existing model ({type(predictor).__name__})")
 except:
     predictor = BeveragePredictor()
     logging.info("Initialized new model")
@@ -61,10 +67,33 @@ async def upload_data(file: UploadFile = File(...)):
         raise HTTPException(500, detail=str(e))
 
 @app.post("/predict")
-async def predict(file: UploadFile = File(...)):
+async def predict(
+    file: UploadFile = File(...),
+    response_format: str = Query("records", alias="format"),
+    stream: bool = False
+):
     """Get beverage consumption predictions for uploaded flight data."""
+    # format=records returns one object per flight, format=columnar one list per field
     if not predictor:
         raise HTTPException(500, detail="Model not initialized")
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(400, detail=f"Unsupported format: {response_format}")
+    
+    # Stream NDJSON records chunk by chunk for large uploads
+    if stream:
+        if response_format != "records":
+            raise HTTPException(400, detail="Streaming returns one record per line; use format=records")
+        try:
+            chunks = await open_csv_stream(file, required_columns=STREAM_REQUIRED_COLUMNS)
+        except ValueError as e:
+            raise HTTPException(400, detail=str(e))
+        return ndjson_response(
+            chunks,
+            lambda chunk: format_predictions(
+                chunk["flight_number"].to_numpy(),
+                predictor.predict(chunk)
+            )
+        )
     
     try:
         # Read CSV content
@@ -74,20 +103,14 @@ async def predict(file: UploadFile = File(...)):
         # Make predictions
         predictions = predictor.predict(flight_data)
         
-        # Format response
-        response_data = []
-        for i, row in flight_data.iterrows():
-            response_data.append({
-                "flight_number": row["flight_number"],
-                "predictions": {
-                    "soft_drinks": int(predictions[i][0]),
-                    "hot_beverages": int(predictions[i][1]),
-                    "water_juice": int(predictions[i][2]),
-                    "alcoholic": int(predictions[i][3])
-                }
-            })
+        # Format response straight from the prediction array
+        response_data = format_predictions(
+            flight_data["flight_number"].to_numpy(),
+            predictions,
+            response_format
+        )
         
-        return JSONResponse(content={"predictions": response_data})
+        return FastJSONResponse(content={"predictions": response_data})
         
     except Exception as e:
         raise HTTPException(500, detail=str(e))
@@ -100,7 +123,8 @@ async def model_info():
     
     return {
         "feature_importance": predictor.get_feature_importance(),
-        "features": predictor.feature_columns
+        "features": predictor.feature_columns,
+        "load": getattr(predictor, 'load_stats', None)
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+"""
+Response formatting for the prediction API.
+
+Predictions are turned into JSON payloads column by column straight from the model
+output array, and serialized with orjson when it is installed.
+"""
+
+import json
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Output order of the RandomForest predictor's targets
+PREDICTION_COLUMNS = ['soft_drinks', 'hot_beverages', 'water_juice', 'alcoholic']
+
+# Supported payload shapes for /predict
+RESPONSE_FORMATS = ('records', 'columnar')
+
+
+def _json_default(value: Any) -> Any:
+    """Convert NumPy scalars and arrays for the standard library encoder."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        separators=(',', ':'),
+        default=_json_default
+    ).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with the fast serializer."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def format_predictions(
+    flight_numbers: Sequence,
+    predictions: np.ndarray,
+    response_format: str = 'records'
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Build the /predict payload from the prediction array.
+
+    Args:
+        flight_numbers: Flight number for each prediction row
+        predictions: Array of shape (n_flights, len(PREDICTION_COLUMNS))
+        response_format: ``records`` for one object per flight, or ``columnar``
+            for one list per field
+
+    Returns:
+        List of per-flight records, or a dictionary of columns
+    """
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown response format: {response_format}")
+
+    # Truncate toward zero, matching int() on each value
+    quantities = np.asarray(predictions).astype(np.int64)
+    numbers = np.asarray(flight_numbers).tolist()
+    columns = [quantities[:, j].tolist() for j in range(len(PREDICTION_COLUMNS))]
+
+    if response_format == 'columnar':
+        return {
+            'flight_number': numbers,
+            'predictions': dict(zip(PREDICTION_COLUMNS, columns))
+        }
+
+    return [
+        {'flight_number': number, 'predictions': dict(zip(PREDICTION_COLUMNS, values))}
+        for number, values in zip(numbers, zip(*columns))
+    ]
+
+
+def format_menu_predictions(flight_numbers: Sequence, quantities) -> List[Dict[str, Any]]:
+    """
+    Build per-flight records from menu-level predictions.
+
+    Args:
+        flight_numbers: Flight number for each prediction row
+        quantities: DataFrame from ``BeveragePredictor.predict_batch`` with one
+            column per beverage
+
+    Returns:
+        List of ``{"flight_number", "predictions"}`` records
+    """
+    names = list(quantities.columns)
+    return [
+        {'flight_number': number, 'predictions': dict(zip(names, values))}
+        for number, values in zip(np.asarray(flight_numbers).tolist(), quantities.to_numpy().tolist())
+    ]
@@ -0,0 +1,110 @@
+"""
+Streaming CSV ingestion for large /predict uploads.
+
+Uploaded schedules are read block by block into a temporary file and parsed in
+fixed-size row chunks, each chunk is predicted on its own, and results are streamed back as
+newline-delimited JSON (NDJSON). Peak memory is bounded by the chunk size rather
+than the size of the upload.
+"""
+
+import logging
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+from fastapi import UploadFile
+from fastapi.responses import StreamingResponse
+
+from src.api.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 10_000
+UPLOAD_READ_BYTES = 1024 * 1024
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def open_csv_stream(
+    file: UploadFile,
+    required_columns: Optional[List[str]] = None,
+    chunk_rows: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Open an uploaded CSV as an iterator of DataFrame chunks.
+
+    The upload is copied block by block into a temporary file owned by the
+    stream, since the request's own upload file is closed before a streaming
+    response finishes. The first chunk is parsed eagerly so that a malformed
+    upload or missing columns can still be reported with a proper error status.
+
+    Args:
+        file: Uploaded CSV file
+        required_columns: Columns that must be present
+        chunk_rows: Number of rows per chunk (defaults to DEFAULT_CHUNK_ROWS)
+
+    Returns:
+        Iterator over DataFrame chunks
+
+    Raises:
+        ValueError: If the CSV cannot be parsed or is missing required columns
+    """
+    buffer = tempfile.TemporaryFile()
+    try:
+        while True:
+            block = await file.read(UPLOAD_READ_BYTES)
+            if not block:
+                break
+            buffer.write(block)
+        buffer.seek(0)
+
+        reader = pd.read_csv(buffer, chunksize=chunk_rows or DEFAULT_CHUNK_ROWS)
+        first_chunk = next(reader, None)
+        if first_chunk is None:
+            buffer.close()
+            return iter(())
+
+        missing_cols = [col for col in required_columns or [] if col not in first_chunk.columns]
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {', '.join(missing_cols)}")
+    except Exception:
+        buffer.close()
+        raise
+
+    return _iter_chunks(first_chunk, reader, buffer)
+
+
+def _iter_chunks(first_chunk: pd.DataFrame, reader, buffer) -> Iterator[pd.DataFrame]:
+    """Yield the already parsed first chunk, then the rest, closing the buffer when done."""
+    try:
+        yield first_chunk
+        yield from reader
+    finally:
+        reader.close()
+        buffer.close()
+
+
+def ndjson_lines(
+    chunks: Iterable[pd.DataFrame],
+    predict_chunk: Callable[[pd.DataFrame], List[Dict[str, Any]]]
+) -> Iterator[bytes]:
+    """
+    Predict each chunk and yield its records as NDJSON.
+
+    An error while streaming is reported as a final ``{"error": ...}`` line since
+    the response status has already been sent.
+    """
+    try:
+        for chunk in chunks:
+            records = predict_chunk(chunk)
+            yield b"".join(dumps(record) + b"\n" for record in records)
+    except Exception as e:
+        logger.error(f"Error streaming predictions: {e}")
+        yield dumps({"error": str(e)}) + b"\n"
+
+
+def ndjson_response(
+    chunks: Iterable[pd.DataFrame],
+    predict_chunk: Callable[[pd.DataFrame], List[Dict[str, Any]]]
+) -> StreamingResponse:
+    """Stream chunked predictions back to the client as NDJSON."""
+    return StreamingResponse(ndjson_lines(chunks, predict_chunk), media_type=NDJSON_MEDIA_TYPE)
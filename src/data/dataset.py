@@ -0,0 +1,288 @@
+"""
+Partitioned Parquet datasets for historical flights and generated consumption.
+
+Data is laid out as hive-style partitions, one file per airport and month::
+
+    <data_dir>/dataset/flights/airport=KLAS/year=2024/month=1/part-0.parquet
+    <data_dir>/dataset/consumption/airport=KLAS/year=2024/month=1/part-0.parquet
+
+Flights use a fixed schema with typed timestamp, ICAO24, callsign and airport
+columns. Reads go through pyarrow, so only the requested columns are decoded and
+filters on partition keys or columns are pushed down into the scan. Partitions
+are written to a temporary file and renamed into place, so readers never see a
+half-written file.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DATASET_DIRNAME = "dataset"
+
+FLIGHT_SCHEMA = pa.schema([
+    ('icao24', pa.string()),
+    ('callsign', pa.string()),
+    ('firstSeen', pa.int64()),
+    ('lastSeen', pa.int64()),
+    ('estDepartureAirport', pa.string()),
+    ('estArrivalAirport', pa.string()),
+    ('estDepartureAirportHorizDistance', pa.int64()),
+    ('estDepartureAirportVertDistance', pa.int64()),
+    ('estArrivalAirportHorizDistance', pa.int64()),
+    ('estArrivalAirportVertDistance', pa.int64())
+])
+
+PARTITION_SCHEMA = pa.schema([
+    ('airport', pa.string()),
+    ('year', pa.int16()),
+    ('month', pa.int8())
+])
+
+Filters = Union[ds.Expression, List[Tuple[str, str, Any]], None]
+
+
+def _to_expression(filters: Filters) -> Optional[ds.Expression]:
+    """Convert a filter expression or a list of (column, op, value) tuples to an expression."""
+    if filters is None or isinstance(filters, ds.Expression):
+        return filters
+    return pq.filters_to_expression(filters)
+
+
+class PartitionedDataset:
+    """Parquet dataset partitioned by airport, year and month."""
+
+    PART_FILENAME = "part-0.parquet"
+
+    def __init__(self, root: Union[str, Path], schema: Optional[pa.Schema] = None):
+        """
+        Initialize the dataset.
+
+        Args:
+            root: Dataset root directory
+            schema: Optional fixed schema for written and read data (inferred otherwise)
+        """
+        self.root = Path(root)
+        self.schema = schema
+
+    def partition_path(self, airport: str, year: int, month: int) -> Path:
+        """Get the file path of one partition."""
+        return self.root / f"airport={airport}" / f"year={year}" / f"month={month}" / self.PART_FILENAME
+
+    def partitions(self) -> List[Tuple[str, int, int]]:
+        """List the (airport, year, month) of every written partition."""
+        partitions = []
+        for path in self.files():
+            month_dir, year_dir, airport_dir = path.parent, path.parent.parent, path.parent.parent.parent
+            partitions.append((
+                airport_dir.name.split("=", 1)[1],
+                int(year_dir.name.split("=", 1)[1]),
+                int(month_dir.name.split("=", 1)[1])
+            ))
+        return sorted(partitions)
+
+    def files(self) -> List[Path]:
+        """List the partition files."""
+        if not self.root.exists():
+            return []
+        return sorted(self.root.glob(f"airport=*/year=*/month=*/{self.PART_FILENAME}"))
+
+    def _to_table(self, data: Union[pd.DataFrame, List[Dict]]) -> pa.Table:
+        """Convert records or a DataFrame to a table in the dataset schema."""
+        if isinstance(data, pd.DataFrame):
+            if self.schema is None:
+                return pa.Table.from_pandas(data, preserve_index=False)
+            data = data.reindex(columns=self.schema.names)
+            return pa.Table.from_pandas(data, schema=self.schema, preserve_index=False)
+        if self.schema is None:
+            return pa.Table.from_pylist(list(data))
+        return pa.Table.from_pylist(list(data), schema=self.schema)
+
+    def write_partition(
+        self,
+        data: Union[pd.DataFrame, List[Dict]],
+        airport: str,
+        year: int,
+        month: int
+    ) -> Path:
+        """
+        Atomically replace one partition.
+
+        Args:
+            data: Records or DataFrame to write
+            airport: ICAO airport code
+            year: Year of the partition
+            month: Month of the partition
+
+        Returns:
+            Path of the written file
+        """
+        path = self.partition_path(airport, year, month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        pq.write_table(self._to_table(data), tmp_path, compression="zstd")
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    def has_partition(self, airport: str, year: int, month: int) -> bool:
+        """Check whether a partition has been written."""
+        return self.partition_path(airport, year, month).exists()
+
+    def read_file(
+        self,
+        path: Union[str, Path],
+        columns: Optional[Sequence[str]] = None,
+        filters: Filters = None
+    ) -> pa.Table:
+        """
+        Read one partition file.
+
+        Args:
+            path: Partition file path
+            columns: Columns to read (all if None)
+            filters: Row filter, pushed down into the scan
+
+        Returns:
+            Arrow table without the partition columns
+        """
+        dataset = ds.dataset(str(path), format="parquet", schema=self.schema)
+        return dataset.to_table(columns=list(columns) if columns else None, filter=_to_expression(filters))
+
+    def read_partition(
+        self,
+        airport: str,
+        year: int,
+        month: int,
+        columns: Optional[Sequence[str]] = None,
+        filters: Filters = None
+    ) -> pd.DataFrame:
+        """
+        Read one partition into a DataFrame (empty if it does not exist).
+
+        Args:
+            airport: ICAO airport code
+            year: Year of the partition
+            month: Month of the partition
+            columns: Columns to read (all if None)
+            filters: Row filter, pushed down into the scan
+
+        Returns:
+            DataFrame of the partition's rows
+        """
+        path = self.partition_path(airport, year, month)
+        if not path.exists():
+            return self._empty(columns)
+        return self.read_file(path, columns, filters).to_pandas()
+
+    def _empty(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Return an empty DataFrame with the requested (or schema) columns."""
+        if self.schema is not None:
+            schema = pa.schema(list(self.schema) + list(PARTITION_SCHEMA))
+            return schema.empty_table().select(list(columns) if columns else self.schema.names).to_pandas()
+        return pd.DataFrame(columns=list(columns) if columns else None)
+
+    def read(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        filters: Filters = None,
+        airports: Optional[Sequence[str]] = None,
+        years: Optional[Sequence[int]] = None,
+        months: Optional[Sequence[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Read rows across partitions with column projection and predicate pushdown.
+
+        Partition restrictions prune whole directories before any file is opened;
+        other filters are evaluated by the scanner using Parquet statistics.
+
+        Args:
+            columns: Columns to read, may include airport/year/month (all if None)
+            filters: Row filter expression or list of (column, op, value) tuples
+            airports: Only read these airports
+            years: Only read these years
+            months: Only read these months
+
+        Returns:
+            DataFrame of matching rows
+        """
+        scan = self._scan(filters, airports, years, months)
+        if scan is None:
+            return self._empty(columns)
+        dataset, expression = scan
+        table = dataset.to_table(columns=list(columns) if columns else None, filter=expression)
+        return table.to_pandas()
+
+    def iter_batches(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        filters: Filters = None,
+        airports: Optional[Sequence[str]] = None,
+        years: Optional[Sequence[int]] = None,
+        months: Optional[Sequence[int]] = None,
+        batch_size: int = 100_000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream matching rows in batches instead of materializing the whole result.
+
+        Takes the same arguments as ``read``; at most ``batch_size`` rows are
+        decoded at a time, so datasets larger than memory can be processed.
+
+        Yields:
+            DataFrames of up to ``batch_size`` rows, in partition order
+        """
+        scan = self._scan(filters, airports, years, months)
+        if scan is None:
+            return
+        dataset, expression = scan
+        for batch in dataset.to_batches(
+            columns=list(columns) if columns else None, filter=expression, batch_size=batch_size
+        ):
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def _scan(
+        self,
+        filters: Filters,
+        airports: Optional[Sequence[str]],
+        years: Optional[Sequence[int]],
+        months: Optional[Sequence[int]]
+    ) -> Optional[Tuple[ds.Dataset, Optional[ds.Expression]]]:
+        """Build the partitioned dataset and filter expression for a scan (None if there are no files)."""
+        files = self.files()
+        if not files:
+            return None
+
+        schema = None
+        if self.schema is not None:
+            schema = pa.schema(list(self.schema) + list(PARTITION_SCHEMA))
+        dataset = ds.dataset(
+            [str(path) for path in files],
+            format="parquet",
+            schema=schema,
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+            partition_base_dir=str(self.root)
+        )
+
+        expression = _to_expression(filters)
+        for name, values in (('airport', airports), ('year', years), ('month', months)):
+            if values is not None:
+                condition = pc.field(name).isin(list(values))
+                expression = condition if expression is None else expression & condition
+        return dataset, expression
+
+
+def flight_dataset(data_dir: Union[str, Path] = "data/historical") -> PartitionedDataset:
+    """Get the flight dataset under a data directory."""
+    return PartitionedDataset(Path(data_dir) / DATASET_DIRNAME / "flights", FLIGHT_SCHEMA)
+
+
+def consumption_dataset(data_dir: Union[str, Path] = "data/historical") -> PartitionedDataset:
+    """Get the generated consumption dataset under a data directory."""
+    return PartitionedDataset(Path(data_dir) / DATASET_DIRNAME / "consumption")
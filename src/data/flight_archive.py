@@ -0,0 +1,424 @@
+"""
+Read-only, memory-mapped archive of historical Southwest flights for the web tier.
+
+The archive is a single binary file built from the ``FlightStore`` index:
+
+* a fixed-width record per flight (day, departure minute, timestamps and
+  string ids), sorted by date and departure time
+* a sorted string table holding every flight number, airport and ICAO24 once
+* per-date offsets into the records, and the record positions sorted by
+  flight number
+
+Every section is mapped with ``np.memmap``, so opening the archive costs a few
+page faults instead of parsing every flight, and worker processes share the
+pages through the OS page cache. Date and flight number lookups are binary
+searches returning views of the mapped records; only the flights a page
+actually renders are turned into dictionaries.
+
+The header records the modification time and size of every flight file the
+archive was built from. ``open_flights`` compares them with the files on disk
+and serves from the ``FlightStore`` index while they differ, so flights
+collected after a build show up before the archive is rebuilt.
+
+Build or rebuild the archive with::
+
+    python -m src.data.flight_archive data/historical
+"""
+
+import argparse
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from datetime import date as date_type
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from src.data.flight_store import FlightStore
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FILENAME = "flights.archive"
+MAGIC = b"SWFARCH1"
+ALIGNMENT = 64
+
+RECORD_DTYPE = np.dtype([
+    ('day', np.int32),                 # Departure date, days since 1970-01-01
+    ('departure_minute', np.int16),    # Local departure time, minutes after midnight
+    ('first_seen', np.int64),
+    ('last_seen', np.int64),
+    ('flight_number', np.int32),       # String table ids (0 is the empty string)
+    ('origin_airport', np.int32),
+    ('destination_airport', np.int32),
+    ('icao24', np.int32)
+])
+
+STRING_FIELDS = ('flight_number', 'origin_airport', 'destination_airport', 'icao24')
+
+EPOCH = date_type(1970, 1, 1)
+
+
+def _day_number(date: str) -> int:
+    """Convert a YYYY-MM-DD date to days since 1970-01-01."""
+    return (date_type.fromisoformat(date) - EPOCH).days
+
+
+def _day_string(day: int) -> str:
+    """Convert days since 1970-01-01 to a YYYY-MM-DD date."""
+    return str(np.datetime64(int(day), 'D'))
+
+
+def write_archive(
+    path: Union[str, Path],
+    flights: List[Dict],
+    sources: Optional[Dict[str, List[int]]] = None
+) -> Path:
+    """
+    Atomically write a flight archive.
+
+    Args:
+        path: Archive file path
+        flights: Flight dictionaries as returned by ``FlightStore.all_flights``
+        sources: Signatures of the flight files the flights were read from,
+            as returned by ``FlightStore.source_signatures``
+
+    Returns:
+        Path of the written archive
+    """
+    path = Path(path)
+    strings = sorted({''} | {
+        flight.get(field) or '' for flight in flights for field in STRING_FIELDS
+    })
+    width = max(1, max(len(s.encode()) for s in strings))
+    string_table = np.array([s.encode() for s in strings], dtype=f'S{width}')
+    string_ids = {s: i for i, s in enumerate(strings)}
+
+    records = np.zeros(len(flights), dtype=RECORD_DTYPE)
+    for i, flight in enumerate(flights):
+        hour, minute = flight['departure_time'].split(':')
+        records[i] = (
+            _day_number(flight['date']),
+            int(hour) * 60 + int(minute),
+            flight['first_seen'],
+            flight.get('last_seen') or 0,
+            *(string_ids[flight.get(field) or ''] for field in STRING_FIELDS)
+        )
+    records = records[np.lexsort((records['first_seen'], records['departure_minute'], records['day']))]
+
+    days, starts = np.unique(records['day'], return_index=True)
+    date_offsets = np.append(starts, len(records)).astype(np.int64)
+    by_flight_number = np.argsort(records['flight_number'], kind='stable').astype(np.int64)
+
+    sections = {
+        'records': records,
+        'strings': string_table,
+        'days': days.astype(np.int32),
+        'date_offsets': date_offsets,
+        'by_flight_number': by_flight_number,
+        'flight_number_keys': records['flight_number'][by_flight_number]
+    }
+
+    # Lay the sections out after the header, each aligned for direct mapping
+    header = {'count': len(records), 'sources': sources, 'sections': {}}
+    offset = 0
+    for name, array in sections.items():
+        header['sections'][name] = {
+            'dtype': np.lib.format.dtype_to_descr(array.dtype),
+            'shape': list(array.shape),
+            'offset': offset
+        }
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header_bytes = json.dumps(header).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in sections.items():
+            f.seek(data_start + header['sections'][name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_archive(store: FlightStore, path: Optional[Union[str, Path]] = None) -> Path:
+    """
+    Build the archive from a flight store's index.
+
+    Args:
+        store: Flight store to read from
+        path: Archive file path (defaults to ``flights.archive`` in the store's data directory)
+
+    Returns:
+        Path of the written archive
+    """
+    path = Path(path) if path else store.data_dir / ARCHIVE_FILENAME
+    # Signatures taken before reading: a file changed meanwhile marks the archive stale
+    sources = store.source_signatures()
+    store.refresh(force=True)
+    flights = store.all_flights()
+    write_archive(path, flights, sources)
+    logger.info(f"Wrote {len(flights)} flights to {path}")
+    return path
+
+
+class FlightArchive:
+    """Memory-mapped view of a flight archive with date and flight number lookups."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        refresh_interval: float = 10.0,
+        store: Optional[FlightStore] = None
+    ):
+        """
+        Open the archive.
+
+        Args:
+            path: Archive file path
+            refresh_interval: Minimum seconds between checks for a rebuilt archive
+            store: Flight store over the archive's data directory; while its flight
+                files differ from those the archive was built from, queries are
+                answered by the store instead
+        """
+        self.path = Path(path)
+        self.refresh_interval = refresh_interval
+        self.store = store
+        self._lock = threading.Lock()
+        self._last_refresh = time.monotonic()
+        self.version = 1
+        self._open()
+        self.stale = self._sources_changed()
+        if self.stale:
+            logger.warning(f"Flight archive {self.path} is out of date, serving from the flight index")
+
+    def _open(self):
+        """Map the archive file and its sections."""
+        stat = self.path.stat()
+        buffer = np.memmap(self.path, dtype=np.uint8, mode='r')
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not a flight archive")
+        header_length = struct.unpack('<Q', bytes(buffer[len(MAGIC):len(MAGIC) + 8]))[0]
+        header_end = len(MAGIC) + 8 + header_length
+        header = json.loads(bytes(buffer[len(MAGIC) + 8:header_end]))
+        data_start = -(-header_end // ALIGNMENT) * ALIGNMENT
+
+        sections = {}
+        for name, section in header['sections'].items():
+            dtype = np.lib.format.descr_to_dtype(section['dtype'])
+            count = int(np.prod(section['shape']))
+            sections[name] = np.frombuffer(
+                buffer, dtype=dtype, count=count, offset=data_start + section['offset']
+            ).reshape(section['shape'])
+
+        self._buffer = buffer
+        self._signature = (stat.st_mtime_ns, stat.st_size)
+        self.sources = header.get('sources')
+        self.records = sections['records']
+        self.strings = sections['strings']
+        self.days = sections['days']
+        self.date_offsets = sections['date_offsets']
+        self.by_flight_number = sections['by_flight_number']
+        self.flight_number_keys = sections['flight_number_keys']
+
+    def _sources_changed(self) -> bool:
+        """Whether the store's flight files differ from those the archive was built from."""
+        return self.store is not None and self.store.source_signatures() != self.sources
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Remap the archive if it has been rebuilt, and check it against the flight files.
+
+        Views handed out before a remap stay valid: they keep the old mapping alive.
+        While the archive is stale, the store's index is refreshed instead.
+
+        Args:
+            force: Check even if ``refresh_interval`` has not elapsed
+
+        Returns:
+            True if the flights served changed
+        """
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval:
+            return False
+        with self._lock:
+            self._last_refresh = now
+            changed = False
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                stat = None
+            if stat is not None and (stat.st_mtime_ns, stat.st_size) != self._signature:
+                self._open()
+                changed = True
+                logger.info(f"Flight archive {self.path} reloaded")
+
+            stale = self._sources_changed()
+            if stale != self.stale:
+                self.stale = stale
+                changed = True
+                if stale:
+                    logger.warning(f"Flight archive {self.path} is out of date, serving from the flight index")
+            if stale and self.store.refresh(force=force):
+                changed = True
+            if changed:
+                self.version += 1
+            return changed
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _string_id(self, value: str) -> int:
+        """Find the string table id of a value, or -1 if it is not in the archive."""
+        key = value.encode()
+        index = int(np.searchsorted(self.strings, key))
+        if index < len(self.strings) and self.strings[index] == key:
+            return index
+        return -1
+
+    def records_on(self, date: str) -> np.ndarray:
+        """
+        Get the records of all flights departing on a date.
+
+        Args:
+            date: Date in YYYY-MM-DD format
+
+        Returns:
+            View of the mapped records, sorted by departure time (empty if no flights)
+        """
+        self.refresh()
+        day = _day_number(date)
+        index = int(np.searchsorted(self.days, day))
+        if index == len(self.days) or self.days[index] != day:
+            return self.records[:0]
+        return self.records[self.date_offsets[index]:self.date_offsets[index + 1]]
+
+    def record_positions(self, flight_number: str) -> np.ndarray:
+        """
+        Get the record positions of a flight number.
+
+        Args:
+            flight_number: Southwest flight number (e.g. "WN1234")
+
+        Returns:
+            View of record positions, in date and departure time order
+        """
+        self.refresh()
+        string_id = self._string_id(flight_number)
+        if string_id < 0:
+            return self.by_flight_number[:0]
+        start, end = np.searchsorted(self.flight_number_keys, [string_id, string_id + 1])
+        return self.by_flight_number[start:end]
+
+    def to_flights(self, records: np.ndarray) -> List[Dict]:
+        """Convert records into the flight dictionaries used by the web pages."""
+        strings = {
+            field: np.char.decode(self.strings[records[field]]).tolist() for field in STRING_FIELDS
+        }
+        dates = records['day'].astype('datetime64[D]').astype(str).tolist()
+        hours, minutes = np.divmod(records['departure_minute'].astype(np.int64), 60)
+        return [
+            {
+                'flight_number': strings['flight_number'][i],
+                'origin_airport': strings['origin_airport'][i],
+                'destination_airport': strings['destination_airport'][i],
+                'date': dates[i],
+                'departure_time': f"{hours[i]:02d}:{minutes[i]:02d}",
+                'first_seen': int(records['first_seen'][i]),
+                'last_seen': int(records['last_seen'][i]) or None,
+                'icao24': strings['icao24'][i] or None
+            }
+            for i in range(len(records))
+        ]
+
+    def available_dates(self) -> List[str]:
+        """Return all dates with at least one flight, most recent first."""
+        self.refresh()
+        if self.stale:
+            return self.store.available_dates()
+        return [_day_string(day) for day in self.days[::-1]]
+
+    def flights_on(self, date: str) -> List[Dict]:
+        """
+        Get all Southwest flights departing on a date.
+
+        Args:
+            date: Date in YYYY-MM-DD format
+
+        Returns:
+            List of flight dictionaries sorted by departure time
+        """
+        self.refresh()
+        if self.stale:
+            return self.store.flights_on(date)
+        return self.to_flights(self.records_on(date))
+
+    def find_flights(self, flight_number: str, date: Optional[str] = None) -> List[Dict]:
+        """
+        Look up flights by flight number.
+
+        Args:
+            flight_number: Southwest flight number (e.g. "WN1234")
+            date: Optional date in YYYY-MM-DD format to restrict the search
+
+        Returns:
+            List of matching flight dictionaries
+        """
+        self.refresh()
+        if self.stale:
+            return self.store.find_flights(flight_number, date)
+        records = self.records[self.record_positions(flight_number)]
+        if date:
+            records = records[records['day'] == _day_number(date)]
+        return self.to_flights(records)
+
+
+def open_flights(data_dir: Union[str, Path] = "data/historical") -> Union[FlightArchive, FlightStore]:
+    """
+    Open the flight archive in a data directory, falling back to the indexed store.
+
+    Args:
+        data_dir: Directory containing the archive and the collected flight files
+
+    Returns:
+        FlightArchive if an archive has been built (answering from the store while it
+        is out of date), otherwise a FlightStore
+    """
+    path = Path(data_dir) / ARCHIVE_FILENAME
+    store = FlightStore(data_dir)
+    if path.exists():
+        try:
+            return FlightArchive(path, store=store)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable flight archive {path}: {e}")
+    return store
+
+
+def main(argv: Optional[List[str]] = None):
+    """Build the flight archive from the collected flight data."""
+    parser = argparse.ArgumentParser(description="Build the memory-mapped flight archive")
+    parser.add_argument('data_dir', nargs='?', default='data/historical',
+                        help="Directory containing the collected flight data")
+    parser.add_argument('--output', help=f"Archive path (default: <data_dir>/{ARCHIVE_FILENAME})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    store = FlightStore(args.data_dir)
+    try:
+        build_archive(store, args.output)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
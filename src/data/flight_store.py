@@ -0,0 +1,331 @@
+"""
+Indexed store for collected historical flight data.
+
+The collector writes one Parquet partition per airport and month to the flight
+dataset (older runs wrote ``*_flights.json`` files, which are still indexed).
+Reading those files on every web request gets slower as the archive grows, so
+this module keeps a persistent SQLite index next to them. Files are only re-read when their
+modification time or size changes, and queries by date or flight number only touch
+the flights they return.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from src.data.dataset import flight_dataset
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS flights (
+    source TEXT NOT NULL,
+    flight_date TEXT NOT NULL,
+    departure_time TEXT NOT NULL,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER,
+    callsign TEXT,
+    flight_number TEXT,
+    icao24 TEXT,
+    origin_airport TEXT,
+    destination_airport TEXT,
+    is_southwest INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dates (
+    flight_date TEXT PRIMARY KEY,
+    flight_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_flights_date ON flights (flight_date, departure_time);
+CREATE INDEX IF NOT EXISTS idx_flights_number ON flights (flight_number, flight_date);
+CREATE INDEX IF NOT EXISTS idx_flights_source ON flights (source);
+"""
+
+FLIGHT_COLUMNS = (
+    "flight_number", "origin_airport", "destination_airport",
+    "flight_date", "departure_time", "first_seen", "last_seen", "icao24"
+)
+
+# Dataset columns needed to build index rows
+SOURCE_COLUMNS = ["icao24", "callsign", "firstSeen", "lastSeen", "estDepartureAirport", "estArrivalAirport"]
+
+
+class FlightStore:
+    """Date- and flight-number-indexed view over the historical flight files."""
+
+    SCHEMA_VERSION = "1"
+    INDEX_FILENAME = ".flight_index.sqlite3"
+    SWA_CALLSIGN_PREFIX = "SWA"
+
+    def __init__(
+        self,
+        data_dir: Union[str, Path] = "data/historical",
+        index_path: Optional[Union[str, Path]] = None,
+        refresh_interval: float = 10.0
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            data_dir: Directory containing the flight dataset and legacy ``*_flights.json`` files
+            index_path: Location of the SQLite index (defaults to a hidden file in data_dir)
+            refresh_interval: Minimum seconds between file system scans in ``refresh``
+        """
+        self.data_dir = Path(data_dir)
+        self.dataset = flight_dataset(self.data_dir)
+        self.index_path = Path(index_path) if index_path else self.data_dir / self.INDEX_FILENAME
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_refresh = 0.0
+        self.version = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the index, rebuilding it if the schema version changed."""
+        if self._conn is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.index_path), check_same_thread=False, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or row["value"] != self.SCHEMA_VERSION:
+                with conn:
+                    conn.execute("DELETE FROM flights")
+                    conn.execute("DELETE FROM files")
+                    conn.execute("DELETE FROM dates")
+                    conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                        (self.SCHEMA_VERSION,)
+                    )
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Close the underlying index connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _source_files(self) -> List[Path]:
+        """List the flight files that belong in the index."""
+        legacy_files = sorted(
+            path for path in self.data_dir.glob("*_flights.json")
+            if "_progress" not in path.name
+        )
+        return legacy_files + self.dataset.files()
+
+    def source_signatures(self) -> Dict[str, List[int]]:
+        """
+        Get the modification time and size of every flight file.
+
+        Returns:
+            Dictionary mapping paths relative to the data directory to [mtime_ns, size]
+        """
+        signatures = {}
+        for path in self._source_files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signatures[str(path.relative_to(self.data_dir))] = [stat.st_mtime_ns, stat.st_size]
+        return signatures
+
+    def _read_source(self, path: Path) -> List[Dict]:
+        """Read the raw flight records of a dataset partition or legacy JSON file."""
+        if path.suffix == ".parquet":
+            return self.dataset.read_file(path, columns=SOURCE_COLUMNS).to_pylist()
+        with open(path, "r") as f:
+            flights = json.load(f)
+        return flights if isinstance(flights, list) else []
+
+    @classmethod
+    def _flight_rows(cls, source: str, flights: List[Dict]) -> List[tuple]:
+        """Convert raw OpenSky flight records into index rows."""
+        rows = []
+        for flight in flights:
+            if not isinstance(flight, dict) or not flight.get("firstSeen"):
+                continue
+            departure = datetime.fromtimestamp(flight["firstSeen"])
+            callsign = flight.get("callsign") or ""
+            origin = flight.get("estDepartureAirport")
+            destination = flight.get("estArrivalAirport")
+            is_southwest = bool(
+                callsign.startswith(cls.SWA_CALLSIGN_PREFIX) and origin and destination
+            )
+            rows.append((
+                source,
+                departure.strftime('%Y-%m-%d'),
+                departure.strftime('%H:%M'),
+                flight["firstSeen"],
+                flight.get("lastSeen"),
+                callsign or None,
+                callsign.replace(cls.SWA_CALLSIGN_PREFIX, "WN") if is_southwest else None,
+                flight.get("icao24"),
+                origin,
+                destination,
+                int(is_southwest)
+            ))
+        return rows
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Bring the index up to date with the flight files on disk.
+
+        Only files whose modification time or size changed since the last scan are
+        re-read. Files that fail to parse (e.g. while a collector is writing them)
+        keep their previous rows and are retried on the next refresh.
+
+        Args:
+            force: Scan even if ``refresh_interval`` has not elapsed
+
+        Returns:
+            True if the index changed
+        """
+        now = time.monotonic()
+        if not force and self._conn is not None and now - self._last_refresh < self.refresh_interval:
+            return False
+
+        with self._lock:
+            conn = self._connect()
+            self._last_refresh = now
+            indexed = {
+                row["path"]: (row["mtime_ns"], row["size"])
+                for row in conn.execute("SELECT path, mtime_ns, size FROM files")
+            }
+
+            changed = False
+            seen = set()
+            with conn:
+                for path in self._source_files():
+                    source = str(path)
+                    seen.add(source)
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                    if indexed.get(source) == signature:
+                        continue
+
+                    try:
+                        flights = self._read_source(path)
+                    except Exception as e:
+                        logger.warning(f"Error reading flights from {path}: {e}")
+                        continue
+
+                    conn.execute("DELETE FROM flights WHERE source = ?", (source,))
+                    conn.executemany(
+                        "INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        self._flight_rows(source, flights)
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                        (source, *signature)
+                    )
+                    changed = True
+
+                for source in set(indexed) - seen:
+                    conn.execute("DELETE FROM flights WHERE source = ?", (source,))
+                    conn.execute("DELETE FROM files WHERE path = ?", (source,))
+                    changed = True
+
+                if changed:
+                    conn.execute("DELETE FROM dates")
+                    conn.execute(
+                        "INSERT INTO dates (flight_date, flight_count) "
+                        "SELECT flight_date, COUNT(*) FROM flights GROUP BY flight_date"
+                    )
+
+            if changed:
+                self.version += 1
+                logger.info(f"Flight index refreshed from {self.data_dir}")
+            return changed
+
+    def available_dates(self) -> List[str]:
+        """Return all dates with at least one flight, most recent first."""
+        self.refresh()
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT flight_date FROM dates ORDER BY flight_date DESC"
+            ).fetchall()
+        return [row["flight_date"] for row in rows]
+
+    def _to_flight(self, row: sqlite3.Row) -> Dict:
+        """Convert an index row into the flight dictionary used by the web pages."""
+        return {
+            'flight_number': row["flight_number"],
+            'origin_airport': row["origin_airport"],
+            'destination_airport': row["destination_airport"],
+            'date': row["flight_date"],
+            'departure_time': row["departure_time"],
+            'first_seen': row["first_seen"],
+            'last_seen': row["last_seen"],
+            'icao24': row["icao24"]
+        }
+
+    def flights_on(self, date: str) -> List[Dict]:
+        """
+        Get all Southwest flights departing on a date.
+
+        Args:
+            date: Date in YYYY-MM-DD format
+
+        Returns:
+            List of flight dictionaries sorted by departure time
+        """
+        self.refresh()
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(FLIGHT_COLUMNS)} FROM flights "
+                "WHERE flight_date = ? AND is_southwest = 1 "
+                "ORDER BY departure_time",
+                (date,)
+            ).fetchall()
+        return [self._to_flight(row) for row in rows]
+
+    def all_flights(self) -> List[Dict]:
+        """Get every indexed Southwest flight, sorted by date and departure time."""
+        self.refresh()
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(FLIGHT_COLUMNS)} FROM flights "
+                "WHERE is_southwest = 1 "
+                "ORDER BY flight_date, departure_time, first_seen"
+            ).fetchall()
+        return [self._to_flight(row) for row in rows]
+
+    def find_flights(self, flight_number: str, date: Optional[str] = None) -> List[Dict]:
+        """
+        Look up flights by flight number.
+
+        Args:
+            flight_number: Southwest flight number (e.g. "WN1234")
+            date: Optional date in YYYY-MM-DD format to restrict the search
+
+        Returns:
+            List of matching flight dictionaries
+        """
+        self.refresh()
+        query = f"SELECT {', '.join(FLIGHT_COLUMNS)} FROM flights WHERE flight_number = ?"
+        params = [flight_number]
+        if date:
+            query += " AND flight_date = ?"
+            params.append(date)
+        query += " ORDER BY flight_date, departure_time"
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+        return [self._to_flight(row) for row in rows]
@@ -1,19 +1,40 @@
 import requests
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import logging
 import os
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
+WEATHER_COLUMNS = ['temperature', 'precipitation', 'cloudcover', 'windspeed']
+
 class WeatherCollector:
-    def __init__(self):
-        """Initialize the weather collector with API configuration."""
+    def __init__(self, max_cached_months: int = 64, failure_ttl: float = 300.0):
+        """
+        Initialize the weather collector with API configuration.
+        
+        Args:
+            max_cached_months: Number of airport-months kept indexed in memory
+            failure_ttl: Seconds before an airport-month that failed to load is retried
+        """
         self.base_url = "https://archive-api.open-meteo.com/v1/archive"
         self.cache_dir = "data/weather_cache"
         os.makedirs(self.cache_dir, exist_ok=True)
         
+        # (airport, YYYYMM) -> (sorted datetime64[ns] times, values matrix), in LRU order
+        self.max_cached_months = max_cached_months
+        self._months: OrderedDict = OrderedDict()
+        
+        # (airport, YYYYMM) -> monotonic time until which a failed load is not retried,
+        # so a transient API failure does not trigger a request on every lookup
+        # but does not hide the month for the life of the process either
+        self.failure_ttl = failure_ttl
+        self._failures: Dict[Tuple[str, str], float] = {}
+        
         # Common US airport coordinates (lat, lon)
         self.airport_coords = {
             'KMDW': (41.7860, -87.7524),  # Chicago Midway
@@ -80,48 +101,134 @@ class WeatherCollector:
             logger.error(f"Error fetching weather data for {airport}: {str(e)}")
             return None
     
-    def get_weather_data(self, 
-                        airport: str, 
-                        timestamp: datetime) -> Dict[str, float]:
+    def _month_index(self, 
+                     airport: str, 
+                     month_start: datetime) -> Optional[Tuple[np.ndarray, np.ndarray]]:
         """
-        Get weather data for a specific airport and timestamp.
-        Uses cached data when available.
+        Get the in-memory time index for one airport-month, loading it on first use.
+        
+        The month is read from the CSV cache (or fetched and cached) once, sorted by
+        time and kept as NumPy arrays. The least recently used months are evicted
+        once more than ``max_cached_months`` are held. A month that fails to load
+        is not retried for ``failure_ttl`` seconds.
         
         Args:
             airport: ICAO airport code
-            timestamp: Datetime for weather data
+            month_start: First day of the month
             
         Returns:
-            Dictionary with weather metrics
+            Tuple of (sorted datetime64[ns] times, float values in WEATHER_COLUMNS
+            order), or None if no data is available
         """
-        cache_file = self.get_cached_filename(airport, timestamp)
+        key = (airport, month_start.strftime('%Y%m'))
+        if key in self._months:
+            self._months.move_to_end(key)
+            return self._months[key]
+        if self._failures.get(key, 0.0) > time.monotonic():
+            return None
         
+        cache_file = self.get_cached_filename(airport, month_start)
+        index = None
         try:
-            # Check cache first
             if os.path.exists(cache_file):
                 df = pd.read_csv(cache_file)
                 df['timestamp'] = pd.to_datetime(df['timestamp'])
             else:
                 # Fetch month of data
-                start_date = timestamp.replace(day=1, hour=0, minute=0, second=0)
-                end_date = (start_date + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                
-                df = self.fetch_historical_weather(airport, start_date, end_date)
+                end_date = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+                df = self.fetch_historical_weather(airport, month_start, end_date)
                 if df is not None:
                     df.to_csv(cache_file, index=False)
-                else:
-                    return {}
             
-            # Find closest timestamp
-            closest_row = df.iloc[(df['timestamp'] - timestamp).abs().argsort()[0]]
+            if df is not None and len(df):
+                df = df.sort_values('timestamp', kind='stable')
+                index = (
+                    df['timestamp'].to_numpy(dtype='datetime64[ns]'),
+                    df[WEATHER_COLUMNS].to_numpy(dtype=np.float64)
+                )
+        except Exception as e:
+            logger.error(f"Error loading weather data for {airport} {key[1]}: {str(e)}")
+        
+        if index is None:
+            self._failures[key] = time.monotonic() + self.failure_ttl
+            return None
+        
+        self._failures.pop(key, None)
+        self._months[key] = index
+        if len(self._months) > self.max_cached_months:
+            self._months.popitem(last=False)
+        return index
+    
+    @staticmethod
+    def _nearest(times: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """Return the positions in sorted ``times`` closest to each target (ties pick the earlier hour)."""
+        if len(times) == 1:
+            return np.zeros(len(targets), dtype=np.intp)
+        right = np.searchsorted(times, targets).clip(1, len(times) - 1)
+        left = right - 1
+        use_right = (times[right] - targets) < (targets - times[left])
+        return np.where(use_right, right, left)
+    
+    def get_weather_data(self, 
+                        airport: str, 
+                        timestamp: datetime) -> Dict[str, float]:
+        """
+        Get weather data for a specific airport and timestamp.
+        Uses cached data when available.
+        
+        Args:
+            airport: ICAO airport code
+            timestamp: Datetime for weather data
+            
+        Returns:
+            Dictionary with weather metrics
+        """
+        try:
+            month_start = timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            index = self._month_index(airport, month_start)
+            if index is None:
+                return {}
             
-            return {
-                'temperature': closest_row['temperature'],
-                'precipitation': closest_row['precipitation'],
-                'cloudcover': closest_row['cloudcover'],
-                'windspeed': closest_row['windspeed']
-            }
+            times, values = index
+            position = self._nearest(times, np.array([np.datetime64(timestamp, 'ns')]))[0]
+            return dict(zip(WEATHER_COLUMNS, values[position].tolist()))
             
         except Exception as e:
             logger.error(f"Error getting weather data for {airport} at {timestamp}: {str(e)}")
-            return {} 
\ No newline at end of file
+            return {}
+    
+    def get_weather_batch(self, 
+                          airports: Sequence[str], 
+                          timestamps: Sequence[datetime]) -> pd.DataFrame:
+        """
+        Get weather data for many (airport, timestamp) pairs at once.
+        
+        Pairs are grouped by airport-month, and each group is resolved with one
+        vectorized nearest-hour lookup against that month's index.
+        
+        Args:
+            airports: ICAO airport code for each pair
+            timestamps: Datetime for each pair (datetime, pandas Timestamp or datetime64)
+            
+        Returns:
+            DataFrame with one row per pair (in input order) and WEATHER_COLUMNS;
+            values are NaN where no weather data is available
+        """
+        airports = np.asarray(airports, dtype=object)
+        times = pd.to_datetime(pd.Series(timestamps)).to_numpy(dtype='datetime64[ns]')
+        if len(airports) != len(times):
+            raise ValueError("airports and timestamps must have the same length")
+        
+        result = np.full((len(times), len(WEATHER_COLUMNS)), np.nan)
+        months = times.astype('datetime64[M]')
+        groups = pd.DataFrame({'airport': airports, 'month': months}).groupby(
+            ['airport', 'month'], sort=False
+        ).indices
+        for (airport, month), positions in groups.items():
+            index = self._month_index(airport, pd.Timestamp(month).to_pydatetime())
+            if index is None:
+                continue
+            month_times, values = index
+            result[positions] = values[self._nearest(month_times, times[positions])]
+        
+        return pd.DataFrame(result, columns=WEATHER_COLUMNS)
@@ -5,25 +5,39 @@ Historical flight data collection for research purposes.
 import json
 import logging
 import os
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from src.config.settings import SWA_HUBS, REQUEST_COOLDOWN
+from src.config.settings import SWA_HUBS
 
 from src.data_collection.flight_collector import FlightDataCollector
+from src.data_collection.progress import ChunkIndex
+from src.data_collection.scheduler import FetchScheduler, RequestBudget
+from src.data_collection.storage import FlightSegment, atomic_write_json
+from src.data.dataset import flight_dataset
 
 logger = logging.getLogger(__name__)
 
 class HistoricalDataCollector:
     """Collects historical flight data for research analysis."""
     
-    def __init__(self):
-        """Initialize the collector."""
-        self.collector = FlightDataCollector()
-        self.data_dir = Path("data/historical")
+    BUDGET_FILENAME = ".request_budget.json"
+    
+    def __init__(self, data_dir: str = "data/historical", workers: int = 4):
+        """
+        Initialize the collector.
+        
+        Args:
+            data_dir: Directory for collected flights and progress files
+            workers: Number of windows fetched concurrently
+        """
+        self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.dataset = flight_dataset(self.data_dir)
+        self.budget = RequestBudget(state_file=self.data_dir / self.BUDGET_FILENAME)
+        self.collector = FlightDataCollector(budget=self.budget)
+        self.scheduler = FetchScheduler(self.budget, workers=workers)
         
     def _get_progress_file(self, airport: str, year: int, month: Optional[int] = None) -> Path:
         """Get path to progress tracking file for an airport."""
@@ -32,34 +46,197 @@ class HistoricalDataCollector:
         return self.data_dir / f"{airport}_{year}_progress.json"
         
     def _get_data_file(self, airport: str, year: int, month: Optional[int] = None) -> Path:
-        """Get path to data file for an airport."""
+        """Get path to the legacy JSON data file for an airport."""
         if month:
             return self.data_dir / f"{airport}_{year}_{month:02d}_flights.json"
         return self.data_dir / f"{airport}_{year}_flights.json"
         
-    def _load_progress(self, progress_file: Path) -> List[Dict]:
-        """Load collection progress from file."""
+    def _get_segment_file(self, airport: str, year: int, month: Optional[int] = None) -> Path:
+        """Get path to the append-only flight segment for an airport."""
+        data_file = self._get_data_file(airport, year, month)
+        return data_file.with_suffix(".jsonl")
+        
+    def _load_progress(self, progress_file: Path) -> Dict:
+        """
+        Load collection progress from file.
+        
+        Returns:
+            Dictionary with the ``chunks`` index of collected windows and the
+            committed ``segment_bytes`` of the flight segment (None for legacy files)
+        """
         if progress_file.exists():
             with open(progress_file) as f:
-                return json.load(f)
-        return []
+                progress = json.load(f)
+            if isinstance(progress, list):
+                # Legacy format: a plain list of collected chunks
+                return {'chunks': ChunkIndex.from_chunks(progress), 'segment_bytes': None}
+            if 'intervals' in progress:
+                chunks = ChunkIndex.from_list(progress['intervals'])
+            else:
+                chunks = ChunkIndex.from_chunks(progress['chunks'])
+            return {'chunks': chunks, 'segment_bytes': progress['segment_bytes']}
+        return {'chunks': ChunkIndex(), 'segment_bytes': 0}
         
-    def _save_progress(self, progress_file: Path, collected_chunks: List[Dict]):
-        """Save collection progress to file."""
-        with open(progress_file, 'w') as f:
-            json.dump(collected_chunks, f, indent=2)
+    def _save_progress(self, progress_file: Path, progress: Dict):
+        """Atomically checkpoint collection progress."""
+        atomic_write_json(progress_file, {
+            'intervals': progress['chunks'].to_list(),
+            'segment_bytes': progress['segment_bytes']
+        })
             
-    def _load_flights(self, data_file: Path) -> List[Dict]:
-        """Load collected flights from file."""
+    def _period_months(self, year: int, month: Optional[int] = None) -> List[int]:
+        """Get the months covered by a collection period."""
+        return [month] if month else list(range(1, 13))
+        
+    def _load_flights(self, airport: str, year: int, month: Optional[int] = None) -> List[Dict]:
+        """Load collected flights from the dataset, or from a legacy JSON file."""
+        months = [m for m in self._period_months(year, month) if self.dataset.has_partition(airport, year, m)]
+        if months:
+            return [
+                flight
+                for m in months
+                for flight in self.dataset.read_file(self.dataset.partition_path(airport, year, m)).to_pylist()
+            ]
+        data_file = self._get_data_file(airport, year, month)
         if data_file.exists():
             with open(data_file) as f:
                 return json.load(f)
         return []
         
-    def _save_flights(self, data_file: Path, flights: List[Dict]):
-        """Save collected flights to file."""
-        with open(data_file, 'w') as f:
-            json.dump(flights, f, indent=2)
+    @staticmethod
+    def _flight_key(flight: Dict) -> Tuple:
+        """Identify a flight across segments: one aircraft departs once per first-seen time."""
+        return (flight.get('icao24'), flight.get('firstSeen'), flight.get('callsign'))
+        
+    def _save_flights(
+        self,
+        airport: str,
+        year: int,
+        month: Optional[int],
+        flights: List[Dict],
+        months: Optional[List[int]] = None
+    ):
+        """
+        Atomically merge collected flights into the dataset's monthly partitions.
+        
+        Yearly collections are split by the local month of each departure. A yearly
+        and a monthly segment can both cover the same month, so flights already in a
+        partition are kept and only new flights are added; months without flights
+        are left untouched. The legacy JSON file is removed once its flights are in
+        the dataset.
+        
+        Args:
+            airport: ICAO airport code
+            year: Year being collected
+            month: Optional month being collected
+            flights: Committed flights of the segment
+            months: Only write these months (all months of the period if None)
+        """
+        if month:
+            by_month = {month: flights}
+        else:
+            by_month = {m: [] for m in self._period_months(year)}
+            for flight in flights:
+                by_month[datetime.fromtimestamp(flight['firstSeen']).month].append(flight)
+        for m, month_flights in by_month.items():
+            if not month_flights or (months is not None and m not in months):
+                continue
+            if self.dataset.has_partition(airport, year, m):
+                path = self.dataset.partition_path(airport, year, m)
+                merged = {self._flight_key(flight): flight for flight in self.dataset.read_file(path).to_pylist()}
+                merged.update((self._flight_key(flight), flight) for flight in month_flights)
+                month_flights = sorted(merged.values(), key=lambda flight: flight.get('firstSeen') or 0)
+            self.dataset.write_partition(month_flights, airport, year, m)
+        
+        if months is None:
+            data_file = self._get_data_file(airport, year, month)
+            if data_file.exists():
+                data_file.unlink()
+        
+    def _open_segment(self, airport: str, year: int, month: Optional[int] = None):
+        """
+        Open the flight segment and its progress, recovering from interrupted runs.
+        
+        Flights appended after the last checkpoint belong to a chunk whose progress
+        was never recorded, so they are truncated and the chunk is collected again.
+        Legacy JSON array files are migrated into a new segment.
+        
+        Returns:
+            Tuple of (segment, progress)
+        """
+        progress_file = self._get_progress_file(airport, year, month)
+        segment = FlightSegment(self._get_segment_file(airport, year, month))
+        progress = self._load_progress(progress_file)
+        
+        if progress['segment_bytes'] is None or (progress['chunks'] and not segment.path.exists()):
+            # Migrate flights collected before segments were introduced
+            legacy_flights = self._load_flights(airport, year, month)
+            if segment.path.exists():
+                segment.truncate(0)
+            progress['segment_bytes'] = segment.append(legacy_flights)
+            self._save_progress(progress_file, progress)
+            logger.info(f"Migrated {len(legacy_flights)} flights to {segment.path}")
+        
+        size = segment.size()
+        if size > progress['segment_bytes']:
+            logger.warning(
+                f"Discarding {size - progress['segment_bytes']} uncommitted bytes from {segment.path}"
+            )
+            segment.truncate(progress['segment_bytes'])
+        elif size < progress['segment_bytes']:
+            logger.error(f"{segment.path} is shorter than its checkpoint, restarting collection")
+            segment.truncate(0)
+            progress = {'chunks': ChunkIndex(), 'segment_bytes': 0}
+            self._save_progress(progress_file, progress)
+        
+        return segment, progress
+        
+    def compact(self, airport: str, year: int, month: Optional[int] = None) -> List[Dict]:
+        """
+        Compact the flight segment into the dataset partitions read by the other tools.
+        
+        Args:
+            airport: ICAO airport code
+            year: Year being collected
+            month: Optional month being collected
+            
+        Returns:
+            List of all committed flight dictionaries
+        """
+        segment, progress = self._open_segment(airport, year, month)
+        return self._compact_segment(segment, progress, airport, year, month)
+        
+    def _compact_segment(
+        self,
+        segment: FlightSegment,
+        progress: Dict,
+        airport: str,
+        year: int,
+        month: Optional[int] = None,
+        months: Optional[List[int]] = None
+    ) -> List[Dict]:
+        """Merge the committed part of a segment into the dataset partitions of the given months."""
+        # Windows complete out of order when fetched concurrently
+        flights = sorted(segment.read(progress['segment_bytes']), key=lambda flight: flight.get('firstSeen') or 0)
+        self._save_flights(airport, year, month, flights, months)
+        return flights
+        
+    def _closed_months(
+        self,
+        progress: Dict,
+        year: int,
+        month: Optional[int],
+        start: datetime,
+        end: datetime
+    ) -> List[int]:
+        """List the months of a yearly period touched by [start, end) that are now fully collected."""
+        if month:
+            return []
+        closed = []
+        for m in range(start.month, (end - timedelta(microseconds=1)).month + 1):
+            if progress['chunks'].contains(*self._collection_period(year, m)):
+                closed.append(m)
+        return closed
         
     def collect_airport_history(
         self,
@@ -82,75 +259,152 @@ class HistoricalDataCollector:
         Returns:
             List of flight dictionaries
         """
-        logger.info(f"Collecting historical data for {airport}")
-        logger.info(f"Period: {start_date:%Y-%m-%d %H:%M} to {end_date:%Y-%m-%d %H:%M}")
+        return self.collect_hubs_history([airport], start_date, end_date, year, month)[airport]
         
-        # Load existing progress and data
-        progress_file = self._get_progress_file(airport, year, month)
-        data_file = self._get_data_file(airport, year, month)
-        collected_chunks = self._load_progress(progress_file)
-        all_flights = self._load_flights(data_file)
+    def collect_hubs_history(
+        self,
+        airports: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        year: int,
+        month: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Collect historical flight data for several airports at once.
         
-        # Process in 2-hour chunks as required by OpenSky API
-        current_start = start_date
-        while current_start < end_date:
-            current_end = min(current_start + timedelta(hours=2), end_date)
-            
-            # Check if chunk has already been collected
-            chunk_info = {
-                'start': current_start.isoformat(),
-                'end': current_end.isoformat()
-            }
-            if chunk_info in collected_chunks:
-                logger.info(f"Skipping already collected chunk: {current_start:%Y-%m-%d %H:%M} to {current_end:%Y-%m-%d %H:%M}")
-                current_start = current_end
-                continue
-            
-            logger.info(f"Collecting chunk: {current_start:%Y-%m-%d %H:%M} to {current_end:%Y-%m-%d %H:%M}")
-            
-            # Get flights for this chunk
-            flights = self.collector.get_airport_flights(airport, current_start, current_end)
-            all_flights.extend(flights)
+        Each 2-hour window is downloaded once and fanned out to every airport
+        that has not collected it yet, so the API cost does not grow with the
+        number of hubs.
+        
+        Args:
+            airports: ICAO airport codes
+            start_date: Start date
+            end_date: End date
+            year: Year being collected
+            month: Optional month being collected
             
-            # Save progress and data
-            collected_chunks.append(chunk_info)
-            self._save_progress(progress_file, collected_chunks)
-            self._save_flights(data_file, all_flights)
+        Returns:
+            Dictionary mapping each airport to its list of flight dictionaries
+        """
+        logger.info(f"Collecting historical data for {', '.join(airports)}")
+        logger.info(f"Period: {start_date:%Y-%m-%d %H:%M} to {end_date:%Y-%m-%d %H:%M}")
+        
+        # Load existing progress and recover each airport's segment
+        files = {}
+        for airport in airports:
+            segment, progress = self._open_segment(airport, year, month)
+            files[airport] = (segment, progress, self._get_progress_file(airport, year, month))
+        
+        # Find the 2-hour windows (as required by OpenSky API) still missing for any airport
+        window_size = timedelta(hours=2)
+        windows = sorted(set().union(*(
+            files[airport][1]['chunks'].missing_windows(start_date, end_date, window_size)
+            for airport in airports
+        )))
+        total_windows = -(-(end_date - start_date) // window_size)
+        logger.info(f"{total_windows - len(windows)} of {total_windows} chunks already collected")
+        
+        # Airports still needing each window, fixed when the window is scheduled
+        pending = {
+            window: [
+                airport for airport in airports
+                if not files[airport][1]['chunks'].contains(*window)
+            ]
+            for window in windows
+        }
+        
+        def fetch(current_start: datetime, current_end: datetime) -> Dict[str, List[Dict]]:
+            """Fetch one window for its pending airports (runs on a worker thread)."""
+            airports_pending = pending[(current_start, current_end)]
+            logger.info(f"Collecting chunk: {current_start:%Y-%m-%d %H:%M} to {current_end:%Y-%m-%d %H:%M} for {len(airports_pending)} airports")
+            return self.collector.get_flights_by_airport(airports_pending, current_start, current_end)
+        
+        # Windows missing for the most airports are worth the most per request,
+        # so they go first; results are written here in the calling thread
+        results = self.scheduler.run(
+            windows,
+            fetch,
+            priority=lambda window: (-len(pending[window]), window)
+        )
+        for (current_start, current_end), flights_by_airport in results:
+            # Append each airport's flights, then checkpoint its progress
+            for airport in pending[(current_start, current_end)]:
+                segment, progress, progress_file = files[airport]
+                progress['chunks'].add(current_start, current_end)
+                progress['segment_bytes'] = segment.append(flights_by_airport[airport])
+                self._save_progress(progress_file, progress)
             
-            logger.info(f"Found {len(flights)} Southwest flights")
-            logger.info(f"Total flights collected: {len(all_flights)}")
+            logger.info(f"Found {sum(len(flights) for flights in flights_by_airport.values())} Southwest flights")
             
-            # Move to next chunk
-            current_start = current_end
-            time.sleep(REQUEST_COOLDOWN)
+            # During a yearly run, publish each month as soon as it is fully collected;
+            # everything else is compacted once at the end of the run
+            for airport in pending[(current_start, current_end)]:
+                segment, progress, _ = files[airport]
+                closed = self._closed_months(progress, year, month, current_start, current_end)
+                if closed:
+                    self._compact_segment(segment, progress, airport, year, month, closed)
+                    logger.info(f"Compacted {airport} {year} months {closed}")
             
-        return all_flights
+        return {
+            airport: self._compact_segment(segment, progress, airport, year, month)
+            for airport, (segment, progress, _) in files.items()
+        }
         
-    def collect_2024_data(self, airport: str, month: Optional[int] = None) -> List[Dict]:
+    def missing_windows(
+        self,
+        airport: str,
+        year: int,
+        month: Optional[int] = None
+    ) -> List[Tuple[datetime, datetime]]:
         """
-        Collect flight data for 2024.
+        List the 2-hour windows of a period that have not been collected yet.
         
         Args:
-            airport: ICAO airport code to collect data for
-            month: Optional month number (1-12) to collect data for
+            airport: ICAO airport code
+            year: Year to check
+            month: Optional month to check
             
         Returns:
-            List of collected flight dictionaries
+            List of (start, end) windows in time order
         """
+        progress = self._load_progress(self._get_progress_file(airport, year, month))
+        start_date, end_date = self._collection_period(year, month)
+        return progress['chunks'].missing_windows(start_date, end_date, timedelta(hours=2))
+        
+    def _collection_period(self, year: int, month: Optional[int] = None) -> Tuple[datetime, datetime]:
+        """Return the (start, end) datetimes covering a year or one of its months."""
         if month:
-            start_date = datetime(2024, month, 1)
+            start_date = datetime(year, month, 1)
             if month == 12:
-                end_date = datetime(2025, 1, 1)
+                end_date = datetime(year + 1, 1, 1)
             else:
-                end_date = datetime(2024, month + 1, 1)
-            logger.info(f"Collecting flight data for {start_date:%B} 2024")
+                end_date = datetime(year, month + 1, 1)
         else:
-            start_date = datetime(2024, 1, 1)
-            end_date = datetime(2025, 1, 1)
-            logger.info("Collecting flight data for 2024")
-            
+            start_date = datetime(year, 1, 1)
+            end_date = datetime(year + 1, 1, 1)
+        return start_date, end_date
+        
+    def _log_period(self, start_date: datetime, end_date: datetime, month: Optional[int] = None):
+        """Log the period about to be collected."""
+        if month:
+            logger.info(f"Collecting flight data for {start_date:%B %Y}")
+        else:
+            logger.info(f"Collecting flight data for {start_date:%Y}")
         logger.info(f"Period: {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
         
+    def collect_2024_data(self, airport: str, month: Optional[int] = None) -> List[Dict]:
+        """
+        Collect flight data for 2024.
+        
+        Args:
+            airport: ICAO airport code to collect data for
+            month: Optional month number (1-12) to collect data for
+            
+        Returns:
+            List of collected flight dictionaries
+        """
+        start_date, end_date = self._collection_period(2024, month)
+        self._log_period(start_date, end_date, month)
         return self.collect_airport_history(
             airport,
             start_date,
@@ -158,6 +412,31 @@ class HistoricalDataCollector:
             2024,
             month
         )
+        
+    def collect_2024_hub_data(
+        self,
+        airports: Optional[List[str]] = None,
+        month: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Collect flight data for 2024 for several hubs with one request per window.
+        
+        Args:
+            airports: ICAO airport codes (defaults to all SWA_HUBS)
+            month: Optional month number (1-12) to collect data for
+            
+        Returns:
+            Dictionary mapping each airport to its collected flight dictionaries
+        """
+        start_date, end_date = self._collection_period(2024, month)
+        self._log_period(start_date, end_date, month)
+        return self.collect_hubs_history(
+            list(airports or SWA_HUBS),
+            start_date,
+            end_date,
+            2024,
+            month
+        )
 
 if __name__ == '__main__':
     # Configure logging
@@ -169,8 +448,7 @@ if __name__ == '__main__':
     # Start collection
     collector = HistoricalDataCollector()
     
-    # Collect data for each hub one at a time
-    for airport in SWA_HUBS:
-        logger.info(f"\nStarting collection for {airport} ({SWA_HUBS[airport]})")
-        flights = collector.collect_2024_data(airport, month=1)  # Start with January 2024
-        logger.info(f"Completed collection for {airport}: {len(flights)} total flights") 
\ No newline at end of file
+    # Collect data for all hubs, fetching each time window once
+    hub_flights = collector.collect_2024_hub_data(month=1)  # Start with January 2024
+    for airport, flights in hub_flights.items():
+        logger.info(f"Completed collection for {airport} ({SWA_HUBS[airport]}): {len(flights)} total flights")
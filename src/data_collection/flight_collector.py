@@ -4,23 +4,73 @@ Historical flight data collector for OpenSky Network.
 
 import logging
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Any, Dict, Iterable, List, Optional
 
 from src.data_collection.opensky_client import OpenSkyClient
+from src.data_collection.scheduler import RequestBudget
 
 logger = logging.getLogger(__name__)
 
 class FlightDataCollector:
     """Collects historical flight data from OpenSky Network."""
     
-    def __init__(self):
-        """Initialize the collector."""
-        self.client = OpenSkyClient()
+    def __init__(self, budget: Optional[RequestBudget] = None):
+        """
+        Initialize the collector.
+        
+        Args:
+            budget: Optional request budget shared with other collectors
+        """
+        self.client = OpenSkyClient(budget=budget)
     
     def _is_southwest_flight(self, callsign: str) -> bool:
         """Check if flight is operated by Southwest Airlines."""
         return callsign and callsign.startswith('SWA')
     
+    def get_flights_by_airport(
+        self,
+        airports: Iterable[str],
+        start_time: datetime,
+        end_time: datetime
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get Southwest Airlines flights for several airports from a single request.
+        
+        The /flights/all interval is downloaded once and partitioned by departure
+        and arrival airport in one pass, so collecting every hub costs one API
+        request per time window instead of one per hub.
+        
+        Args:
+            airports: ICAO airport codes
+            start_time: Start time
+            end_time: End time
+            
+        Returns:
+            Dictionary mapping each airport to its list of flight dictionaries
+        """
+        swa_flights = {airport: [] for airport in airports}
+        total_flights = dict.fromkeys(swa_flights, 0)
+        
+        # Get all flights in time range
+        all_flights = self.client.get_flights_in_time_range(start_time, end_time)
+        
+        for flight in all_flights:
+            departure = flight.get('estDepartureAirport')
+            arrival = flight.get('estArrivalAirport')
+            if departure not in swa_flights and arrival not in swa_flights:
+                continue
+            
+            is_southwest = self._is_southwest_flight(flight.get('callsign', ''))
+            for airport in (departure, arrival) if departure != arrival else (departure,):
+                if airport in swa_flights:
+                    total_flights[airport] += 1
+                    if is_southwest:
+                        swa_flights[airport].append(flight)
+        
+        for airport, flights in swa_flights.items():
+            logger.info(f"Found {total_flights[airport]} total flights and {len(flights)} Southwest flights at {airport}")
+        return swa_flights
+    
     def get_airport_flights(
         self,
         airport: str,
@@ -38,21 +88,4 @@ class FlightDataCollector:
         Returns:
             List of flight dictionaries
         """
-        # Get all flights in time range
-        all_flights = self.client.get_flights_in_time_range(start_time, end_time)
-        
-        # Filter for flights involving this airport
-        airport_flights = [
-            flight for flight in all_flights
-            if (flight.get('estDepartureAirport') == airport or 
-                flight.get('estArrivalAirport') == airport)
-        ]
-        
-        # Filter for Southwest Airlines flights
-        swa_flights = [
-            flight for flight in airport_flights
-            if self._is_southwest_flight(flight.get('callsign', ''))
-        ]
-        
-        logger.info(f"Found {len(airport_flights)} total flights and {len(swa_flights)} Southwest flights at {airport}")
-        return swa_flights 
\ No newline at end of file
+        return self.get_flights_by_airport([airport], start_time, end_time)[airport]
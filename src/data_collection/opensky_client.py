@@ -3,25 +3,29 @@ OpenSky Network API client for historical data collection.
 """
 
 import logging
-import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from opensky_api import OpenSkyApi
 
 from src.config.settings import (
     OPENSKY_USERNAME,
-    OPENSKY_PASSWORD,
-    REQUEST_COOLDOWN
+    OPENSKY_PASSWORD
 )
+from src.data_collection.scheduler import RequestBudget
 
 logger = logging.getLogger(__name__)
 
 class OpenSkyClient:
     """Client for retrieving historical flight data from OpenSky Network."""
     
-    def __init__(self):
-        """Initialize the OpenSky client."""
+    def __init__(self, budget: Optional[RequestBudget] = None):
+        """
+        Initialize the OpenSky client.
+        
+        Args:
+            budget: Request budget to draw from (shared between clients and threads)
+        """
         if OPENSKY_USERNAME and OPENSKY_PASSWORD:
             self.api = OpenSkyApi(OPENSKY_USERNAME, OPENSKY_PASSWORD)
             logger.info("Using authenticated access to OpenSky Network")
@@ -34,16 +38,11 @@ class OpenSkyClient:
                 "- Limited historical data access"
             )
             
-        self.last_request_time = 0
+        self.budget = budget or RequestBudget()
     
     def _wait_for_rate_limit(self):
-        """Respect rate limiting."""
-        time_since_last = time.time() - self.last_request_time
-        if time_since_last < REQUEST_COOLDOWN:
-            sleep_time = REQUEST_COOLDOWN - time_since_last
-            logger.debug(f"Rate limiting - waiting {sleep_time:.1f} seconds")
-            time.sleep(sleep_time)
-        self.last_request_time = time.time()
+        """Respect rate limiting by taking a token from the request budget."""
+        self.budget.acquire()
     
     def get_flights_in_time_range(
         self,
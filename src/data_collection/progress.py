@@ -0,0 +1,131 @@
+"""
+Interval index for tracking which time windows have been collected.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+
+class ChunkIndex:
+    """
+    Sorted set of collected time intervals.
+
+    Intervals are kept as parallel sorted lists of start and end times, and
+    overlapping or adjacent ranges are merged as they are added. A month of
+    contiguous collection is a single interval, membership checks are a binary
+    search, and the gaps that still need collecting can be listed directly.
+    """
+
+    def __init__(self, intervals: Optional[List[Interval]] = None):
+        """Initialize the index with optional (start, end) intervals."""
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        for start, end in intervals or []:
+            self.add(start, end)
+
+    def __len__(self) -> int:
+        """Return the number of merged intervals."""
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[Interval]:
+        """Iterate over merged intervals in time order."""
+        return iter(zip(self._starts, self._ends))
+
+    def add(self, start: datetime, end: datetime):
+        """Mark [start, end) as collected, merging with neighbouring intervals."""
+        if end <= start:
+            return
+        # Intervals that overlap or touch [start, end) are merged into one
+        first = bisect_left(self._ends, start)
+        last = bisect_right(self._starts, end)
+        if first < last:
+            start = min(start, self._starts[first])
+            end = max(end, self._ends[last - 1])
+        self._starts[first:last] = [start]
+        self._ends[first:last] = [end]
+
+    def contains(self, start: datetime, end: datetime) -> bool:
+        """Check whether [start, end) has been collected completely."""
+        i = bisect_right(self._starts, start) - 1
+        return i >= 0 and self._ends[i] >= end
+
+    def missing(self, start: datetime, end: datetime) -> List[Interval]:
+        """
+        Find the gaps in [start, end) that have not been collected.
+
+        Args:
+            start: Start of the period
+            end: End of the period
+
+        Returns:
+            List of (start, end) gaps in time order
+        """
+        gaps = []
+        cursor = start
+        i = max(bisect_right(self._starts, start) - 1, 0)
+        while cursor < end and i < len(self._starts):
+            if self._ends[i] <= cursor:
+                i += 1
+                continue
+            if self._starts[i] >= end:
+                break
+            if self._starts[i] > cursor:
+                gaps.append((cursor, self._starts[i]))
+            cursor = self._ends[i]
+            i += 1
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def missing_windows(
+        self,
+        start: datetime,
+        end: datetime,
+        step: timedelta = timedelta(hours=2)
+    ) -> List[Interval]:
+        """
+        List the fixed-size collection windows in [start, end) that are not complete.
+
+        Windows are aligned to ``start`` in multiples of ``step``, matching how the
+        collector walks a period, and the last window is clipped to ``end``.
+
+        Args:
+            start: Start of the period
+            end: End of the period
+            step: Window size
+
+        Returns:
+            List of (start, end) windows in time order
+        """
+        windows = []
+        for gap_start, gap_end in self.missing(start, end):
+            window_start = start + ((gap_start - start) // step) * step
+            if windows and windows[-1][0] == window_start:
+                window_start += step
+            while window_start < gap_end:
+                windows.append((window_start, min(window_start + step, end)))
+                window_start += step
+        return windows
+
+    def to_list(self) -> List[List[str]]:
+        """Serialize the index as a list of [start, end] ISO timestamps."""
+        return [[start.isoformat(), end.isoformat()] for start, end in self]
+
+    @classmethod
+    def from_list(cls, intervals: List[List[str]]) -> 'ChunkIndex':
+        """Load an index serialized with ``to_list``."""
+        return cls([
+            (datetime.fromisoformat(start), datetime.fromisoformat(end))
+            for start, end in intervals
+        ])
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict[str, str]]) -> 'ChunkIndex':
+        """Load an index from the legacy list of ``{"start", "end"}`` chunk records."""
+        return cls([
+            (datetime.fromisoformat(chunk['start']), datetime.fromisoformat(chunk['end']))
+            for chunk in chunks
+        ])
@@ -0,0 +1,178 @@
+"""
+Quota-aware scheduling of OpenSky requests.
+
+A token bucket owns the daily request quota from the settings: it refills
+continuously at MAX_REQUESTS_PER_DAY per day, keeps at least REQUEST_COOLDOWN
+seconds between request starts, and persists its remaining budget so restarts
+do not reset the quota. The fetch scheduler runs collection windows on a pool of
+worker threads so request latency overlaps while the bucket paces the starts.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from src.config.settings import MAX_REQUESTS_PER_DAY, REQUEST_COOLDOWN
+from src.data_collection.storage import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+Window = Tuple[datetime, datetime]
+
+
+class RequestBudget:
+    """Token bucket for the OpenSky daily request quota."""
+
+    def __init__(
+        self,
+        max_requests_per_day: int = MAX_REQUESTS_PER_DAY,
+        cooldown: float = REQUEST_COOLDOWN,
+        state_file: Optional[Path] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            max_requests_per_day: Bucket capacity and daily refill
+            cooldown: Minimum seconds between request starts
+            state_file: Optional file used to persist the budget across restarts
+            clock: Wall-clock time source (seconds)
+            sleep: Sleep function used while waiting for a token
+        """
+        self.capacity = float(max_requests_per_day)
+        self.refill_rate = max_requests_per_day / SECONDS_PER_DAY
+        self.cooldown = cooldown
+        self.state_file = Path(state_file) if state_file else None
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._next_start = 0.0
+        self._load_state()
+
+    def _load_state(self):
+        """Restore the persisted budget, refilled for the time spent offline."""
+        if not self.state_file or not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+            self._tokens = min(self.capacity, float(state['tokens']))
+            self._updated = float(state['updated'])
+            self._next_start = float(state.get('last_request', 0.0)) + self.cooldown
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable request budget {self.state_file}: {e}")
+
+    def _save_state(self):
+        """Persist the current budget."""
+        if self.state_file:
+            atomic_write_json(self.state_file, {
+                'tokens': self._tokens,
+                'updated': self._updated,
+                'last_request': self._next_start - self.cooldown
+            })
+
+    def _refill(self, now: float):
+        """Add the tokens accrued since the last update."""
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+            self._updated = now
+
+    @property
+    def remaining(self) -> float:
+        """Number of requests currently available."""
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available and the cooldown has passed.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds to wait before retrying
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            wait_time = max(self._next_start - now, (1 - self._tokens) / self.refill_rate, 0.0)
+            if wait_time > 0:
+                return wait_time
+            self._tokens -= 1
+            self._next_start = now + self.cooldown
+            self._save_state()
+            return 0.0
+
+    def acquire(self):
+        """Block until a request may be made, then take a token."""
+        while True:
+            wait_time = self.try_acquire()
+            if not wait_time:
+                return
+            logger.debug(f"Rate limiting - waiting {wait_time:.1f} seconds")
+            self._sleep(wait_time)
+
+
+class FetchScheduler:
+    """Runs collection windows on a worker pool paced by a request budget."""
+
+    def __init__(self, budget: RequestBudget, workers: int = 4):
+        """
+        Initialize the scheduler.
+
+        Args:
+            budget: Request budget shared with the API client
+            workers: Number of concurrent fetch workers
+        """
+        self.budget = budget
+        self.workers = workers
+
+    def run(
+        self,
+        windows: Iterable[Window],
+        fetch: Callable[[datetime, datetime], Any],
+        priority: Optional[Callable[[Window], Any]] = None
+    ) -> Iterator[Tuple[Window, Any]]:
+        """
+        Fetch windows concurrently, yielding results as they complete.
+
+        Only ``workers`` windows are in flight at a time, so windows are started in
+        priority order as budget becomes available rather than all queued up front.
+        Results are yielded in the calling thread, which can write them safely.
+
+        Args:
+            windows: (start, end) windows to fetch
+            fetch: Function called with (start, end) on a worker thread
+            priority: Optional sort key; windows with lower keys are fetched first
+
+        Returns:
+            Iterator of ((start, end), result) pairs in completion order
+        """
+        queue = sorted(windows, key=priority) if priority else list(windows)
+        queue.reverse()
+        logger.info(
+            f"Scheduling {len(queue)} windows on {self.workers} workers "
+            f"({self.budget.remaining:.0f} requests available)"
+        )
+
+        in_flight: Dict[Future, Window] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while queue or in_flight:
+                while queue and len(in_flight) < self.workers:
+                    window = queue.pop()
+                    in_flight[executor.submit(fetch, *window)] = window
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window = in_flight.pop(future)
+                    yield window, future.result()
@@ -0,0 +1,89 @@
+"""
+Crash-safe file storage for collected flight data.
+
+Flights are appended to a JSON Lines segment and fsynced before the collection
+progress is checkpointed, so each chunk only writes its own records. Checkpoints
+and compacted files are written to a temporary file and atomically renamed into
+place, so a crash never leaves a half-written file behind.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = None):
+    """
+    Write JSON to a file atomically.
+
+    Args:
+        path: Destination file
+        data: JSON-serializable content
+        indent: Optional indentation for human-readable output
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class FlightSegment:
+    """Append-only JSON Lines file of flight records."""
+
+    def __init__(self, path: Path):
+        """Initialize the segment at the given path."""
+        self.path = Path(path)
+
+    def size(self) -> int:
+        """Return the current size of the segment in bytes."""
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def append(self, flights: List[Dict]) -> int:
+        """
+        Append flights and flush them to disk.
+
+        Args:
+            flights: Flight dictionaries to append
+
+        Returns:
+            Size of the segment after the append, to be recorded in the checkpoint
+        """
+        with open(self.path, 'ab') as f:
+            if flights:
+                f.write(b''.join(
+                    json.dumps(flight, separators=(',', ':')).encode('utf-8') + b'\n'
+                    for flight in flights
+                ))
+                f.flush()
+                os.fsync(f.fileno())
+            return f.tell()
+
+    def truncate(self, size: int):
+        """Discard everything after ``size`` bytes (an uncommitted tail)."""
+        with open(self.path, 'r+b') as f:
+            f.truncate(size)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self, size: Optional[int] = None) -> List[Dict]:
+        """
+        Read flights from the segment.
+
+        Args:
+            size: Only read the first ``size`` bytes (the committed part)
+
+        Returns:
+            List of flight dictionaries
+        """
+        if not self.path.exists():
+            return []
+        with open(self.path, 'rb') as f:
+            data = f.read() if size is None else f.read(size)
+        return [json.loads(line) for line in data.splitlines() if line.strip()]
@@ -1,17 +1,89 @@
+import argparse
+import calendar
 import json
 import os
+import re
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import pandas as pd
 import numpy as np
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from src.data.dataset import consumption_dataset, flight_dataset
+from src.data_collection.storage import atomic_write_json
+from src.data_processing.fleet_registry import AIRCRAFT_CAPACITY, SOUTHWEST_FLEET, FleetRegistry
+
+logger = logging.getLogger(__name__)
+
+class GeneratorDiagnostics:
+    """
+    Per-run counters for the consumption generator.
+
+    Flights are counted in bulk from each generated frame and summarized once at
+    the end of a run, instead of logging a line per flight.
+    """
+
+    # Load factor histogram bin edges; values outside are counted in the end bins
+    LOAD_FACTOR_BINS = np.linspace(0.60, 1.10, 11)
+
+    def __init__(self):
+        self.flights = 0
+        self.non_southwest = 0
+        self.missing_icao24 = 0
+        self.unknown_prefixes = Counter()
+        self.fleet_mix = Counter()
+        self.load_factor_counts = np.zeros(len(self.LOAD_FACTOR_BINS) - 1, dtype=np.int64)
+
+    def record_frame(self, frame: pd.DataFrame, unknown_prefixes: pd.Series, missing_icao24: int):
+        """Add the flights of a generated consumption frame to the counters."""
+        self.flights += len(frame)
+        self.missing_icao24 += missing_icao24
+        self.unknown_prefixes.update(unknown_prefixes.value_counts().to_dict())
+        self.fleet_mix.update(frame['aircraft_type'].value_counts().to_dict())
+        load_factor = np.clip(frame['load_factor'].to_numpy(dtype=np.float64),
+                              self.LOAD_FACTOR_BINS[0], self.LOAD_FACTOR_BINS[-1])
+        self.load_factor_counts += np.histogram(load_factor, self.LOAD_FACTOR_BINS)[0]
+
+    def merge(self, other: 'GeneratorDiagnostics'):
+        """Add the counters of another run, e.g. from a worker process."""
+        self.flights += other.flights
+        self.non_southwest += other.non_southwest
+        self.missing_icao24 += other.missing_icao24
+        self.unknown_prefixes.update(other.unknown_prefixes)
+        self.fleet_mix.update(other.fleet_mix)
+        self.load_factor_counts += other.load_factor_counts
+
+    def summary(self) -> Dict:
+        """Return the counters as a JSON-serializable dictionary."""
+        edges = self.LOAD_FACTOR_BINS
+        return {
+            'flights': self.flights,
+            'non_southwest': self.non_southwest,
+            'missing_icao24': self.missing_icao24,
+            'unknown_prefixes': dict(self.unknown_prefixes.most_common()),
+            'fleet_mix': dict(self.fleet_mix.most_common()),
+            'load_factor_histogram': {
+                f"{low:.2f}-{high:.2f}": int(count)
+                for low, high, count in zip(edges[:-1], edges[1:], self.load_factor_counts)
+            }
+        }
+
+    def log(self):
+        """Log the run summary."""
+        summary = self.summary()
+        logger.info(f"Generated {summary['flights']} Southwest flights "
+                    f"({summary['non_southwest']} non-Southwest flights filtered out)")
+        logger.info(f"Fleet mix: {summary['fleet_mix']}")
+        if summary['unknown_prefixes'] or summary['missing_icao24']:
+            logger.warning(f"Default B737 capacity used for {summary['missing_icao24']} flights without ICAO24 "
+                           f"and {sum(summary['unknown_prefixes'].values())} with unknown prefixes: "
+                           f"{summary['unknown_prefixes']}")
+        logger.info(f"Load factor histogram: {summary['load_factor_histogram']}")
+
 
 class BeverageDataGenerator:
     # Southwest Airlines identifier
@@ -36,17 +108,7 @@ class BeverageDataGenerator:
     BUSINESS_ROUTES = [('KBWI', 'KMDW'), ('KDCA', 'KORD')]  # Example business routes
 
     # Aircraft capacities
-    AIRCRAFT_CAPACITY = {
-        # Southwest Airlines fleet types
-        'B737': 143,     # Base 737 assumption if specific variant unknown
-        'B737-700': 143,
-        'B737-800': 175,
-        'B737-MAX8': 175,
-        'B738': 175,     # 737-800 code
-        'B737M8': 175,   # 737 MAX 8 code
-        'B737-7': 143,   # 737-700 code
-        'B737-8': 175    # Another 737-800 code
-    }
+    AIRCRAFT_CAPACITY = AIRCRAFT_CAPACITY
 
     # Load factor variations
     LOAD_FACTOR_BASE = 0.85  # Base load factor
@@ -87,31 +149,54 @@ class BeverageDataGenerator:
     }
 
     # Aircraft type mapping
-    SOUTHWEST_FLEET = {
-        # Known ICAO24 prefixes for Southwest Airlines aircraft
-        # Format: prefix: (aircraft_type, description)
-        'A1B': ('B737-700', '737-700 from AirTran acquisition'),
-        'ABF': ('B737-700', 'Original Southwest 737-700s'),
-        'AAL': ('B737-800', 'Southwest 737-800s'),
-        'AE1': ('B737M8', '737 MAX 8 new deliveries'),
-        'AD9': ('B737-700', 'Southwest 737-700s'),
-        'AC7': ('B737-700', 'Southwest 737-700s'),
-        'AB7': ('B737-700', 'Southwest 737-700s'),
-        'ADF': ('B737-800', 'Southwest 737-800s'),
-        'AE8': ('B737M8', '737 MAX 8'),
-        'AF1': ('B737M8', '737 MAX 8'),
-        'A12': ('B737-800', 'Southwest 737-800s'),
-        'A13': ('B737-800', 'Southwest 737-800s'),
-        'A78': ('B737-700', 'Southwest 737-700s')
-    }
+    SOUTHWEST_FLEET = SOUTHWEST_FLEET
 
-    def __init__(self, data_dir: str):
-        """Initialize the generator with path to flight data directory."""
-        self.data_dir = data_dir
+    # Flight columns read from the dataset
+    FLIGHT_COLUMNS = ['callsign', 'icao24', 'firstSeen', 'lastSeen', 'estDepartureAirport', 'estArrivalAirport']
+
+    # Legacy monthly flight files, e.g. KLAS_2024_01_flights.json
+    FLIGHT_FILE_PATTERN = re.compile(r'^([A-Z0-9]{3,4})_(\d{4})_(\d{2})_flights\.json$')
+
+    def __init__(self, data_dir: str, trace_sample_rate: float = 0.0,
+                 fleet_registry: Optional[FleetRegistry] = None):
+        """
+        Initialize the generator with path to flight data directory.
 
-    def load_flight_data(self, airport_code: str) -> List[Dict]:
-        """Load flight data for a specific airport."""
-        filepath = os.path.join(self.data_dir, f"{airport_code}_2024_01_flights.json")
+        Args:
+            data_dir: Directory containing the collected flight files
+            trace_sample_rate: Fraction of generated flights to trace at DEBUG level
+            fleet_registry: ICAO24 fleet registry (defaults to the built-in Southwest fleet)
+        """
+        self.data_dir = data_dir
+        self.flights = flight_dataset(data_dir)
+        self.consumption = consumption_dataset(data_dir)
+        self.fleet_registry = fleet_registry or FleetRegistry.default()
+        self.trace_sample_rate = trace_sample_rate
+        self.diagnostics = GeneratorDiagnostics()
+
+    def find_flight_files(self) -> List[Tuple[str, int, int]]:
+        """List the (airport, year, month) of every flight dataset partition and legacy monthly file."""
+        files = set(self.flights.partitions())
+        if os.path.isdir(self.data_dir):
+            for name in os.listdir(self.data_dir):
+                match = self.FLIGHT_FILE_PATTERN.match(name)
+                if match:
+                    files.add((match.group(1), int(match.group(2)), int(match.group(3))))
+        return sorted(files)
+
+    def load_flight_frame(self, airport_code: str, year: int = 2024, month: int = 1) -> pd.DataFrame:
+        """Load the flight columns needed for generation for a specific airport and month."""
+        if self.flights.has_partition(airport_code, year, month):
+            return self.flights.read_partition(airport_code, year, month, columns=self.FLIGHT_COLUMNS)
+        return pd.DataFrame(self.load_flight_data(airport_code, year, month))
+
+    def load_flight_data(self, airport_code: str, year: int = 2024, month: int = 1) -> List[Dict]:
+        """Load flight data for a specific airport and month."""
+        if self.flights.has_partition(airport_code, year, month):
+            path = self.flights.partition_path(airport_code, year, month)
+            return self.flights.read_file(path).to_pylist()
+
+        filepath = os.path.join(self.data_dir, f"{airport_code}_{year}_{month:02d}_flights.json")
         if not os.path.exists(filepath):
             return []
         
@@ -152,35 +237,13 @@ class BeverageDataGenerator:
 
     def get_aircraft_type_from_icao24(self, icao24: str) -> Optional[str]:
         """Get aircraft type from ICAO24 code."""
-        if not icao24:
-            logging.info("No ICAO24 code provided")
-            return None
-            
-        # Convert to uppercase for consistency
-        icao24 = icao24.upper()
-        
-        # Try to match the first three characters against known Southwest fleet
-        prefix = icao24[:3]
-        if prefix in self.SOUTHWEST_FLEET:
-            aircraft_type, description = self.SOUTHWEST_FLEET[prefix]
-            logging.info(f"Identified aircraft {icao24} as {aircraft_type} ({description})")
-            return aircraft_type
-            
-        logging.warning(f"Unknown aircraft type for ICAO24 {icao24}")
-        return None
+        aircraft_type = self.fleet_registry.aircraft_type(icao24)
+        logger.debug("Aircraft type for ICAO24 %s: %s", icao24, aircraft_type)
+        return aircraft_type
 
     def get_aircraft_capacity(self, icao24: str) -> int:
         """Get aircraft capacity based on ICAO24 code."""
-        if not icao24:
-            logging.info("No ICAO24 code provided, using default B737 capacity")
-            return self.AIRCRAFT_CAPACITY['B737']
-            
-        aircraft_type = self.get_aircraft_type_from_icao24(icao24)
-        if aircraft_type and aircraft_type in self.AIRCRAFT_CAPACITY:
-            return self.AIRCRAFT_CAPACITY[aircraft_type]
-            
-        logging.warning(f"Using default B737 capacity for ICAO24 {icao24}")
-        return self.AIRCRAFT_CAPACITY['B737']
+        return self.fleet_registry.capacity(icao24)
 
     def calculate_load_factor(self, flight_data: Dict) -> float:
         """Calculate load factor based on various factors."""
@@ -211,124 +274,332 @@ class BeverageDataGenerator:
 
         return base_factor * modifiers
 
-    def generate_consumption_data(self, flight_data: Dict) -> Dict:
-        """Generate synthetic beverage consumption data for a flight."""
-        duration = self.calculate_flight_duration(flight_data['firstSeen'], flight_data['lastSeen'])
-        category = self.get_flight_category(duration)
-        base_rate = self.FLIGHT_DURATION_RATES[category]
-        
-        # Apply time modifiers
-        time_mods = self.get_time_modifiers(flight_data['firstSeen'])
-        
-        # Get aircraft type and capacity
-        aircraft_type = None
-        if 'icao24' in flight_data:
-            aircraft_type = self.get_aircraft_type_from_icao24(flight_data['icao24'])
-        
-        # Calculate estimated passengers using aircraft type and dynamic load factor
-        aircraft_capacity = self.get_aircraft_capacity(flight_data.get('icao24'))
-        load_factor = self.calculate_load_factor(flight_data)
-        estimated_passengers = int(aircraft_capacity * load_factor)
-        
-        # Log capacity and passenger estimates
-        logging.info(f"Flight {flight_data.get('callsign', 'unknown')}: "
-                    f"Aircraft Type: {aircraft_type or 'B737'}, "
-                    f"Capacity: {aircraft_capacity}, "
-                    f"Est. Passengers: {estimated_passengers} "
-                    f"(Load Factor: {load_factor:.2%})")
-        
-        # Generate consumption data for each beverage type
-        consumption = {}
-        for category, beverages in self.BEVERAGE_DISTRIBUTION.items():
-            category_modifier = 1.0
-            
-            # Apply time-based modifiers
-            if category in time_mods:
-                category_modifier *= time_mods[category]
-            
-            # Apply route-based modifiers
-            if (category == 'alcoholic' and 
-                self.is_vacation_route(flight_data['estDepartureAirport'], 
-                                    flight_data['estArrivalAirport'])):
-                category_modifier *= 1.25
-            
-            if (category == 'hot_beverages' and 
-                self.is_business_route(flight_data['estDepartureAirport'], 
-                                     flight_data['estArrivalAirport'])):
-                category_modifier *= 1.15
-
-            for beverage, percentage in beverages.items():
-                base_consumption = estimated_passengers * base_rate * percentage * category_modifier
-                # Add some random variation (±10%)
-                variation = np.random.uniform(0.9, 1.1)
-                consumption[beverage] = round(base_consumption * variation)
-
+    # Local-time offsets only change on quarter-hour boundaries in practice
+    LOCAL_TIME_BUCKET = 15 * 60
+
+    def _local_time_fields(self, timestamps: np.ndarray) -> Dict[str, np.ndarray]:
+        """Get local hour, weekday and month for Unix timestamps, as datetime.fromtimestamp would."""
+        buckets, inverse = np.unique(timestamps // self.LOCAL_TIME_BUCKET, return_inverse=True)
+        offsets = np.array([
+            calendar.timegm(datetime.fromtimestamp(int(bucket) * self.LOCAL_TIME_BUCKET).timetuple())
+            - int(bucket) * self.LOCAL_TIME_BUCKET
+            for bucket in buckets
+        ], dtype=np.int64)
+        local = timestamps + offsets[inverse.reshape(-1)]
+        days = local // 86400
         return {
-            'flight_number': flight_data['callsign'],
-            'departure': flight_data['estDepartureAirport'],
-            'arrival': flight_data['estArrivalAirport'],
-            'timestamp': flight_data['firstSeen'],
+            'hour': (local // 3600) % 24,
+            'weekday': (days + 3) % 7,  # 1970-01-01 was a Thursday
+            'month': days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) % 12 + 1
+        }
+
+    def generate_consumption_frame(self, flights: pd.DataFrame,
+                                   random_state: Optional[int] = None) -> pd.DataFrame:
+        """
+        Generate synthetic beverage consumption for many flights at once.
+
+        Applies the same rules as ``generate_consumption_data`` with array operations
+        over the whole frame instead of one flight at a time.
+
+        Args:
+            flights: Raw OpenSky flights with callsign, icao24, firstSeen, lastSeen,
+                estDepartureAirport and estArrivalAirport columns
+            random_state: Optional seed for the consumption variation; the global
+                NumPy random state is used when omitted
+
+        Returns:
+            DataFrame with one row per flight: flight details, estimated passengers,
+            load factor and one integer column per beverage
+        """
+        n = len(flights)
+        first_seen = flights['firstSeen'].to_numpy(dtype=np.int64)
+        last_seen = flights['lastSeen'].to_numpy(dtype=np.int64)
+        origin = flights['estDepartureAirport']
+        destination = flights['estArrivalAirport']
+
+        duration = (last_seen - first_seen) / 3600
+        base_rate = np.select(
+            [duration < 2, duration < 4],
+            [self.FLIGHT_DURATION_RATES['short'], self.FLIGHT_DURATION_RATES['medium']],
+            self.FLIGHT_DURATION_RATES['long']
+        )
+
+        local = self._local_time_fields(first_seen)
+        hour = local['hour']
+        is_morning = (hour >= 6) & (hour < 10)
+        is_evening = (hour >= 18) & (hour < 23)
+        is_red_eye = (hour >= 23) | (hour < 6)
+
+        is_vacation = (origin.isin(self.VACATION_AIRPORTS) | destination.isin(self.VACATION_AIRPORTS)).to_numpy()
+        routes = pd.MultiIndex.from_arrays([origin, destination])
+        business_routes = self.BUSINESS_ROUTES + [(b, a) for a, b in self.BUSINESS_ROUTES]
+        is_business = routes.isin(business_routes)
+
+        # Aircraft type from the fleet registry, defaulting to a base 737
+        icao24 = flights['icao24'] if 'icao24' in flights else pd.Series([None] * n, index=flights.index, dtype=object)
+        registry = self.fleet_registry
+        type_ids = registry.lookup(icao24.tolist())
+        known = type_ids >= 0
+        aircraft_type = np.where(known, registry.types[type_ids], registry.default_type)
+        capacity = np.where(known, registry.type_capacity[type_ids], registry.default_capacity)
+
+        prefixes = icao24.fillna('').astype(str).str.upper().str[:3]
+        has_icao24 = (prefixes != '').to_numpy()
+        is_unknown = has_icao24 & ~known
+
+        modifiers = self.LOAD_FACTOR_MODIFIERS
+        load_factor = self.LOAD_FACTOR_BASE * (
+            np.where(local['weekday'] >= 5, modifiers['weekend'], 1.0)
+            * np.where((local['month'] >= 6) & (local['month'] <= 8), modifiers['summer'], 1.0)
+            * np.where(is_vacation, modifiers['vacation_route'],
+                       np.where(is_business, modifiers['business_route'], 1.0))
+            * np.where(is_red_eye, modifiers['red_eye'], 1.0)
+        )
+        estimated_passengers = (capacity * load_factor).astype(np.int64)
+
+        # Per-flight multiplier for each category, then expand to its beverages
+        category_modifiers = {}
+        for category in self.BEVERAGE_DISTRIBUTION:
+            modifier = np.ones(n)
+            for period, mask in (('morning', is_morning), ('evening', is_evening), ('red_eye', is_red_eye)):
+                if category in self.TIME_MODIFIERS[period]:
+                    modifier = np.where(mask, modifier * self.TIME_MODIFIERS[period][category], modifier)
+            if category == 'alcoholic':
+                modifier = np.where(is_vacation, modifier * 1.25, modifier)
+            if category == 'hot_beverages':
+                modifier = np.where(is_business, modifier * 1.15, modifier)
+            category_modifiers[category] = modifier
+
+        beverages = [
+            (beverage, category, percentage)
+            for category, items in self.BEVERAGE_DISTRIBUTION.items()
+            for beverage, percentage in items.items()
+        ]
+        percentages = np.array([percentage for _, _, percentage in beverages])
+        modifier_matrix = np.column_stack([category_modifiers[category] for _, category, _ in beverages])
+        shape = (n, len(beverages))
+        if random_state is None:
+            variation = np.random.uniform(0.9, 1.1, size=shape)
+        else:
+            variation = np.random.default_rng(random_state).uniform(0.9, 1.1, size=shape)
+        quantities = np.rint(
+            (estimated_passengers * base_rate)[:, None] * percentages * modifier_matrix * variation
+        ).astype(np.int64)
+
+        frame = pd.DataFrame({
+            'flight_number': flights['callsign'].to_numpy(),
+            'departure': origin.to_numpy(),
+            'arrival': destination.to_numpy(),
+            'timestamp': first_seen,
             'duration': duration,
-            'aircraft_type': aircraft_type or 'B737',
-            'aircraft_icao24': flight_data.get('icao24', 'unknown'),
+            'aircraft_type': aircraft_type.astype(object),
+            'aircraft_icao24': icao24.astype(object).where(icao24.notna(), 'unknown').to_numpy(),
             'estimated_passengers': estimated_passengers,
-            'load_factor': round(load_factor, 3),
-            'consumption': consumption
-        }
+            'load_factor': [round(value, 3) for value in load_factor.tolist()]
+        }, index=flights.index)
+        for i, (beverage, _, _) in enumerate(beverages):
+            frame[beverage] = quantities[:, i]
+
+        self.diagnostics.record_frame(
+            frame,
+            unknown_prefixes=prefixes[is_unknown],
+            missing_icao24=int((~has_icao24).sum())
+        )
+        self._trace_sample(frame)
+        return frame
+
+    def _trace_sample(self, frame: pd.DataFrame):
+        """Log a random sample of generated flights at DEBUG level when tracing is enabled."""
+        if not self.trace_sample_rate or frame.empty or not logger.isEnabledFor(logging.DEBUG):
+            return
+        sample = frame.sample(frac=min(self.trace_sample_rate, 1.0))
+        for row in sample.itertuples(index=False):
+            logger.debug(
+                "Flight %s: Aircraft Type: %s, Est. Passengers: %d (Load Factor: %.2f%%)",
+                row.flight_number, row.aircraft_type, row.estimated_passengers, row.load_factor * 100
+            )
+
+    def consumption_records(self, frame: pd.DataFrame) -> List[Dict]:
+        """Convert a consumption frame into the per-flight record format saved to JSON."""
+        beverages = [
+            beverage for items in self.BEVERAGE_DISTRIBUTION.values() for beverage in items
+        ]
+        fields = [column for column in frame.columns if column not in beverages]
+        field_values = [frame[column].tolist() for column in fields]
+        quantities = frame[beverages].to_numpy().tolist()
+        return [
+            {**dict(zip(fields, values)), 'consumption': dict(zip(beverages, row))}
+            for values, row in zip(zip(*field_values), quantities)
+        ]
+
+    def generate_consumption_data(self, flight_data: Dict) -> Dict:
+        """Generate synthetic beverage consumption data for a flight."""
+        flights = pd.DataFrame([flight_data])
+        return self.consumption_records(self.generate_consumption_frame(flights))[0]
 
     def is_southwest_flight(self, flight_data: Dict) -> bool:
         """Check if the flight is operated by Southwest Airlines."""
         if not flight_data.get('callsign'):
-            logging.warning("No callsign found in flight data")
             return False
             
         return flight_data['callsign'].startswith(self.SWA_CALLSIGN_PREFIX)
 
-    def process_airport_data(self, airport_code: str) -> List[Dict]:
-        """Process all flights for a specific airport."""
-        flights = self.load_flight_data(airport_code)
-        southwest_flights = []
-        other_flights = 0
+    def process_airport_frame(self, airport_code: str, year: int = 2024, month: int = 1) -> pd.DataFrame:
+        """Generate the consumption frame for all Southwest flights of an airport and month."""
+        flights = self.load_flight_frame(airport_code, year, month)
+        if flights.empty:
+            logger.debug(f"{airport_code}: Found 0 Southwest flights and filtered out 0 non-Southwest flights")
+            return self.generate_consumption_frame(pd.DataFrame(columns=self.FLIGHT_COLUMNS))
         
-        for flight in flights:
-            if self.is_southwest_flight(flight):
-                southwest_flights.append(self.generate_consumption_data(flight))
-            else:
-                other_flights += 1
+        is_southwest = flights['callsign'].fillna('').str.startswith(self.SWA_CALLSIGN_PREFIX)
+        frame = self.generate_consumption_frame(flights[is_southwest])
+        other_flights = int((~is_southwest).sum())
+        self.diagnostics.non_southwest += other_flights
         
-        logging.info(f"{airport_code}: Found {len(southwest_flights)} Southwest flights "
-                    f"and filtered out {other_flights} non-Southwest flights")
+        logger.debug(f"{airport_code}: Found {len(frame)} Southwest flights "
+                     f"and filtered out {other_flights} non-Southwest flights")
         
-        return southwest_flights
+        return frame
+
+    def process_airport_data(self, airport_code: str, year: int = 2024, month: int = 1) -> List[Dict]:
+        """Process all flights for a specific airport and month."""
+        return self.consumption_records(self.process_airport_frame(airport_code, year, month))
+
+    def save_consumption_data(self, airport_code: str, consumption_data: List[Dict],
+                              year: Optional[int] = None, month: Optional[int] = None) -> str:
+        """
+        Atomically save generated consumption data to file.
 
-    def save_consumption_data(self, airport_code: str, consumption_data: List[Dict]):
-        """Save generated consumption data to file."""
+        Files are named per airport, or per airport and month when year and month
+        are given, so a crashed run never leaves a truncated output behind.
+
+        Returns:
+            Path of the written file
+        """
         output_dir = os.path.join(self.data_dir, 'consumption')
         os.makedirs(output_dir, exist_ok=True)
         
-        output_file = os.path.join(output_dir, f"{airport_code}_consumption.json")
-        with open(output_file, 'w') as f:
-            json.dump(consumption_data, f, indent=2)
+        if year and month:
+            filename = f"{airport_code}_{year}_{month:02d}_consumption.json"
+        else:
+            filename = f"{airport_code}_consumption.json"
+        output_file = os.path.join(output_dir, filename)
+        atomic_write_json(output_file, consumption_data, indent=2)
+        return output_file
+
+    def save_consumption_frame(self, airport_code: str, frame: pd.DataFrame, year: int, month: int) -> str:
+        """Atomically write a consumption frame to its partition of the consumption dataset."""
+        return str(self.consumption.write_partition(frame, airport_code, year, month))
+
+def process_flight_file(data_dir: str, airport_code: str, year: int, month: int,
+                        trace_sample_rate: float = 0.0, fleet_registry_path: Optional[str] = None) -> Dict:
+    """
+    Generate consumption for one airport-month and write it to the consumption dataset.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+
+    Returns:
+        Dictionary with the file's airport, year, month, Southwest flight count,
+        processing time in seconds, the worker's pid and its diagnostics
+    """
+    start = time.perf_counter()
+    generator = BeverageDataGenerator(
+        data_dir, trace_sample_rate, FleetRegistry.load_or_default(fleet_registry_path)
+    )
+    frame = generator.process_airport_frame(airport_code, year, month)
+    if not frame.empty:
+        generator.save_consumption_frame(airport_code, frame, year, month)
+    return {
+        'airport': airport_code,
+        'year': year,
+        'month': month,
+        'flights': len(frame),
+        'seconds': time.perf_counter() - start,
+        'pid': os.getpid(),
+        'diagnostics': generator.diagnostics
+    }
 
-def main():
+
+def generate_all(data_dir: str, airports: Optional[Sequence[str]] = None,
+                 workers: Optional[int] = None, trace_sample_rate: float = 0.0,
+                 fleet_registry_path: Optional[str] = None) -> List[Dict]:
+    """
+    Generate consumption data for every airport-month file in a data directory.
+
+    Each file is one task on a process pool. Throughput is logged per worker
+    and the generator diagnostics once all files are done.
+
+    Args:
+        data_dir: Directory containing ``{AIRPORT}_{YYYY}_{MM}_flights.json`` files
+        airports: Optional airport codes to restrict processing to
+        workers: Number of worker processes (defaults to the CPU count)
+        trace_sample_rate: Fraction of flights to trace at DEBUG level
+        fleet_registry_path: Optional fleet registry (.npz or .csv) to use instead of the built-in fleet
+
+    Returns:
+        List of per-file results from ``process_flight_file``
+    """
+    files = BeverageDataGenerator(data_dir).find_flight_files()
+    if airports:
+        airports = set(airports)
+        files = [f for f in files if f[0] in airports]
+    if not files:
+        logger.warning(f"No flight files found in {data_dir}")
+        return []
+
+    logger.info(f"Processing {len(files)} flight files with {workers or os.cpu_count()} workers")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_flight_file, data_dir, *f, trace_sample_rate, fleet_registry_path)
+                   for f in files]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            logger.debug(f"{result['airport']} {result['year']}-{result['month']:02d}: "
+                         f"{result['flights']} Southwest flights in {result['seconds']:.2f}s")
+    elapsed = time.perf_counter() - start
+
+    diagnostics = GeneratorDiagnostics()
+    for result in results:
+        diagnostics.merge(result['diagnostics'])
+    diagnostics.log()
+
+    per_worker = defaultdict(lambda: [0, 0.0])
+    for result in results:
+        per_worker[result['pid']][0] += result['flights']
+        per_worker[result['pid']][1] += result['seconds']
+    for pid, (flights, seconds) in sorted(per_worker.items()):
+        logger.info(f"Worker {pid}: {flights} flights in {seconds:.2f}s "
+                     f"({flights / seconds if seconds else 0:.0f} flights/s)")
+    total_flights = sum(result['flights'] for result in results)
+    logger.info(f"Total Southwest flights processed: {total_flights} in {elapsed:.2f}s "
+                 f"({total_flights / elapsed if elapsed else 0:.0f} flights/s overall)")
+    return sorted(results, key=lambda result: (result['airport'], result['year'], result['month']))
+
+
+def main(argv: Optional[Sequence[str]] = None):
     """Main function to generate beverage consumption data."""
-    generator = BeverageDataGenerator('data/historical')
-    
-    # Process each airport's data
-    airports = ['KATL', 'KBWI', 'KAUS']  # Add more airports as needed
-    total_southwest_flights = 0
-    
-    for airport in airports:
-        logging.info(f"\nProcessing {airport}...")
-        consumption_data = generator.process_airport_data(airport)
-        if consumption_data:
-            generator.save_consumption_data(airport, consumption_data)
-            total_southwest_flights += len(consumption_data)
-            logging.info(f"Generated consumption data for {len(consumption_data)} Southwest flights at {airport}")
-        else:
-            logging.warning(f"No Southwest Airlines flights found for {airport}")
-    
-    logging.info(f"\nTotal Southwest flights processed: {total_southwest_flights}")
+    parser = argparse.ArgumentParser(description="Generate synthetic beverage consumption data")
+    parser.add_argument('--data-dir', default='data/historical',
+                        help="Directory containing the collected flight files")
+    parser.add_argument('--airports', nargs='+',
+                        help="Only process these airports (default: every airport found)")
+    parser.add_argument('--workers', type=int,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument('--trace-sample', type=float, default=0.0,
+                        help="Fraction of flights to log individually at DEBUG level")
+    parser.add_argument('--fleet-registry',
+                        help="Fleet registry (.npz or .csv) mapping ICAO24 codes to aircraft types")
+    args = parser.parse_args(argv)
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.DEBUG if args.trace_sample else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    generate_all(args.data_dir, args.airports, args.workers, args.trace_sample, args.fleet_registry)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
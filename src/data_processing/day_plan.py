@@ -0,0 +1,299 @@
+"""
+Batch beverage plan for a full schedule day.
+
+Runs the menu predictor once over every Southwest flight on a date and writes
+the result as Parquet tables under ``data/plans``:
+
+* ``<date>.flights.parquet``: one row per flight and beverage
+* ``<date>.stations.parquet``: totals per departure station and beverage
+* ``<date>.hubs.parquet``: totals per hub and beverage; each flight counts
+  towards its origin if that is a hub, otherwise its destination
+
+The web pages and API read predictions from the plan instead of running the
+model per request. Plan a day with::
+
+    python -m src.data_processing.day_plan 2024-01-15
+"""
+
+import argparse
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config.settings import SWA_HUBS
+from src.data.flight_archive import open_flights
+from src.data_processing.fleet_registry import FleetRegistry
+from src.models.artifacts import load_artifact
+from src.models.beverage_predictor import BeveragePredictor
+
+logger = logging.getLogger(__name__)
+
+TABLES = ('stations', 'hubs', 'flights')
+
+FLIGHT_COLUMNS = [
+    'flight_number', 'origin_airport', 'destination_airport',
+    'departure_time', 'first_seen', 'passenger_count', 'hub'
+]
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    """Get a file's (mtime_ns, size), or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DayPlan:
+    """Per-flight, per-beverage plan for one date with station and hub totals."""
+
+    def __init__(self, date: str, items: pd.DataFrame, stations: pd.DataFrame, hubs: pd.DataFrame):
+        """
+        Initialize the plan.
+
+        Args:
+            date: Date in YYYY-MM-DD format
+            items: One row per flight and beverage
+            stations: Quantity per (station, beverage)
+            hubs: Quantity per (hub, beverage)
+        """
+        self.date = date
+        self.items = items
+        self.stations = stations
+        self.hubs = hubs
+        self._by_flight: Optional[Dict[tuple, Dict[str, int]]] = None
+
+    @classmethod
+    def from_predictions(cls, date: str, flights: pd.DataFrame, quantities: pd.DataFrame) -> 'DayPlan':
+        """
+        Build the plan tables from a day's flights and their predicted quantities.
+
+        Args:
+            date: Date in YYYY-MM-DD format
+            flights: Flights with the columns of ``FLIGHT_COLUMNS`` except ``hub``
+            quantities: Predicted quantity per flight (rows) and beverage (columns)
+
+        Returns:
+            DayPlan for the date
+        """
+        flights = flights.reset_index(drop=True)
+        origin = flights['origin_airport']
+        destination = flights['destination_airport']
+        hub = origin.where(origin.isin(list(SWA_HUBS)), destination.where(destination.isin(list(SWA_HUBS))))
+        hub = hub.astype(object).where(hub.notna(), None)
+        flights = flights.assign(hub=hub)[FLIGHT_COLUMNS]
+
+        # Long format: every flight repeated once per beverage, in menu order
+        beverages = list(quantities.columns)
+        items = flights.loc[np.repeat(np.arange(len(flights)), len(beverages))].reset_index(drop=True)
+        items.insert(0, 'date', date)
+        items['beverage'] = np.tile(np.asarray(beverages, dtype=object), len(flights))
+        items['quantity'] = quantities.to_numpy(dtype=np.int64).ravel()
+
+        stations = (
+            items.groupby(['origin_airport', 'beverage'], sort=False)['quantity'].sum()
+            .reset_index().rename(columns={'origin_airport': 'station'})
+        )
+        hubs = (
+            items.dropna(subset=['hub']).groupby(['hub', 'beverage'], sort=False)['quantity'].sum()
+            .reset_index()
+        )
+        hubs.insert(1, 'hub_name', hubs['hub'].map(SWA_HUBS))
+        return cls(date, items, stations, hubs)
+
+    def flight_predictions(self, flight_number: str, first_seen: Optional[int] = None) -> Optional[Dict[str, int]]:
+        """
+        Get the planned quantity of each beverage for a flight.
+
+        Args:
+            flight_number: Southwest flight number (e.g. "WN1234")
+            first_seen: Departure timestamp, to pick one leg of a repeated flight number
+
+        Returns:
+            Dictionary of beverage -> quantity, or None if the flight is not in the plan
+        """
+        if self._by_flight is None:
+            by_flight: Dict[tuple, Dict[str, int]] = {}
+            for number, seen, beverage, quantity in zip(
+                self.items['flight_number'].tolist(), self.items['first_seen'].tolist(),
+                self.items['beverage'].tolist(), self.items['quantity'].tolist()
+            ):
+                by_flight.setdefault((number, seen), {})[beverage] = quantity
+                by_flight.setdefault((number, None), by_flight[(number, seen)])
+            self._by_flight = by_flight
+        return self._by_flight.get((flight_number, first_seen))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the plan to JSON-serializable records."""
+        return {
+            'date': self.date,
+            'flights': int(self.items[['flight_number', 'first_seen']].drop_duplicates().shape[0]),
+            'stations': self.stations.to_dict(orient='records'),
+            'hubs': self.hubs.to_dict(orient='records'),
+            'items': self.items.drop(columns='date').to_dict(orient='records')
+        }
+
+
+def plan_day(
+    flights_source,
+    predictor,
+    fleet_registry: FleetRegistry,
+    date: str,
+    random_state: Optional[int] = None
+) -> DayPlan:
+    """
+    Predict beverage quantities for every Southwest flight on a date in one batch.
+
+    Args:
+        flights_source: FlightArchive or FlightStore to read the day's flights from
+        predictor: Menu predictor with a ``predict_batch`` method
+        fleet_registry: Registry used to estimate passenger counts
+        date: Date in YYYY-MM-DD format
+        random_state: Optional seed for the predictor's variation
+
+    Returns:
+        DayPlan for the date
+    """
+    flights = pd.DataFrame(
+        flights_source.flights_on(date),
+        columns=['flight_number', 'origin_airport', 'destination_airport',
+                 'departure_time', 'first_seen', 'icao24']
+    )
+    flights['passenger_count'] = fleet_registry.estimate_passengers(flights['icao24'].tolist())
+    quantities = predictor.predict_batch(flights, random_state=random_state)
+    return DayPlan.from_predictions(date, flights.drop(columns='icao24'), quantities)
+
+
+class DayPlanStore:
+    """Directory of day plans with a small in-memory cache of recently read plans."""
+
+    def __init__(self, root: Union[str, Path] = "data/plans", max_cached_plans: int = 8):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the plan tables
+            max_cached_plans: Number of plans kept in memory
+        """
+        self.root = Path(root)
+        self.max_cached_plans = max_cached_plans
+        self._lock = threading.Lock()
+        # date -> (file signature, DayPlan), in LRU order
+        self._plans: OrderedDict = OrderedDict()
+
+    def path(self, date: str, table: str = 'flights') -> Path:
+        """Get the file path of one of a date's plan tables."""
+        return self.root / f"{date}.{table}.parquet"
+
+    @property
+    def version(self):
+        """Signature that changes whenever a plan is written or removed."""
+        return _file_signature(self.root)
+
+    def dates(self) -> List[str]:
+        """List the planned dates, most recent first."""
+        if not self.root.exists():
+            return []
+        suffix = '.flights.parquet'
+        return sorted((p.name[:-len(suffix)] for p in self.root.glob(f"*{suffix}")), reverse=True)
+
+    def write(self, plan: DayPlan) -> Path:
+        """
+        Atomically write a plan's tables.
+
+        The flights table is written last, so a date only shows up as planned
+        once its totals are in place.
+
+        Returns:
+            Path of the flights table
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        tables = {'stations': plan.stations, 'hubs': plan.hubs, 'flights': plan.items}
+        for table in TABLES:
+            path = self.path(plan.date, table)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            pq.write_table(pa.Table.from_pandas(tables[table], preserve_index=False), tmp_path)
+            with open(tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        return self.path(plan.date)
+
+    def read(self, date: str) -> Optional[DayPlan]:
+        """
+        Read a date's plan.
+
+        Args:
+            date: Date in YYYY-MM-DD format
+
+        Returns:
+            DayPlan, or None if the date has not been planned
+        """
+        signature = _file_signature(self.path(date))
+        if signature is None:
+            return None
+        with self._lock:
+            cached = self._plans.get(date)
+            if cached is not None and cached[0] == signature:
+                self._plans.move_to_end(date)
+                return cached[1]
+
+        plan = DayPlan(date, *(pd.read_parquet(self.path(date, table)) for table in ('flights', 'stations', 'hubs')))
+        with self._lock:
+            self._plans[date] = (signature, plan)
+            self._plans.move_to_end(date)
+            if len(self._plans) > self.max_cached_plans:
+                self._plans.popitem(last=False)
+        return plan
+
+
+def load_predictor(model_path: Union[str, Path]):
+    """Load the pickled menu predictor, or the default one if no model has been saved."""
+    try:
+        return load_artifact(model_path, mmap_mode=None)[0]
+    except FileNotFoundError:
+        logger.warning(f"No model at {model_path}, using the default menu predictor")
+        return BeveragePredictor()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Plan one or more schedule days."""
+    parser = argparse.ArgumentParser(description="Precompute beverage plans for schedule days")
+    parser.add_argument('dates', nargs='*', help="Dates to plan (YYYY-MM-DD, default: most recent date)")
+    parser.add_argument('--data-dir', default='data/historical', help="Directory containing the flight data")
+    parser.add_argument('--plans-dir', default='data/plans', help="Directory to write the plans to")
+    parser.add_argument('--model', default='models/beverage_predictor.joblib', help="Menu predictor model")
+    parser.add_argument('--fleet-registry', default='data/fleet_registry.npz',
+                        help="Fleet registry used for passenger estimates")
+    parser.add_argument('--all', action='store_true', help="Plan every date with flight data")
+    parser.add_argument('--seed', type=int, help="Seed for the predictor's variation")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    flights_source = open_flights(args.data_dir)
+    predictor = load_predictor(args.model)
+    fleet_registry = FleetRegistry.load_or_default(args.fleet_registry)
+    store = DayPlanStore(args.plans_dir)
+
+    dates = args.dates
+    if args.all:
+        dates = flights_source.available_dates()
+    elif not dates:
+        dates = flights_source.available_dates()[:1]
+
+    for date in dates:
+        plan = plan_day(flights_source, predictor, fleet_registry, date, args.seed)
+        path = store.write(plan)
+        logger.info(f"Planned {len(plan.items)} flight-beverage rows for {date} ({path})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+ICAO24 fleet registry mapping airframes to aircraft types and seat capacities.
+
+ICAO24 addresses are 24-bit hex codes, so every entry is stored as an integer
+key in a sorted array, one array per prefix length (a full six-character
+address is a prefix of length six). Lookups convert addresses to integers in
+one vectorized pass and binary-search the longest prefix first, which keeps
+exact and longest-prefix lookups fast for tens of thousands of airframes. The
+arrays round-trip through a ``.npz`` file that loads in milliseconds.
+"""
+
+import argparse
+import csv
+import logging
+import os
+import string
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ICAO24_LENGTH = 6
+
+# Seat capacities per aircraft type
+AIRCRAFT_CAPACITY = {
+    # Southwest Airlines fleet types
+    'B737': 143,     # Base 737 assumption if specific variant unknown
+    'B737-700': 143,
+    'B737-800': 175,
+    'B737-MAX8': 175,
+    'B738': 175,     # 737-800 code
+    'B737M8': 175,   # 737 MAX 8 code
+    'B737-7': 143,   # 737-700 code
+    'B737-8': 175    # Another 737-800 code
+}
+
+DEFAULT_AIRCRAFT_TYPE = 'B737'
+
+# Typical load factor used to turn seat capacity into a passenger estimate
+DEFAULT_LOAD_FACTOR = 0.85
+
+# Aircraft type mapping
+SOUTHWEST_FLEET = {
+    # Known ICAO24 prefixes for Southwest Airlines aircraft
+    # Format: prefix: (aircraft_type, description)
+    'A1B': ('B737-700', '737-700 from AirTran acquisition'),
+    'ABF': ('B737-700', 'Original Southwest 737-700s'),
+    'AAL': ('B737-800', 'Southwest 737-800s'),
+    'AE1': ('B737M8', '737 MAX 8 new deliveries'),
+    'AD9': ('B737-700', 'Southwest 737-700s'),
+    'AC7': ('B737-700', 'Southwest 737-700s'),
+    'AB7': ('B737-700', 'Southwest 737-700s'),
+    'ADF': ('B737-800', 'Southwest 737-800s'),
+    'AE8': ('B737M8', '737 MAX 8'),
+    'AF1': ('B737M8', '737 MAX 8'),
+    'A12': ('B737-800', 'Southwest 737-800s'),
+    'A13': ('B737-800', 'Southwest 737-800s'),
+    'A78': ('B737-700', 'Southwest 737-700s')
+}
+
+# Hex digit value for each byte, 255 for anything that is not a hex digit
+_HEX_VALUES = np.full(256, 255, dtype=np.uint8)
+for _digit in range(16):
+    _HEX_VALUES[ord(f"{_digit:x}")] = _digit
+    _HEX_VALUES[ord(f"{_digit:X}")] = _digit
+
+
+def parse_icao24(codes: Iterable[Optional[str]], length: int = ICAO24_LENGTH) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert hex codes of a fixed length to integers.
+
+    Args:
+        codes: ICAO24 addresses (or prefixes); None and non-string values are invalid
+        length: Required number of hex characters
+
+    Returns:
+        Tuple of (int64 values, boolean validity mask)
+    """
+    strings = np.array([code if isinstance(code, str) else '' for code in codes], dtype=str)
+    if strings.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+    valid = np.char.str_len(strings) == length
+    # Fixed-width unicode strings are arrays of code points; anything above 255 is not hex
+    chars = strings.astype(f'U{length}').view(np.uint32).reshape(len(strings), length)
+    digits = _HEX_VALUES[np.minimum(chars, 255)]
+    valid &= (digits != 255).all(axis=1)
+
+    weights = np.int64(16) ** np.arange(length - 1, -1, -1, dtype=np.int64)
+    values = np.where(valid, (digits.astype(np.int64) * weights).sum(axis=1), -1)
+    return values, valid
+
+
+class FleetRegistry:
+    """Sorted-array index from ICAO24 addresses and prefixes to aircraft types."""
+
+    def __init__(
+        self,
+        types: Sequence[str],
+        capacities: Sequence[int],
+        prefixes: Mapping[int, Tuple[np.ndarray, np.ndarray]],
+        default_type: str = DEFAULT_AIRCRAFT_TYPE
+    ):
+        """
+        Initialize the registry from prebuilt arrays.
+
+        Args:
+            types: Aircraft type names
+            capacities: Seat capacity for each entry of ``types``
+            prefixes: Prefix length -> (sorted uint32 keys, int16 indices into ``types``)
+            default_type: Type assumed for airframes that are not in the registry
+        """
+        self.types = np.asarray(types, dtype=str)
+        self.type_capacity = np.asarray(capacities, dtype=np.int32)
+        self.prefixes = {
+            int(length): (np.asarray(keys, dtype=np.uint32), np.asarray(type_ids, dtype=np.int16))
+            for length, (keys, type_ids) in prefixes.items()
+        }
+        self.default_type = default_type
+        self._lengths = sorted(self.prefixes, reverse=True)
+        self._type_ids = {name: i for i, name in enumerate(self.types.tolist())}
+        self.default_capacity = int(self.type_capacity[self._type_ids[default_type]]) \
+            if default_type in self._type_ids else AIRCRAFT_CAPACITY[DEFAULT_AIRCRAFT_TYPE]
+
+    def __len__(self) -> int:
+        """Return the number of addresses and prefixes in the registry."""
+        return sum(len(keys) for keys, _ in self.prefixes.values())
+
+    @classmethod
+    def from_entries(
+        cls,
+        entries: Iterable[Tuple[str, str]],
+        capacities: Mapping[str, int],
+        default_type: str = DEFAULT_AIRCRAFT_TYPE
+    ) -> 'FleetRegistry':
+        """
+        Build a registry from (ICAO24 address or prefix, aircraft type) pairs.
+
+        Entries that are not hex are skipped, since no ICAO24 address can match
+        them. Later entries for the same address or prefix replace earlier ones.
+
+        Args:
+            entries: Pairs of hex address/prefix (1-6 characters) and aircraft type
+            capacities: Seat capacity per aircraft type
+            default_type: Type assumed for airframes that are not in the registry
+
+        Returns:
+            FleetRegistry instance
+        """
+        types = list(capacities)
+        type_ids = {name: i for i, name in enumerate(types)}
+        by_length: Dict[int, Dict[int, int]] = {}
+        skipped = 0
+        for code, aircraft_type in entries:
+            code = (code or '').strip()
+            if not code or len(code) > ICAO24_LENGTH or not all(c in string.hexdigits for c in code):
+                skipped += 1
+                continue
+            if aircraft_type not in type_ids:
+                raise ValueError(f"No seat capacity for aircraft type {aircraft_type}")
+            by_length.setdefault(len(code), {})[int(code, 16)] = type_ids[aircraft_type]
+        if skipped:
+            logger.debug(f"Skipped {skipped} fleet entries that are not hex ICAO24 codes")
+
+        prefixes = {}
+        for length, mapping in by_length.items():
+            keys = np.fromiter(mapping.keys(), dtype=np.uint32, count=len(mapping))
+            type_ids_array = np.fromiter(mapping.values(), dtype=np.int16, count=len(mapping))
+            order = np.argsort(keys)
+            prefixes[length] = (keys[order], type_ids_array[order])
+        return cls(types, [capacities[name] for name in types], prefixes, default_type)
+
+    @classmethod
+    def default(cls) -> 'FleetRegistry':
+        """Build the registry from the built-in Southwest fleet prefixes."""
+        return cls.from_entries(
+            ((prefix, aircraft_type) for prefix, (aircraft_type, _) in SOUTHWEST_FLEET.items()),
+            AIRCRAFT_CAPACITY
+        )
+
+    @classmethod
+    def from_csv(cls, path: str, default_type: str = DEFAULT_AIRCRAFT_TYPE) -> 'FleetRegistry':
+        """
+        Load a registry from a CSV file.
+
+        The file needs ``icao24`` (address or prefix) and ``aircraft_type`` columns.
+        An optional ``seats`` column sets the capacity of types not in
+        AIRCRAFT_CAPACITY or overrides it.
+
+        Args:
+            path: CSV file path
+            default_type: Type assumed for airframes that are not in the registry
+
+        Returns:
+            FleetRegistry instance
+        """
+        capacities = dict(AIRCRAFT_CAPACITY)
+        entries = []
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                entries.append((row['icao24'], row['aircraft_type']))
+                if row.get('seats'):
+                    capacities[row['aircraft_type']] = int(row['seats'])
+        return cls.from_entries(entries, capacities, default_type)
+
+    def save(self, path: str):
+        """Save the registry arrays to an ``.npz`` file."""
+        arrays = {
+            'types': self.types,
+            'type_capacity': self.type_capacity,
+            'default_type': np.array(self.default_type)
+        }
+        for length, (keys, type_ids) in self.prefixes.items():
+            arrays[f'keys_{length}'] = keys
+            arrays[f'types_{length}'] = type_ids
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'FleetRegistry':
+        """
+        Load a registry saved with ``save`` (or a CSV file, by extension).
+
+        Args:
+            path: ``.npz`` or ``.csv`` file path
+
+        Returns:
+            FleetRegistry instance
+        """
+        if str(path).endswith('.csv'):
+            return cls.from_csv(path)
+        with np.load(path, allow_pickle=False) as data:
+            prefixes = {
+                int(name[len('keys_'):]): (data[name], data[f"types_{name[len('keys_'):]}"])
+                for name in data.files if name.startswith('keys_')
+            }
+            return cls(data['types'], data['type_capacity'], prefixes, str(data['default_type']))
+
+    @classmethod
+    def load_or_default(cls, path: Optional[str]) -> 'FleetRegistry':
+        """Load the registry at ``path`` if it exists, otherwise the built-in one."""
+        if path and os.path.exists(path):
+            try:
+                return cls.load(path)
+            except Exception as e:
+                logger.error(f"Error loading fleet registry {path}: {e}")
+        return cls.default()
+
+    def lookup(self, icao24s: Iterable[Optional[str]]) -> np.ndarray:
+        """
+        Find the aircraft type of each address by longest matching prefix.
+
+        Args:
+            icao24s: ICAO24 addresses
+
+        Returns:
+            int16 array of indices into ``types``, -1 where nothing matches
+        """
+        values, valid = parse_icao24(icao24s)
+        result = np.full(len(values), -1, dtype=np.int16)
+        for length in self._lengths:
+            keys, type_ids = self.prefixes[length]
+            pending = np.flatnonzero(valid & (result < 0))
+            if not len(pending) or not len(keys):
+                continue
+            wanted = values[pending] >> (4 * (ICAO24_LENGTH - length))
+            positions = np.searchsorted(keys, wanted).clip(0, len(keys) - 1)
+            hit = keys[positions] == wanted
+            result[pending[hit]] = type_ids[positions[hit]]
+        return result
+
+    def aircraft_types(self, icao24s: Iterable[Optional[str]]) -> np.ndarray:
+        """Get aircraft type names for addresses (None where unknown)."""
+        type_ids = self.lookup(icao24s)
+        names = self.types.astype(object)[type_ids]
+        names[type_ids < 0] = None
+        return names
+
+    def capacities(self, icao24s: Iterable[Optional[str]]) -> np.ndarray:
+        """Get seat capacities for addresses, using the default type's for unknown ones."""
+        type_ids = self.lookup(icao24s)
+        return np.where(type_ids >= 0, self.type_capacity[type_ids], self.default_capacity)
+
+    def estimate_passengers(
+        self,
+        icao24s: Iterable[Optional[str]],
+        load_factor: float = DEFAULT_LOAD_FACTOR
+    ) -> np.ndarray:
+        """Estimate passengers for addresses from seat capacity and a load factor."""
+        return (self.capacities(icao24s) * load_factor).astype(np.int64)
+
+    def aircraft_type(self, icao24: Optional[str]) -> Optional[str]:
+        """Get the aircraft type for one address (None if unknown)."""
+        return self.aircraft_types([icao24])[0]
+
+    def capacity(self, icao24: Optional[str]) -> int:
+        """Get the seat capacity for one address."""
+        return int(self.capacities([icao24])[0])
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Build a fleet registry ``.npz`` file from a CSV file."""
+    parser = argparse.ArgumentParser(description="Build the ICAO24 fleet registry")
+    parser.add_argument('csv_path', help="CSV with icao24, aircraft_type and optional seats columns")
+    parser.add_argument('output', help="Output .npz path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    registry = FleetRegistry.from_csv(args.csv_path)
+    registry.save(args.output)
+    logger.info(f"Saved {len(registry)} fleet entries to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Saving and loading of joblib model artifacts.
+
+Artifacts are written uncompressed and atomically, so they can be replaced
+while other processes still read the old file, and loaded with ``mmap_mode``:
+plain NumPy arrays in the pickle are then mapped from the file instead of read
+into each process, and worker processes share those pages through the page
+cache. Load time and resident size are reported for every load.
+
+Only plain array attributes stay mapped. scikit-learn's ``Tree`` objects copy
+their node and value arrays into their own buffers when they are unpickled, so
+a RandomForest artifact is still private to each worker. To share a forest
+across workers, serve its compact export (``src.models.compact``), whose trees
+are plain arrays; ``src.models.compact.load_predictor`` does this.
+"""
+
+import logging
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+
+def resident_memory() -> int:
+    """
+    Get the current resident set size of this process in bytes.
+
+    Falls back to the peak resident size where /proc is not available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_resident_memory()
+
+
+def peak_resident_memory() -> int:
+    """Get the peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def save_artifact(obj: Any, path: Union[str, Path]) -> Path:
+    """
+    Atomically write an uncompressed, memory-mappable joblib artifact.
+
+    Args:
+        obj: Object to save
+        path: Artifact path
+
+    Returns:
+        Path of the written artifact
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process temporary name: several workers may write the same artifact at once
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    joblib.dump(obj, tmp_path, compress=0)
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_artifact(path: Union[str, Path], mmap_mode: Optional[str] = 'r') -> Tuple[Any, Dict[str, Any]]:
+    """
+    Load a joblib artifact, memory-mapping its arrays, and measure the load.
+
+    Args:
+        path: Artifact path
+        mmap_mode: ``mmap_mode`` passed to joblib (``None`` reads arrays into memory).
+            Ignored by joblib for compressed artifacts.
+
+    Returns:
+        Tuple of (loaded object, load statistics with the load time in seconds,
+        file size, resident size after loading and its increase, in bytes)
+    """
+    path = Path(path)
+    rss_before = resident_memory()
+    start = time.perf_counter()
+    obj = joblib.load(path, mmap_mode=mmap_mode)
+    seconds = time.perf_counter() - start
+    rss_after = resident_memory()
+
+    stats = {
+        'path': str(path),
+        'mmap_mode': mmap_mode,
+        'seconds': round(seconds, 4),
+        'file_bytes': path.stat().st_size,
+        'rss_bytes': rss_after,
+        'rss_delta_bytes': rss_after - rss_before
+    }
+    logger.info(
+        f"Loaded {path} in {seconds:.2f}s "
+        f"(resident {rss_after / 1e6:.1f} MB, +{(rss_after - rss_before) / 1e6:.1f} MB)"
+    )
+    return obj, stats
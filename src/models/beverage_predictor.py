@@ -3,9 +3,20 @@ Model implementations for beverage consumption prediction.
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Union
 
 class BeveragePredictor:
+    # Base ratios for each category
+    CATEGORY_RATIOS = {
+        'soft_drinks': 0.4,    # 40% of passengers order soft drinks
+        'mixers': 0.2,         # 20% order mixers/juice
+        'hot_beverages': 0.25, # 25% order hot beverages
+        'alcoholic': 0.15      # 15% order alcoholic beverages
+    }
+
+    # Random variation applied to each beverage's share of its category
+    VARIATION_RANGE = (0.7, 1.3)
+
     def __init__(self):
         # Southwest Airlines' actual beverage menu
         self.beverages = {
@@ -44,28 +55,49 @@ class BeveragePredictor:
         
     def predict(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Generate predictions for Southwest's beverage menu"""
-        predictions = {}
-        passenger_count = df['passenger_count'].iloc[0]
-        
-        # Base ratios for each category
-        category_ratios = {
-            'soft_drinks': 0.4,    # 40% of passengers order soft drinks
-            'mixers': 0.2,         # 20% order mixers/juice
-            'hot_beverages': 0.25, # 25% order hot beverages
-            'alcoholic': 0.15      # 15% order alcoholic beverages
-        }
-        
-        # Generate predictions for each beverage
+        predictions = self.predict_batch(df.iloc[:1])
+        return {beverage: int(quantity) for beverage, quantity in predictions.iloc[0].items()}
+
+    def predict_batch(
+        self,
+        df: pd.DataFrame,
+        random_state: Optional[Union[int, np.random.Generator]] = None
+    ) -> pd.DataFrame:
+        """
+        Generate menu predictions for every flight in a DataFrame at once.
+
+        Args:
+            df: Flight data with a ``passenger_count`` column
+            random_state: Seed or Generator for reproducible variation. Uses the
+                global NumPy random state when omitted.
+
+        Returns:
+            DataFrame with one row per flight (same index as ``df``) and one
+            integer column per beverage
+        """
+        passenger_count = df['passenger_count'].to_numpy(dtype=np.float64)
+
+        # Per-beverage share of passengers: category ratio / beverages in category
+        names = []
+        ratios = []
+        splits = []
         for category, beverages in self.beverages.items():
-            # Calculate base demand for this category
-            category_demand = int(passenger_count * category_ratios[category])
-            
-            # Distribute among specific beverages in the category
-            num_beverages = len(beverages)
-            for beverage in beverages:
-                # Add some randomness to make it realistic
-                variation = np.random.uniform(0.7, 1.3)
-                quantity = max(1, int((category_demand / num_beverages) * variation))
-                predictions[beverage] = quantity
-        
-        return predictions 
\ No newline at end of file
+            names.extend(beverages)
+            ratios.extend([self.CATEGORY_RATIOS[category]] * len(beverages))
+            splits.extend([len(beverages)] * len(beverages))
+        ratios = np.asarray(ratios)
+        splits = np.asarray(splits)
+
+        # Whole-passenger demand per category, broadcast to (flights, beverages)
+        category_demand = np.floor(passenger_count[:, None] * ratios[None, :])
+
+        # Add some randomness to make it realistic
+        shape = (len(passenger_count), len(names))
+        low, high = self.VARIATION_RANGE
+        if random_state is None:
+            variation = np.random.uniform(low, high, size=shape)
+        else:
+            variation = np.random.default_rng(random_state).uniform(low, high, size=shape)
+
+        quantities = np.maximum(1, np.floor(category_demand / splits * variation)).astype(np.int64)
+        return pd.DataFrame(quantities, index=df.index, columns=names)
@@ -0,0 +1,434 @@
+"""
+Compact tree export of the RandomForest ``BeveragePredictor``.
+
+Trained trees of either model engine are flattened into a few contiguous NumPy
+arrays, one entry per node across all trees:
+
+* ``feature``: feature index tested at the node (smallest integer dtype)
+* ``threshold``: float32 split threshold, ``+inf`` at leaves
+* ``left``: index of the left child; the right child is ``left + 1``, and
+  leaves point to themselves
+* ``missing_right``: whether missing (NaN) values go to the right child,
+  ``False`` at leaves
+* ``value``: float32 leaf values, one column per consumption target
+
+Nodes are renumbered breadth-first so siblings are adjacent, which lets a batch
+of rows walk all trees at once with a fixed number of vectorized steps:
+``node = left[node] + (x[feature[node]] > threshold[node])``, with NaN
+features sent right where ``missing_right`` is set, as scikit-learn's
+``missing_go_to_left`` does. Thresholds are rounded down to the nearest float32,
+so float32 features take the same branch as in scikit-learn (which compares
+float32 features against float64 thresholds).
+
+The exported ``CompactPredictor`` keeps the scaler statistics and feature
+columns, is several times smaller than the joblib model, and its arrays stay
+memory-mapped when loaded with ``load_artifact``.
+
+Usage:
+    python -m src.models.compact [--model models/category_predictor.joblib] [--output PATH]
+"""
+
+import argparse
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.models.artifacts import load_artifact, save_artifact
+from src.models.engines import HistGradientBoostingEngine, ModelEngine, RandomForestEngine
+from src.models.predictor import CATEGORY_MODEL_PATH, BeveragePredictor, FeaturePipeline
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on (trees x rows x targets) leaf values gathered per prediction chunk
+CHUNK_VALUES = 1 << 22
+
+
+def compact_model_path(model_path: str) -> str:
+    """Path of the compact export that belongs to a joblib model."""
+    root, ext = os.path.splitext(model_path)
+    return f"{root}.compact{ext or '.joblib'}"
+
+
+def float32_thresholds(thresholds: np.ndarray) -> np.ndarray:
+    """
+    Round float64 thresholds down to the largest float32 not above them.
+
+    For any float32 ``x``, ``x > t32`` then holds exactly when ``x > t64``.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    rounded = thresholds.astype(np.float32)
+    above = rounded.astype(np.float64) > thresholds
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def _breadth_first(
+    left: np.ndarray,
+    right: np.ndarray,
+    is_leaf: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Renumber a tree's nodes breadth-first so the children of a node are adjacent.
+
+    Returns:
+        Tuple of (original node index of each new node, new index of each node's
+        left child, or of the node itself for leaves)
+    """
+    order = [0]
+    for node in order:
+        if not is_leaf[node]:
+            order.append(int(left[node]))
+            order.append(int(right[node]))
+    order = np.asarray(order, dtype=np.int64)
+
+    position = np.empty(len(left), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    leaves = is_leaf[order].astype(bool)
+    new_left = np.where(leaves, np.arange(len(order)), position[np.where(leaves, 0, left[order])])
+    return order, new_left
+
+
+def _depth(left: np.ndarray) -> int:
+    """Depth of a breadth-first tree whose leaves point to themselves."""
+    depth = np.zeros(len(left), dtype=np.int64)
+    for node in range(len(left)):
+        if left[node] != node:
+            depth[left[node]] = depth[left[node] + 1] = depth[node] + 1
+    return int(depth.max())
+
+
+class CompactForest:
+    """Flattened tree ensemble evaluated with batched NumPy traversal."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        missing_right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        bias: np.ndarray,
+        scale: float = 1.0
+    ):
+        """
+        Args:
+            feature: Feature index per node
+            threshold: float32 threshold per node
+            left: Index of each node's left child (the node itself for leaves)
+            missing_right: Whether NaN features go to the right child, per node
+            value: float32 leaf values of shape (n_nodes, n_outputs)
+            roots: Index of each tree's root node
+            max_depth: Depth of the deepest tree
+            bias: Value added to every prediction, per output
+            scale: Factor applied to the sum of leaf values (1 / n_trees for a forest)
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.missing_right = missing_right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.scale = float(scale)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.left)
+
+    @property
+    def n_outputs(self) -> int:
+        return self.value.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the node arrays in bytes."""
+        arrays = (self.feature, self.threshold, self.left, self.missing_right, self.value, self.roots)
+        return sum(a.nbytes for a in arrays)
+
+    @classmethod
+    def from_trees(
+        cls,
+        trees: Sequence[Dict[str, np.ndarray]],
+        n_outputs: int,
+        bias: np.ndarray,
+        scale: float
+    ) -> 'CompactForest':
+        """
+        Flatten trees given as node arrays.
+
+        Args:
+            trees: One dict per tree with ``feature``, ``threshold`` (float64),
+                ``left``, ``right``, ``is_leaf``, ``missing_go_to_left`` and
+                ``value`` (n_nodes, n_outputs)
+            n_outputs: Number of outputs
+            bias: Value added to every prediction, per output
+            scale: Factor applied to the sum of leaf values
+
+        Returns:
+            Compact forest
+        """
+        features, thresholds, lefts, missing_rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for tree in trees:
+            order, left = _breadth_first(tree['left'], tree['right'], tree['is_leaf'])
+            is_leaf = tree['is_leaf'][order].astype(bool)
+            threshold = np.where(is_leaf, np.inf, tree['threshold'][order])
+
+            features.append(np.where(is_leaf, 0, tree['feature'][order]))
+            thresholds.append(float32_thresholds(threshold))
+            lefts.append(left + offset)
+            missing_rights.append(~is_leaf & ~tree['missing_go_to_left'][order].astype(bool))
+            values.append(np.where(is_leaf[:, None], tree['value'][order], 0).astype(np.float32))
+            roots.append(offset)
+            max_depth = max(max_depth, _depth(left))
+            offset += len(order)
+
+        feature = np.concatenate(features)
+        return cls(
+            feature=feature.astype(np.min_scalar_type(max(int(feature.max()), 0))),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.int32),
+            missing_right=np.concatenate(missing_rights),
+            value=np.concatenate(values).reshape(offset, n_outputs),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            bias=bias,
+            scale=scale
+        )
+
+    @classmethod
+    def from_engine(cls, engine: ModelEngine) -> 'CompactForest':
+        """Flatten the fitted trees of a model engine."""
+        if not engine.is_fitted:
+            raise ValueError("Cannot export an untrained model")
+        if isinstance(engine, RandomForestEngine):
+            return cls._from_random_forest(engine.model)
+        if isinstance(engine, HistGradientBoostingEngine):
+            return cls._from_hist_gradient_boosting(engine.model)
+        raise ValueError(f"Compact export does not support the {engine.name} engine")
+
+    @classmethod
+    def _from_random_forest(cls, model) -> 'CompactForest':
+        """Flatten a RandomForestRegressor; the prediction is the mean over trees."""
+        trees = []
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            trees.append({
+                'feature': tree.feature,
+                'threshold': tree.threshold,
+                'left': tree.children_left,
+                'right': tree.children_right,
+                'is_leaf': tree.children_left == -1,
+                'missing_go_to_left': tree.missing_go_to_left,
+                'value': tree.value.reshape(tree.node_count, -1)
+            })
+        n_outputs = trees[0]['value'].shape[1]
+        return cls.from_trees(trees, n_outputs, np.zeros(n_outputs), 1.0 / len(trees))
+
+    @classmethod
+    def _from_hist_gradient_boosting(cls, stages: List[List]) -> 'CompactForest':
+        """Flatten boosting stages of one HistGradientBoostingRegressor per output; predictions sum the leaves."""
+        n_outputs = len(stages[0])
+        trees = []
+        bias = np.zeros(n_outputs)
+        for stage in stages:
+            for output, model in enumerate(stage):
+                # Each boosting iteration holds one tree predictor for a single-output regressor
+                for (predictor,) in model._predictors:
+                    nodes = predictor.nodes
+                    value = np.zeros((len(nodes), n_outputs))
+                    value[:, output] = nodes['value']
+                    trees.append({
+                        'feature': nodes['feature_idx'],
+                        'threshold': nodes['num_threshold'],
+                        'left': nodes['left'],
+                        'right': nodes['right'],
+                        'is_leaf': nodes['is_leaf'],
+                        'missing_go_to_left': nodes['missing_go_to_left'],
+                        'value': value
+                    })
+                bias[output] += float(np.ravel(model._baseline_prediction)[0])
+        return cls.from_trees(trees, n_outputs, bias, 1.0)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict for a batch of (scaled) feature rows.
+
+        Args:
+            X: Array of shape (n_rows, n_features), evaluated as float32
+
+        Returns:
+            float64 array of shape (n_rows, n_outputs)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = len(X)
+        out = np.empty((n_rows, self.n_outputs))
+        chunk = max(1, CHUNK_VALUES // (self.n_trees * self.n_outputs))
+        for start in range(0, n_rows, chunk):
+            out[start:start + chunk] = self._predict_chunk(X[start:start + chunk])
+        return out
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        """Walk every tree for every row in lock step, one level per step."""
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offsets = np.arange(n_rows) * n_features
+        node = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            x = flat[row_offsets + self.feature[node]]
+            node = self.left[node] + ((x > self.threshold[node]) | (np.isnan(x) & self.missing_right[node]))
+        leaf_sum = self.value[node].sum(axis=0, dtype=np.float64)
+        return self.bias + self.scale * leaf_sum
+
+
+class CompactPredictor:
+    """Prediction-only counterpart of ``BeveragePredictor`` backed by a ``CompactForest``."""
+
+    def __init__(
+        self,
+        forest: CompactForest,
+        feature_columns: List[str],
+        scaler_mean: np.ndarray,
+        scaler_scale: np.ndarray,
+        feature_importance: Optional[Dict[str, float]] = None,
+        engine: str = RandomForestEngine.name,
+        trained_until: Optional[int] = None
+    ):
+        self.forest = forest
+        self.feature_columns = list(feature_columns)
+        # StandardScaler scales the float32 feature matrix in float32; do the same
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float32)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float32)
+        self.feature_importance = feature_importance or {}
+        self.engine = engine
+        self.trained_until = trained_until
+        self.load_stats: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_predictor(cls, predictor: BeveragePredictor) -> 'CompactPredictor':
+        """Export a trained ``BeveragePredictor``."""
+        scaler = predictor.scaler
+        return cls(
+            forest=CompactForest.from_engine(predictor.engine),
+            feature_columns=predictor.feature_columns,
+            # mean_/scale_ are None when the scaler was built without centering/scaling
+            scaler_mean=scaler.mean_ if scaler.mean_ is not None else 0.0,
+            scaler_scale=scaler.scale_ if scaler.scale_ is not None else 1.0,
+            feature_importance={k: float(v) for k, v in predictor.get_feature_importance().items()},
+            engine=predictor.engine.name,
+            trained_until=predictor.trained_until
+        )
+
+    @property
+    def feature_pipeline(self) -> FeaturePipeline:
+        """Feature pipeline for the exported feature columns, built once and reused."""
+        pipeline = getattr(self, '_pipeline', None)
+        if pipeline is None:
+            pipeline = FeaturePipeline(self.feature_columns)
+            self._pipeline = pipeline
+        return pipeline
+
+    def predict(self, flight_data: pd.DataFrame) -> np.ndarray:
+        """Predict beverage consumption for given flights."""
+        X = self.feature_pipeline.transform(flight_data)
+        X_scaled = (X - self.scaler_mean) / self.scaler_scale
+        return self.forest.predict(X_scaled)
+
+    def get_feature_importance(self) -> Dict[str, float]:
+        """Feature importance scores of the exported model."""
+        return dict(self.feature_importance)
+
+    def save(self, path: str):
+        """Save the compact model as an uncompressed, memory-mappable artifact."""
+        save_artifact(self, path)
+        logging.info(f"Compact model saved to {path} ({self.forest.n_nodes} nodes, {self.forest.nbytes / 1e6:.1f} MB)")
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'CompactPredictor':
+        """Load a compact model, memory-mapping its node arrays."""
+        predictor, load_stats = load_artifact(path, mmap_mode=mmap_mode)
+        if not isinstance(predictor, cls):
+            raise ValueError(f"{path} does not hold a compact model")
+        predictor.load_stats = load_stats
+        return predictor
+
+
+def export_compact(predictor: BeveragePredictor, path: str) -> CompactPredictor:
+    """
+    Export a trained predictor's trees to a compact artifact.
+
+    Args:
+        predictor: Trained predictor
+        path: Path of the compact artifact
+
+    Returns:
+        The exported compact predictor
+    """
+    compact = CompactPredictor.from_predictor(predictor)
+    compact.save(path)
+    return compact
+
+
+def load_predictor(model_path: str) -> Union[CompactPredictor, BeveragePredictor]:
+    """
+    Load the model for serving from its memory-mapped compact export.
+
+    scikit-learn trees copy their node arrays when unpickled, so every worker
+    that loads the joblib model holds a private copy of the forest. The compact
+    export keeps the trees in plain arrays that ``load_artifact`` maps from the
+    page cache, so workers share them. The export is (re)written from the joblib
+    model when it is missing or older than the model.
+
+    Args:
+        model_path: Path of the joblib model
+
+    Returns:
+        Compact predictor, or the full ``BeveragePredictor`` if no export can be
+        written (e.g. an untrained model or a read-only model directory)
+    """
+    compact_path = compact_model_path(model_path)
+    if os.path.exists(compact_path) and (
+        not os.path.exists(model_path) or os.path.getmtime(compact_path) >= os.path.getmtime(model_path)
+    ):
+        return CompactPredictor.load(compact_path)
+
+    predictor = BeveragePredictor.load_model(model_path)
+    try:
+        export_compact(predictor, compact_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Serving {model_path} without a compact export: {e}")
+        return predictor
+    return CompactPredictor.load(compact_path)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Export a trained joblib model to its compact form."""
+    parser = argparse.ArgumentParser(description="Export the beverage predictor to compact tree arrays")
+    parser.add_argument('--model', default=CATEGORY_MODEL_PATH, help="Trained model path")
+    parser.add_argument('--output', help="Compact model path (default: next to the model)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    predictor = BeveragePredictor.load_model(args.model, mmap_mode=None)
+    output = args.output or compact_model_path(args.model)
+    compact = export_compact(predictor, output)
+    logging.info(
+        f"Exported {compact.forest.n_trees} trees: {os.path.getsize(args.model) / 1e6:.1f} MB -> "
+        f"{os.path.getsize(output) / 1e6:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Model engines behind the RandomForest ``BeveragePredictor``.
+
+An engine owns the fitted estimator(s) for the four consumption targets and
+exposes the operations the predictor needs: fitting from scratch, adding
+trees for new data, predicting and feature importances.
+
+* ``random_forest``: the original multi-output RandomForestRegressor
+* ``hist_gradient_boosting``: one HistGradientBoostingRegressor per target.
+  Features are binned into histograms, so fitting is much faster on large
+  histories, the fitted model is small, and prediction uses compiled code
+  throughout. New data is added as a boosting stage fitted on the residuals.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from threadpoolctl import threadpool_limits
+
+
+class ModelEngine(ABC):
+    """Interface of the estimators behind ``BeveragePredictor``."""
+
+    name = ''
+
+    @property
+    @abstractmethod
+    def is_fitted(self) -> bool:
+        """Whether the engine has been fitted."""
+
+    @property
+    @abstractmethod
+    def n_estimators(self) -> int:
+        """Number of trees fitted so far."""
+
+    @abstractmethod
+    def fit(self, X: np.ndarray, y: np.ndarray, n_jobs: Optional[int] = None):
+        """Fit from scratch on scaled features and targets."""
+
+    @abstractmethod
+    def add_trees(self, X: np.ndarray, y: np.ndarray, n_new_trees: int, n_jobs: Optional[int] = None):
+        """Keep the fitted trees (if any) and add ``n_new_trees`` fitted on new data."""
+
+    @abstractmethod
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict targets of shape (n_rows, n_outputs)."""
+
+    def feature_importances(self) -> Optional[np.ndarray]:
+        """Impurity-based feature importances, or None if the engine has none."""
+        return None
+
+
+class RandomForestEngine(ModelEngine):
+    """Multi-output RandomForestRegressor."""
+
+    name = 'random_forest'
+
+    def __init__(self, model: Optional[RandomForestRegressor] = None,
+                 n_estimators: int = 100, max_depth: int = 10, random_state: int = 42):
+        self.model = model if model is not None else RandomForestRegressor(
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            random_state=random_state
+        )
+
+    @property
+    def is_fitted(self) -> bool:
+        return hasattr(self.model, 'estimators_')
+
+    @property
+    def n_estimators(self) -> int:
+        return len(getattr(self.model, 'estimators_', []))
+
+    def _fit(self, X: np.ndarray, y: np.ndarray, n_jobs: Optional[int]):
+        self.model.set_params(n_jobs=n_jobs)
+        try:
+            self.model.fit(X, y)
+        finally:
+            # Predictions are made a few rows at a time; threads only add overhead there
+            self.model.set_params(n_jobs=None)
+
+    def fit(self, X: np.ndarray, y: np.ndarray, n_jobs: Optional[int] = None):
+        self.model.set_params(warm_start=False)
+        self._fit(X, y, n_jobs)
+
+    def add_trees(self, X: np.ndarray, y: np.ndarray, n_new_trees: int, n_jobs: Optional[int] = None):
+        self.model.set_params(warm_start=True, n_estimators=self.n_estimators + n_new_trees)
+        self._fit(X, y, n_jobs)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.model.predict(X)
+
+    def feature_importances(self) -> Optional[np.ndarray]:
+        return self.model.feature_importances_
+
+
+class HistGradientBoostingEngine(ModelEngine):
+    """
+    One HistGradientBoostingRegressor per consumption target, in boosting stages.
+
+    The first stage is fitted on the targets. ``add_trees`` does not warm-start
+    the fitted models: scikit-learn refits the feature binning on every call, so
+    the earlier trees would no longer match the bins of the new data. Instead it
+    fits a new stage on the residuals of the current model on the new data, and
+    predictions sum the stages.
+    """
+
+    name = 'hist_gradient_boosting'
+
+    def __init__(self, model: Optional[List[List[HistGradientBoostingRegressor]]] = None,
+                 max_iter: int = 200, learning_rate: float = 0.1, max_leaf_nodes: int = 31,
+                 random_state: int = 42):
+        self.params = {
+            'max_iter': max_iter,
+            'learning_rate': learning_rate,
+            'max_leaf_nodes': max_leaf_nodes,
+            'random_state': random_state
+        }
+        if model and isinstance(model[0], HistGradientBoostingRegressor):
+            # Artifacts saved before boosting stages hold a single stage
+            model = [model]
+        self.model: List[List[HistGradientBoostingRegressor]] = model if model is not None else []
+
+    @property
+    def is_fitted(self) -> bool:
+        return bool(self.model)
+
+    @property
+    def n_estimators(self) -> int:
+        return sum(model.n_iter_ for stage in self.model for model in stage)
+
+    def _fit_stage(self, X: np.ndarray, y: np.ndarray, max_iter: int) -> List[HistGradientBoostingRegressor]:
+        """Fit one model per target column."""
+        params = dict(self.params, max_iter=max_iter)
+        return [
+            HistGradientBoostingRegressor(early_stopping=False, **params).fit(X, y[:, j])
+            for j in range(y.shape[1])
+        ]
+
+    def fit(self, X: np.ndarray, y: np.ndarray, n_jobs: Optional[int] = None):
+        y = np.asarray(y).reshape(len(y), -1)
+        # Each model already fits on all OpenMP threads; n_jobs caps them
+        with threadpool_limits(limits=n_jobs if n_jobs and n_jobs > 0 else None, user_api='openmp'):
+            self.model = [self._fit_stage(X, y, self.params['max_iter'])]
+
+    def add_trees(self, X: np.ndarray, y: np.ndarray, n_new_trees: int, n_jobs: Optional[int] = None):
+        y = np.asarray(y).reshape(len(y), -1)
+        with threadpool_limits(limits=n_jobs if n_jobs and n_jobs > 0 else None, user_api='openmp'):
+            residuals = y - self.predict(X) if self.model else y
+            self.model.append(self._fit_stage(X, residuals, n_new_trees))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return sum(np.column_stack([model.predict(X) for model in stage]) for stage in self.model)
+
+
+ENGINES: Dict[str, Type[ModelEngine]] = {
+    RandomForestEngine.name: RandomForestEngine,
+    HistGradientBoostingEngine.name: HistGradientBoostingEngine
+}
+
+
+def make_engine(name: str = RandomForestEngine.name, model=None, **params) -> ModelEngine:
+    """
+    Create a model engine by name.
+
+    Args:
+        name: One of ``ENGINES``
+        model: Optional fitted estimator(s) to wrap, e.g. from a saved artifact
+        **params: Engine hyperparameters
+
+    Returns:
+        Model engine
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown model engine: {name} (choose from {', '.join(ENGINES)})")
+    return ENGINES[name](model, **params)
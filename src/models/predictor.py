@@ -1,20 +1,149 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import argparse
 import logging
-import joblib
+import time
 from datetime import datetime
+from joblib import effective_n_jobs
+
+from src.data.dataset import consumption_dataset
+from src.data.weather_collector import WEATHER_COLUMNS
+from src.data_processing.beverage_data_generator import BeverageDataGenerator
+from src.models.artifacts import load_artifact, peak_resident_memory, save_artifact
+from src.models.engines import ENGINES, make_engine
+
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Consumption dataset columns needed to build training data
+# The per-category model has its own artifact: models/beverage_predictor.joblib
+# holds the menu predictor that the web app and the day planner load
+CATEGORY_MODEL_PATH = 'models/category_predictor.joblib'
+
+TRAINING_COLUMNS = ['departure', 'arrival', 'timestamp', 'duration', 'estimated_passengers'] + [
+    beverage for items in BeverageDataGenerator.BEVERAGE_DISTRIBUTION.values() for beverage in items
+]
+
+
+class FeaturePipeline:
+    """
+    Compiled plan for turning flight data into the model's feature matrix.
+
+    The plan (which columns are derived from the timestamp, copied from the input
+    or filled in) is resolved once per input schema and reused, and values are
+    written straight into a float32 matrix without copying the input frame.
+
+    Absent columns are filled with zeros, except weather features: zero is a real
+    reading there, and models trained with weather learned NaN as "unknown".
+    """
+
+    TIME_FEATURES = ('is_weekend', 'hour_of_day', 'is_summer')
+    MISSING_AS_NAN = tuple(WEATHER_COLUMNS)
+    SUMMER_MONTHS = (6, 7, 8)
+
+    def __init__(self, feature_columns: List[str]):
+        self.feature_columns = list(feature_columns)
+        self._plans: Dict[tuple, List[tuple]] = {}
+
+    def _plan(self, columns: tuple) -> List[tuple]:
+        """Resolve where each feature column comes from for an input schema."""
+        plan = self._plans.get(columns)
+        if plan is None:
+            available = set(columns)
+            plan = []
+            for slot, name in enumerate(self.feature_columns):
+                if name in self.TIME_FEATURES:
+                    plan.append((slot, 'time', name))
+                elif name in available:
+                    plan.append((slot, 'column', name))
+                elif name in self.MISSING_AS_NAN:
+                    plan.append((slot, 'nan', name))
+                else:
+                    plan.append((slot, 'zero', name))
+            self._plans[columns] = plan
+        return plan
+
+    def _time_features(self, timestamps: np.ndarray) -> Dict[str, np.ndarray]:
+        """Derive calendar features from Unix timestamps (UTC)."""
+        timestamps = np.asarray(timestamps)
+        if np.issubdtype(timestamps.dtype, np.integer):
+            seconds = timestamps.astype(np.int64, copy=False)
+        else:
+            seconds = np.floor(timestamps.astype(np.float64)).astype(np.int64)
+        days = seconds // 86400
+        # 1970-01-01 was a Thursday (dayofweek 3)
+        day_of_week = (days + 3) % 7
+
+        # Resolve months once per calendar day in range instead of once per row
+        if len(days):
+            first_day = days.min()
+            calendar = np.arange(first_day, days.max() + 1).astype('datetime64[D]')
+            months = calendar.astype('datetime64[M]').astype(np.int64) % 12 + 1
+            summer_days = np.isin(months, self.SUMMER_MONTHS)
+            is_summer = summer_days[days - first_day]
+        else:
+            is_summer = np.zeros(0, dtype=bool)
+
+        return {
+            'is_weekend': day_of_week >= 5,
+            'hour_of_day': (seconds - days * 86400) // 3600,
+            'is_summer': is_summer
+        }
+
+    def transform(self, flight_data: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Build the feature matrix for a batch of flights.
+
+        Args:
+            flight_data: Flight data with a ``timestamp`` column (Unix seconds)
+            out: Optional preallocated float32 buffer with at least ``len(flight_data)``
+                rows, reused across batches
+
+        Returns:
+            Float32 array of shape (n_flights, n_features)
+        """
+        n_rows = len(flight_data)
+        n_features = len(self.feature_columns)
+        if out is None:
+            out = np.empty((n_rows, n_features), dtype=np.float32)
+        else:
+            if out.shape[0] < n_rows or out.shape[1] != n_features:
+                raise ValueError(
+                    f"Feature buffer of shape {out.shape} cannot hold ({n_rows}, {n_features})"
+                )
+            out = out[:n_rows]
+
+        plan = self._plan(tuple(flight_data.columns))
+        time_values = None
+        for slot, source, name in plan:
+            if source == 'time':
+                if time_values is None:
+                    time_values = self._time_features(flight_data['timestamp'].to_numpy())
+                out[:, slot] = time_values[name]
+            elif source == 'column':
+                out[:, slot] = flight_data[name].to_numpy()
+            elif source == 'nan':
+                out[:, slot] = np.nan
+            else:
+                out[:, slot] = 0
+        return out
+
 
 class BeveragePredictor:
-    def __init__(self):
-        self.model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42
-        )
+    def __init__(self, engine: str = 'random_forest', **engine_params):
+        """
+        Initialize the predictor.
+
+        Args:
+            engine: Model engine name (see ``src.models.engines.ENGINES``)
+            **engine_params: Hyperparameters for the engine
+        """
+        self.engine = make_engine(engine, **engine_params)
         self.scaler = StandardScaler()
+        self.trained_until: Optional[int] = None  # Latest flight timestamp trained on
+        self.training_stats: Optional[Dict[str, Any]] = None
         self.feature_columns = [
             'duration_hours',
             'passenger_count',
@@ -26,32 +155,71 @@ class BeveragePredictor:
             'is_vacation_route'
         ]
 
+    @property
+    def feature_pipeline(self) -> FeaturePipeline:
+        """Feature pipeline for the current feature columns, built once and reused."""
+        pipeline = getattr(self, '_pipeline', None)
+        if pipeline is None or pipeline.feature_columns != self.feature_columns:
+            pipeline = FeaturePipeline(self.feature_columns)
+            self._pipeline = pipeline
+        return pipeline
+
+    @property
+    def model(self):
+        """Fitted estimator(s) of the model engine."""
+        return self.engine.model
+
     def _prepare_features(self, flight_data: pd.DataFrame) -> np.ndarray:
         """Prepare features for the model."""
-        df = flight_data.copy()
-        
-        # Extract time-based features
-        df['flight_datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-        df['is_weekend'] = df['flight_datetime'].dt.dayofweek >= 5
-        df['hour_of_day'] = df['flight_datetime'].dt.hour
-        df['is_summer'] = df['flight_datetime'].dt.month.isin([6, 7, 8])
-        
-        # Convert boolean columns to int
-        bool_columns = ['is_weekend', 'is_holiday', 'is_summer', 
-                       'is_business_route', 'is_vacation_route']
-        for col in bool_columns:
-            if col in df.columns:
-                df[col] = df[col].astype(int)
-        
-        # Ensure all feature columns exist
-        for col in self.feature_columns:
-            if col not in df.columns:
-                df[col] = 0
-        
-        return df[self.feature_columns].values
+        return self.feature_pipeline.transform(flight_data)
+
+    def _fit(
+        self,
+        X_scaled: np.ndarray,
+        y: np.ndarray,
+        n_jobs: Optional[int],
+        n_new_trees: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Fit the engine on all cores and record fit time, peak memory and tree throughput."""
+        trees_before = self.engine.n_estimators if n_new_trees else 0
+        start = time.perf_counter()
+        if n_new_trees:
+            self.engine.add_trees(X_scaled, y, n_new_trees, n_jobs=n_jobs)
+        else:
+            self.engine.fit(X_scaled, y, n_jobs=n_jobs)
+        seconds = time.perf_counter() - start
 
-    def train(self, flight_data: pd.DataFrame, consumption_data: pd.DataFrame):
-        """Train the model on historical data."""
+        trees_added = self.engine.n_estimators - trees_before
+        stats = {
+            'engine': self.engine.name,
+            'mode': 'warm_start' if n_new_trees else 'full',
+            'rows': len(X_scaled),
+            'trees_added': trees_added,
+            'n_estimators': self.engine.n_estimators,
+            'n_jobs': n_jobs,
+            'fit_seconds': round(seconds, 3),
+            'trees_per_second': round(trees_added / seconds, 2) if seconds > 0 else None,
+            'peak_rss_bytes': peak_resident_memory()
+        }
+        self.training_stats = stats
+        logging.info(
+            f"Fitted {trees_added} trees on {len(X_scaled)} rows in {seconds:.1f}s "
+            f"({stats['trees_per_second']} trees/s, peak RSS {stats['peak_rss_bytes'] / 1e6:.0f} MB)"
+        )
+        return stats
+
+    def train(self, flight_data: pd.DataFrame, consumption_data: pd.DataFrame, n_jobs: Optional[int] = -1):
+        """
+        Train the model from scratch on historical data.
+
+        Args:
+            flight_data: Flight features
+            consumption_data: Consumption targets, one row per flight
+            n_jobs: Trees fitted in parallel (-1 uses all cores)
+
+        Returns:
+            Training statistics (also kept in ``training_stats``)
+        """
         X = self._prepare_features(flight_data)
         y = consumption_data.values
         
@@ -59,57 +227,295 @@ class BeveragePredictor:
         X_scaled = self.scaler.fit_transform(X)
         
         # Train model
-        self.model.fit(X_scaled, y)
+        stats = self._fit(X_scaled, y, n_jobs)
+        self.trained_until = None
+        if 'timestamp' in flight_data and len(flight_data):
+            self.trained_until = int(flight_data['timestamp'].max())
         logging.info("Model training completed")
+        return stats
+
+    def add_trees(
+        self,
+        flight_data: pd.DataFrame,
+        consumption_data: pd.DataFrame,
+        n_new_trees: int = 20,
+        n_jobs: Optional[int] = -1
+    ) -> Dict[str, Any]:
+        """
+        Grow the trained forest with trees fitted on newly collected data.
+
+        Existing trees are kept and the scaler is not refitted, so new months can be
+        added without retraining on the full history. Random forests warm-start with
+        more trees; gradient boosting adds a stage fitted on the residuals.
+
+        Args:
+            flight_data: Flight features of the new data
+            consumption_data: Consumption targets of the new data
+            n_new_trees: Number of trees to add
+            n_jobs: Trees fitted in parallel (-1 uses all cores)
+
+        Returns:
+            Training statistics (also kept in ``training_stats``)
+        """
+        if not self.engine.is_fitted:
+            raise ValueError("add_trees needs a trained model; call train first")
+
+        X_scaled = self.scaler.transform(self._prepare_features(flight_data))
+        stats = self._fit(X_scaled, consumption_data.values, n_jobs, n_new_trees)
+        if 'timestamp' in flight_data and len(flight_data):
+            self.trained_until = max(self.trained_until or 0, int(flight_data['timestamp'].max()))
+        return stats
+
+    def train_shards(self, shards, trees_per_shard: int = 10, n_jobs: Optional[int] = -1) -> Dict[str, Any]:
+        """
+        Train on a dataset of feature/target shards, holding one shard in memory at a time.
+
+        The scaler is fitted incrementally over all shards first; then each shard
+        adds ``trees_per_shard`` trees to the model (see ``add_trees``), so the
+        dataset may be larger than memory.
+
+        Args:
+            shards: ``src.models.training_shards.TrainingShards`` (any iterable of
+                (X, y) arrays with ``feature_columns`` and ``max_timestamp``)
+            trees_per_shard: Trees (or boosting iterations) fitted on each shard
+            n_jobs: Trees fitted in parallel (-1 uses all cores)
+
+        Returns:
+            Training statistics (also kept in ``training_stats``)
+        """
+        if self.engine.is_fitted:
+            raise ValueError("train_shards needs an untrained model; use add_trees to grow a trained one")
+
+        self.feature_columns = list(shards.feature_columns)
+        self.scaler = StandardScaler()
+        for X, _ in shards:
+            self.scaler.partial_fit(X)
+
+        start = time.perf_counter()
+        rows = shard_count = 0
+        for X, y in shards:
+            self._fit(self.scaler.transform(X), y, n_jobs, trees_per_shard)
+            rows += len(X)
+            shard_count += 1
+        seconds = time.perf_counter() - start
+
+        trees = self.engine.n_estimators
+        stats = dict(
+            self.training_stats or {},
+            mode='shards',
+            shards=shard_count,
+            rows=rows,
+            trees_added=trees,
+            fit_seconds=round(seconds, 3),
+            trees_per_second=round(trees / seconds, 2) if seconds > 0 else None
+        )
+        self.training_stats = stats
+        self.trained_until = shards.max_timestamp
+        logging.info(f"Trained {trees} trees on {rows} rows in {shard_count} shards")
+        return stats
 
     def predict(self, flight_data: pd.DataFrame) -> np.ndarray:
         """Predict beverage consumption for given flights."""
         X = self._prepare_features(flight_data)
         X_scaled = self.scaler.transform(X)
-        return self.model.predict(X_scaled)
+        return self.engine.predict(X_scaled)
 
     def save_model(self, path: str):
         """Save the trained model and scaler."""
         model_data = {
-            'model': self.model,
+            'engine': self.engine.name,
+            'model': self.engine.model,
             'scaler': self.scaler,
-            'feature_columns': self.feature_columns
+            'feature_columns': self.feature_columns,
+            'trained_until': getattr(self, 'trained_until', None),
+            'training_stats': getattr(self, 'training_stats', None)
         }
-        joblib.dump(model_data, path)
+        save_artifact(model_data, path)
         logging.info(f"Model saved to {path}")
 
     @classmethod
-    def load_model(cls, path: str) -> 'BeveragePredictor':
-        """Load a trained model."""
-        model_data = joblib.load(path)
+    def load_model(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'BeveragePredictor':
+        """Load a trained model, memory-mapping its arrays (see ``src.models.artifacts``)."""
+        model_data, load_stats = load_artifact(path, mmap_mode=mmap_mode)
         predictor = cls()
-        predictor.model = model_data['model']
+        predictor.load_stats = load_stats
+        predictor.engine = make_engine(model_data.get('engine', 'random_forest'), model_data['model'])
         predictor.scaler = model_data['scaler']
         predictor.feature_columns = model_data['feature_columns']
+        predictor.trained_until = model_data.get('trained_until')
+        predictor.training_stats = model_data.get('training_stats')
         logging.info(f"Model loaded from {path}")
         return predictor
 
     def get_feature_importance(self) -> Dict[str, float]:
-        """Get feature importance scores."""
-        importance_scores = self.model.feature_importances_
+        """Get feature importance scores (empty if the engine does not provide them)."""
+        importance_scores = self.engine.feature_importances()
+        if importance_scores is None:
+            return {}
         return dict(zip(self.feature_columns, importance_scores))
 
-def main():
-    """Example usage of the BeveragePredictor."""
+def load_training_data(
+    data_dir: str = 'data/historical',
+    airports: Optional[Sequence[str]] = None,
+    years: Optional[Sequence[int]] = None,
+    months: Optional[Sequence[int]] = None,
+    since: Optional[int] = None,
+    window_days: Optional[float] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load flight features and per-category consumption targets from the consumption dataset.
+
+    Only the columns the model needs are read, and airport/year/month restrictions
+    prune partitions before any file is opened.
+
+    Args:
+        data_dir: Directory holding the dataset
+        airports: Only load these airports
+        years: Only load these years
+        months: Only load these months
+        since: Only load flights departing after this Unix timestamp
+        window_days: Only load the most recent days of data
+
+    Returns:
+        Tuple of (flight_data, consumption_data) ready for ``BeveragePredictor.train``
+    """
+    dataset = consumption_dataset(data_dir)
+    partitions = {'airports': airports, 'years': years, 'months': months}
+    filters = [('timestamp', '>', since)] if since is not None else []
+    if window_days is not None:
+        # Read only the timestamps first to find where the window starts
+        timestamps = dataset.read(['timestamp'], **partitions)['timestamp']
+        if len(timestamps):
+            filters.append(('timestamp', '>=', int(timestamps.max() - window_days * SECONDS_PER_DAY)))
+
+    frame = dataset.read(TRAINING_COLUMNS, filters=filters or None, **partitions)
+    return training_frames(frame)
+
+
+def training_frames(frame: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Split consumption rows into model flight features and per-category targets.
+
+    Args:
+        frame: Consumption rows with at least ``TRAINING_COLUMNS``
+
+    Returns:
+        Tuple of (flight_data, consumption_data) ready for ``BeveragePredictor.train``
+    """
+    categories = BeverageDataGenerator.BEVERAGE_DISTRIBUTION
+    business_routes = BeverageDataGenerator.BUSINESS_ROUTES
+    business_routes = business_routes + [(b, a) for a, b in business_routes]
+    routes = pd.Series(list(zip(frame['departure'], frame['arrival'])), index=frame.index, dtype=object)
+    vacation_airports = BeverageDataGenerator.VACATION_AIRPORTS
+
+    flight_data = pd.DataFrame({
+        'duration_hours': frame['duration'],
+        'passenger_count': frame['estimated_passengers'],
+        'timestamp': frame['timestamp'],
+        'is_holiday': 0,
+        'is_business_route': routes.isin(business_routes).astype(int),
+        'is_vacation_route': (
+            frame['departure'].isin(vacation_airports) | frame['arrival'].isin(vacation_airports)
+        ).astype(int)
+    })
+    consumption_data = pd.DataFrame({
+        category: frame[list(items)].sum(axis=1) for category, items in categories.items()
+    })
+    return flight_data, consumption_data
+
+
+def training_row_bytes(n_features: int, n_outputs: int, n_jobs: Optional[int] = -1) -> int:
+    """
+    Approximate memory needed per training row while the forest is fitted.
+
+    Counts the float32 feature matrix and its float64 scaled copy, the float64
+    targets, and the float64 bootstrap sample weights held by each parallel job.
+    """
+    return n_features * (4 + 8) + n_outputs * 8 + 8 * effective_n_jobs(n_jobs)
+
+
+def sample_within_memory(
+    flight_data: pd.DataFrame,
+    consumption_data: pd.DataFrame,
+    max_memory_bytes: int,
+    n_features: int,
+    n_jobs: Optional[int] = -1,
+    random_state: int = 42
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Uniformly sample training rows so fitting stays under a memory ceiling.
+
+    Args:
+        flight_data: Flight features
+        consumption_data: Consumption targets, one row per flight
+        max_memory_bytes: Memory budget for the training data while fitting
+        n_features: Number of model features
+        n_jobs: Trees fitted in parallel
+        random_state: Seed for the sample
+
+    Returns:
+        Tuple of (flight_data, consumption_data), sampled if they did not fit
+    """
+    row_bytes = training_row_bytes(n_features, consumption_data.shape[1], n_jobs)
+    max_rows = max(1, int(max_memory_bytes // row_bytes))
+    if len(flight_data) <= max_rows:
+        return flight_data, consumption_data
+
+    rows = np.sort(np.random.default_rng(random_state).choice(len(flight_data), max_rows, replace=False))
+    logging.info(
+        f"Sampling {max_rows} of {len(flight_data)} rows to stay within "
+        f"{max_memory_bytes / 1e6:.0f} MB ({row_bytes} bytes per row)"
+    )
+    return flight_data.iloc[rows], consumption_data.iloc[rows]
+
+
+def main(argv: Optional[List[str]] = None):
+    """Train the BeveragePredictor on the generated consumption dataset."""
+    parser = argparse.ArgumentParser(description="Train the beverage predictor")
+    parser.add_argument('--data-dir', default='data/historical', help="Directory holding the consumption dataset")
+    parser.add_argument('--model', default=CATEGORY_MODEL_PATH, help="Model path")
+    parser.add_argument('--window-days', type=float, help="Only train on the most recent days of data")
+    parser.add_argument('--memory-limit-mb', type=float,
+                        help="Sample the training rows to fit within this much memory")
+    parser.add_argument('--engine', default='random_forest', choices=sorted(ENGINES),
+                        help="Model engine for a new model")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Trees fitted in parallel (-1 uses all cores)")
+    parser.add_argument('--add-trees', type=int, metavar='N',
+                        help="Add N trees fitted on data newer than the saved model instead of retraining")
+    args = parser.parse_args(argv)
+
     logging.basicConfig(level=logging.INFO)
     
-    # Load your data here
-    # flight_data = pd.read_csv('path_to_flight_data.csv')
-    # consumption_data = pd.read_csv('path_to_consumption_data.csv')
+    predictor = None
+    since = None
+    if args.add_trees:
+        predictor = BeveragePredictor.load_model(args.model, mmap_mode=None)
+        since = predictor.trained_until
+    
+    flight_data, consumption_data = load_training_data(
+        args.data_dir, since=since, window_days=args.window_days
+    )
+    if flight_data.empty:
+        logging.info("No new consumption data found - run the beverage data generator first")
+        return
+    
+    if args.memory_limit_mb:
+        flight_data, consumption_data = sample_within_memory(
+            flight_data, consumption_data, int(args.memory_limit_mb * 1e6),
+            n_features=len(BeveragePredictor().feature_columns), n_jobs=args.n_jobs
+        )
     
-    # Initialize and train predictor
-    predictor = BeveragePredictor()
-    # predictor.train(flight_data, consumption_data)
+    # Train a new predictor, or grow the saved one with the new months
+    if predictor is not None:
+        stats = predictor.add_trees(flight_data, consumption_data, args.add_trees, n_jobs=args.n_jobs)
+    else:
+        predictor = BeveragePredictor(engine=args.engine)
+        stats = predictor.train(flight_data, consumption_data, n_jobs=args.n_jobs)
     
     # Save model
-    # predictor.save_model('models/beverage_predictor.joblib')
+    predictor.save_model(args.model)
     
-    logging.info("Beverage predictor setup completed")
+    logging.info(f"Beverage predictor trained on {len(flight_data)} flights: {stats}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
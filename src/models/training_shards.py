@@ -0,0 +1,328 @@
+"""
+Out-of-core training sets built from the consumption archives.
+
+``build_training_shards`` streams consumption rows in chunks from the columnar
+consumption dataset and from legacy JSON consumption files, derives the flight
+features, optionally joins hourly weather at the departure airport, and writes
+fixed-size shards of float32 features and float64 targets::
+
+    <output_dir>/manifest.json
+    <output_dir>/build-<id>/shard-00000.npz
+    <output_dir>/build-<id>/shard-00001.npz
+    ...
+
+``TrainingShards`` reads them back one shard at a time for
+``BeveragePredictor.train_shards``, so neither building nor training holds more
+than one shard (plus one input chunk) in memory. Every build writes into a new
+``build-<id>`` directory and atomically replaces the manifest last, so readers
+only ever see complete shard sets. The build before the current one is kept
+for readers still using it; older builds are removed.
+
+Usage:
+    python -m src.models.training_shards build [--data-dir data/historical] [--output data/training_shards] [--weather]
+    python -m src.models.training_shards train [--shards data/training_shards] [--model models/category_predictor.joblib]
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.data.dataset import consumption_dataset
+from src.data.weather_collector import WEATHER_COLUMNS, WeatherCollector
+from src.models.engines import ENGINES
+from src.models.predictor import (
+    CATEGORY_MODEL_PATH, BeveragePredictor, FeaturePipeline, TRAINING_COLUMNS, training_frames
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+BUILD_DIRNAME = "build-{}"
+SHARD_FILENAME = "shard-{:05d}.npz"
+
+# Legacy consumption files, e.g. KLAS_2024_01_consumption.json or KLAS_consumption.json
+CONSUMPTION_FILE_PATTERN = re.compile(r'^([A-Z0-9]{3,4})(?:_(\d{4})_(\d{2}))?_consumption\.json$')
+
+
+def _atomic_save_npz(path: Path, **arrays: np.ndarray):
+    """Write an uncompressed .npz file through a temporary file and rename it into place."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_legacy_file(path: Path) -> pd.DataFrame:
+    """Read a JSON consumption file into flat rows with ``TRAINING_COLUMNS``."""
+    with open(path) as f:
+        records = json.load(f)
+    frame = pd.DataFrame([{**record, **record.get('consumption', {})} for record in records])
+    return frame.reindex(columns=TRAINING_COLUMNS)
+
+
+def legacy_consumption_files(data_dir: Union[str, Path], airports: Optional[Sequence[str]] = None) -> List[Path]:
+    """
+    List the JSON consumption files not superseded by a consumption dataset partition.
+
+    Monthly files are skipped when their airport-month partition exists, and
+    per-airport files when any partition of that airport exists.
+    """
+    consumption_dir = Path(data_dir) / 'consumption'
+    if not consumption_dir.is_dir():
+        return []
+
+    partitions = set(consumption_dataset(data_dir).partitions())
+    partition_airports = {airport for airport, _, _ in partitions}
+    files = []
+    for path in sorted(consumption_dir.iterdir()):
+        match = CONSUMPTION_FILE_PATTERN.match(path.name)
+        if not match or (airports is not None and match.group(1) not in airports):
+            continue
+        airport, year, month = match.groups()
+        if year is not None and (airport, int(year), int(month)) in partitions:
+            continue
+        if year is None and airport in partition_airports:
+            continue
+        files.append(path)
+    return files
+
+
+def iter_consumption_chunks(
+    data_dir: Union[str, Path],
+    chunk_rows: int = 100_000,
+    airports: Optional[Sequence[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream consumption rows with ``TRAINING_COLUMNS`` in chunks.
+
+    Args:
+        data_dir: Directory holding the consumption dataset and ``consumption/`` JSON files
+        chunk_rows: Maximum rows per chunk
+        airports: Only read these airports
+
+    Yields:
+        DataFrames of up to ``chunk_rows`` consumption rows
+    """
+    yield from consumption_dataset(data_dir).iter_batches(
+        TRAINING_COLUMNS, airports=airports, batch_size=chunk_rows
+    )
+    for path in legacy_consumption_files(data_dir, airports):
+        frame = _read_legacy_file(path)
+        for start in range(0, len(frame), chunk_rows):
+            yield frame.iloc[start:start + chunk_rows]
+
+
+class TrainingShards:
+    """Feature/target shards written by ``build_training_shards``."""
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Open a shard directory.
+
+        Args:
+            root: Directory holding ``manifest.json`` and the shard files
+        """
+        self.root = Path(root)
+        with open(self.root / MANIFEST_FILENAME) as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+
+    @property
+    def feature_columns(self) -> List[str]:
+        return self.manifest['feature_columns']
+
+    @property
+    def target_columns(self) -> List[str]:
+        return self.manifest['target_columns']
+
+    @property
+    def rows(self) -> int:
+        return sum(shard['rows'] for shard in self.manifest['shards'])
+
+    @property
+    def max_timestamp(self) -> Optional[int]:
+        """Latest flight timestamp in the shards."""
+        return self.manifest.get('max_timestamp')
+
+    def __len__(self) -> int:
+        return len(self.manifest['shards'])
+
+    def load(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Load one shard as (float32 features, float64 targets)."""
+        with np.load(self.root / self.manifest['shards'][index]['file']) as shard:
+            return shard['X'], shard['y']
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        for index in range(len(self)):
+            yield self.load(index)
+
+
+class ShardWriter:
+    """Buffers feature/target rows and writes them out in shards of a fixed size."""
+
+    def __init__(self, root: Union[str, Path], feature_columns: List[str],
+                 target_columns: List[str], shard_rows: int = 500_000):
+        self.root = Path(root)
+        self.build = BUILD_DIRNAME.format(uuid.uuid4().hex[:12])
+        (self.root / self.build).mkdir(parents=True)
+        self.feature_columns = list(feature_columns)
+        self.target_columns = list(target_columns)
+        self.shard_rows = shard_rows
+        self.shards: List[Dict[str, Any]] = []
+        self.max_timestamp: Optional[int] = None
+        self._buffer: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._buffered = 0
+
+    def add(self, X: np.ndarray, y: np.ndarray, timestamps: np.ndarray):
+        """Add rows, writing full shards as soon as enough rows are buffered."""
+        if len(timestamps):
+            latest = int(np.max(timestamps))
+            self.max_timestamp = latest if self.max_timestamp is None else max(self.max_timestamp, latest)
+        self._buffer.append((X, y))
+        self._buffered += len(X)
+        while self._buffered >= self.shard_rows:
+            self._flush(self.shard_rows)
+
+    def _flush(self, rows: int):
+        """Write the first ``rows`` buffered rows as the next shard."""
+        X = np.concatenate([X for X, _ in self._buffer])
+        y = np.concatenate([y for _, y in self._buffer])
+        name = f"{self.build}/{SHARD_FILENAME.format(len(self.shards))}"
+        _atomic_save_npz(self.root / name, X=X[:rows], y=y[:rows])
+        self.shards.append({'file': name, 'rows': rows})
+        logger.info(f"Wrote {name} ({rows} rows)")
+
+        self._buffer = [(X[rows:], y[rows:])] if len(X) > rows else []
+        self._buffered = len(X) - rows
+
+    def close(self) -> TrainingShards:
+        """Write the remaining rows and the manifest, and remove builds before the previous one."""
+        if self._buffered:
+            self._flush(self._buffered)
+        keep = {self.build}
+        if (self.root / MANIFEST_FILENAME).exists():
+            keep.update(shard['file'].split('/')[0] for shard in TrainingShards(self.root).manifest['shards'])
+        manifest = {
+            'feature_columns': self.feature_columns,
+            'target_columns': self.target_columns,
+            'max_timestamp': self.max_timestamp,
+            'shards': self.shards
+        }
+        tmp_path = self.root / f".{MANIFEST_FILENAME}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.root / MANIFEST_FILENAME)
+
+        for path in self.root.glob(BUILD_DIRNAME.format('*')):
+            if path.name not in keep:
+                shutil.rmtree(path)
+        # Shards of builds from before build directories, written to the root itself
+        for path in self.root.glob('shard-*.npz'):
+            if path.name not in keep:
+                path.unlink()
+        return TrainingShards(self.root)
+
+
+def build_training_shards(
+    data_dir: Union[str, Path],
+    output_dir: Union[str, Path],
+    shard_rows: int = 500_000,
+    chunk_rows: int = 100_000,
+    airports: Optional[Sequence[str]] = None,
+    weather: Optional[WeatherCollector] = None
+) -> TrainingShards:
+    """
+    Build feature/target shards from the consumption archives without loading them whole.
+
+    Args:
+        data_dir: Directory holding the consumption dataset and JSON files
+        output_dir: Directory to write the shards to
+        shard_rows: Rows per shard (the last shard may be smaller)
+        chunk_rows: Rows read from the archives at a time
+        airports: Only use these airports
+        weather: Weather collector; when given, the weather at the departure airport
+            nearest to each departure hour is added as features (NaN where unknown)
+
+    Returns:
+        The written shards
+    """
+    feature_columns = BeveragePredictor().feature_columns
+    if weather is not None:
+        feature_columns = feature_columns + WEATHER_COLUMNS
+    pipeline = FeaturePipeline(feature_columns)
+
+    writer = None
+    for chunk in iter_consumption_chunks(data_dir, chunk_rows, airports):
+        flight_data, consumption_data = training_frames(chunk)
+        if weather is not None:
+            conditions = weather.get_weather_batch(
+                chunk['departure'].to_numpy(), pd.to_datetime(chunk['timestamp'].to_numpy(), unit='s')
+            )
+            for column in WEATHER_COLUMNS:
+                flight_data[column] = conditions[column].to_numpy()
+
+        if writer is None:
+            writer = ShardWriter(output_dir, feature_columns, list(consumption_data.columns), shard_rows)
+        writer.add(
+            pipeline.transform(flight_data),
+            consumption_data.to_numpy(dtype=np.float64),
+            flight_data['timestamp'].to_numpy()
+        )
+
+    if writer is None:
+        raise ValueError(f"No consumption data found in {data_dir}")
+    shards = writer.close()
+    logger.info(f"Built {len(shards)} shards with {shards.rows} rows in {output_dir}")
+    return shards
+
+
+def main(argv: Optional[List[str]] = None):
+    """Build training shards or train the beverage predictor from them."""
+    parser = argparse.ArgumentParser(description="Out-of-core training data for the beverage predictor")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Build feature/target shards from the consumption archives")
+    build.add_argument('--data-dir', default='data/historical', help="Directory holding the consumption data")
+    build.add_argument('--output', default='data/training_shards', help="Shard directory")
+    build.add_argument('--airports', nargs='+', help="Only use these airports")
+    build.add_argument('--shard-rows', type=int, default=500_000, help="Rows per shard")
+    build.add_argument('--chunk-rows', type=int, default=100_000, help="Rows read at a time")
+    build.add_argument('--weather', action='store_true', help="Join departure weather as features")
+
+    train = commands.add_parser('train', help="Train the beverage predictor shard by shard")
+    train.add_argument('--shards', default='data/training_shards', help="Shard directory")
+    train.add_argument('--model', default=CATEGORY_MODEL_PATH, help="Model path")
+    train.add_argument('--engine', default='random_forest', choices=sorted(ENGINES), help="Model engine")
+    train.add_argument('--trees-per-shard', type=int, default=10, help="Trees fitted on each shard")
+    train.add_argument('--n-jobs', type=int, default=-1, help="Trees fitted in parallel (-1 uses all cores)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == 'build':
+        build_training_shards(
+            args.data_dir, args.output, args.shard_rows, args.chunk_rows, args.airports,
+            weather=WeatherCollector() if args.weather else None
+        )
+        return
+
+    predictor = BeveragePredictor(engine=args.engine)
+    stats = predictor.train_shards(TrainingShards(args.shards), args.trees_per_shard, n_jobs=args.n_jobs)
+    predictor.save_model(args.model)
+    logging.info(f"Beverage predictor trained from {args.shards}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
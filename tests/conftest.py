@@ -2,7 +2,10 @@
 Test configuration and fixtures.
 """
 
+import json
 import os
+import numpy as np
+import pandas as pd
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -13,6 +16,62 @@ from src.config.settings import DATABASE_URL
 # Use a test database
 TEST_DATABASE_URL = DATABASE_URL.replace("southwest_ai", "southwest_ai_test")
 
+# 2024-01-01 00:00 UTC
+JAN_1 = 1704067200
+
+def make_training_data(n, seed=0, start=JAN_1, spread_days=None, noise=0.0, random_targets=False):
+    """
+    Random flights and per-category targets for training the category predictor.
+
+    Flights depart one per hour from ``start``, or at random times within
+    ``spread_days`` days of it. Targets follow passengers and duration with
+    +/-``noise`` relative noise, or are uniform noise with ``random_targets``.
+    """
+    rng = np.random.default_rng(seed)
+    duration_hours = rng.uniform(1, 5, n)
+    passenger_count = rng.integers(100, 175, n)
+    if spread_days:
+        timestamps = start + rng.integers(0, spread_days, n) * 86400 + rng.integers(0, 86400, n)
+    else:
+        timestamps = start + np.arange(n) * 3600
+    flights = pd.DataFrame({
+        'duration_hours': duration_hours,
+        'passenger_count': passenger_count,
+        'timestamp': timestamps,
+        'is_business_route': rng.integers(0, 2, n),
+        'is_vacation_route': rng.integers(0, 2, n)
+    })
+    if random_targets:
+        return flights, pd.DataFrame(rng.uniform(0, 50, (n, 4)))
+    drinks = flights['passenger_count'] * flights['duration_hours'] * 0.3
+    targets = pd.DataFrame({
+        j: drinks * share * (rng.uniform(1 - noise, 1 + noise, n) if noise else 1)
+        for j, share in enumerate([0.3, 0.2, 0.35, 0.15])
+    })
+    return flights, targets
+
+def make_flight(callsign, departure, origin="KLAS", destination="KLAX", hours=2.0, icao24="abf123"):
+    """Create a raw OpenSky flight record departing at a Unix time or a local datetime."""
+    first_seen = departure if isinstance(departure, int) else int(departure.timestamp())
+    flight = {
+        "icao24": icao24,
+        "callsign": callsign,
+        "firstSeen": first_seen,
+        "lastSeen": first_seen + int(hours * 3600),
+        "estDepartureAirport": origin,
+        "estArrivalAirport": destination
+    }
+    if icao24 is None:
+        del flight["icao24"]
+    return flight
+
+def write_flights(path, flights):
+    """Write flights and bump the file's mtime so the flight store notices the change."""
+    with open(path, "w") as f:
+        json.dump(flights, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
 @pytest.fixture(scope="session")
 def engine():
     """Create a test database engine."""
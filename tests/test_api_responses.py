@@ -0,0 +1,50 @@
+"""
+Tests for prediction API response formatting.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.api.responses import dumps, format_predictions
+
+
+@pytest.fixture
+def predictions():
+    """Create a small prediction array."""
+    return np.array([
+        [10.9, 5.2, 7.0, 1.99],
+        [20.1, 0.4, 3.5, 4.0]
+    ])
+
+
+def test_records_format(predictions):
+    """Test one record per flight with truncated quantities."""
+    payload = format_predictions(np.array(['WN100', 'WN200']), predictions)
+    assert payload == [
+        {'flight_number': 'WN100', 'predictions': {
+            'soft_drinks': 10, 'hot_beverages': 5, 'water_juice': 7, 'alcoholic': 1}},
+        {'flight_number': 'WN200', 'predictions': {
+            'soft_drinks': 20, 'hot_beverages': 0, 'water_juice': 3, 'alcoholic': 4}}
+    ]
+
+
+def test_columnar_format(predictions):
+    """Test one list per field."""
+    payload = format_predictions(['WN100', 'WN200'], predictions, 'columnar')
+    assert payload['flight_number'] == ['WN100', 'WN200']
+    assert payload['predictions']['soft_drinks'] == [10, 20]
+    assert payload['predictions']['alcoholic'] == [1, 4]
+
+
+def test_unknown_format(predictions):
+    """Test rejecting unsupported payload shapes."""
+    with pytest.raises(ValueError):
+        format_predictions(['WN100', 'WN200'], predictions, 'xml')
+
+
+def test_dumps_numpy_values():
+    """Test serializing NumPy scalars and arrays."""
+    content = {'count': np.int64(3), 'values': np.array([1, 2])}
+    assert json.loads(dumps(content)) == {'count': 3, 'values': [1, 2]}
@@ -0,0 +1,86 @@
+"""
+Tests for streaming NDJSON predictions.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.models.predictor import BeveragePredictor
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Create an API client backed by a small trained predictor."""
+    rng = np.random.default_rng(0)
+    flights = pd.DataFrame({
+        'timestamp': rng.integers(1704067200, 1735689600, 50),
+        'duration_hours': rng.choice([1.5, 2.5, 3.5], 50),
+        'passenger_count': rng.integers(100, 180, 50)
+    })
+    predictor = BeveragePredictor()
+    predictor.model.set_params(n_estimators=5)
+    predictor.train(flights, pd.DataFrame(rng.integers(0, 100, (50, 4))))
+    monkeypatch.setattr(main, 'predictor', predictor)
+    return TestClient(main.app)
+
+
+def make_csv(n_rows):
+    """Create a CSV upload with the given number of flights."""
+    return pd.DataFrame({
+        'flight_number': [f'SWA{i}' for i in range(n_rows)],
+        'timestamp': [1706745600 + i * 60 for i in range(n_rows)],
+        'duration_hours': [2.5] * n_rows,
+        'passenger_count': [143] * n_rows
+    }).to_csv(index=False).encode()
+
+
+def test_stream_predictions(client, monkeypatch):
+    """Test that every flight is streamed back across several chunks."""
+    monkeypatch.setattr('src.api.streaming.DEFAULT_CHUNK_ROWS', 7)
+    response = client.post(
+        '/predict?stream=true',
+        files={'file': ('flights.csv', make_csv(25), 'text/csv')}
+    )
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 25
+    assert [r['flight_number'] for r in records] == [f'SWA{i}' for i in range(25)]
+    assert set(records[0]['predictions']) == {
+        'soft_drinks', 'hot_beverages', 'water_juice', 'alcoholic'
+    }
+
+
+def test_stream_missing_columns(client):
+    """Test that missing columns are rejected before streaming starts."""
+    response = client.post(
+        '/predict?stream=true',
+        files={'file': ('flights.csv', b'timestamp\n1706745600\n', 'text/csv')}
+    )
+    assert response.status_code == 400
+    assert 'flight_number' in response.json()['detail']
+
+
+def test_stream_missing_timestamp(client):
+    """Test that uploads without timestamps are rejected instead of failing mid-stream."""
+    response = client.post(
+        '/predict?stream=true',
+        files={'file': ('flights.csv', b'flight_number,duration_hours\nSWA1,2.5\n', 'text/csv')}
+    )
+    assert response.status_code == 400
+    assert 'timestamp' in response.json()['detail']
+
+
+def test_stream_rejects_columnar_format(client):
+    """Test that the columnar format is rejected for NDJSON streaming."""
+    response = client.post(
+        '/predict?stream=true&format=columnar',
+        files={'file': ('flights.csv', make_csv(3), 'text/csv')}
+    )
+    assert response.status_code == 400
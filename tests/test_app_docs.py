@@ -0,0 +1,39 @@
+"""
+Tests for the documentation pages served by the web app.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+
+@pytest.fixture(scope='module')
+def client():
+    """Client for the web app, with startup prerendering run."""
+    with TestClient(app.app) as client:
+        yield client
+
+
+def test_docs_serves_cached_documentation(client):
+    """Test that /docs serves the rendered documents rather than Swagger UI."""
+    response = client.get('/docs', params={'doc': 'testing'})
+
+    assert response.status_code == 200
+    assert 'swagger' not in response.text.lower()
+    assert response.headers['etag'] == app.document_cache.page(**app.docs_page_spec('testing')).etag
+
+    cached = client.get('/docs', params={'doc': 'testing'}, headers={'If-None-Match': response.headers['etag']})
+    assert cached.status_code == 304
+
+
+def test_unknown_document(client):
+    """Test that unknown documents are not found."""
+    assert client.get('/docs', params={'doc': 'missing'}).status_code == 404
+
+
+def test_swagger_ui_moved(client):
+    """Test that the API reference is still available at /api-docs."""
+    response = client.get('/api-docs')
+    assert response.status_code == 200
+    assert 'swagger' in response.text.lower()
@@ -0,0 +1,62 @@
+"""
+Tests for batch inference in the menu-level beverage predictor.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.beverage_predictor import BeveragePredictor
+
+
+@pytest.fixture
+def predictor():
+    """Create a menu-level predictor."""
+    return BeveragePredictor()
+
+
+@pytest.fixture
+def schedule():
+    """Create a small schedule with varying passenger counts."""
+    return pd.DataFrame({
+        'flight_number': ['WN100', 'WN200', 'WN300'],
+        'passenger_count': [50, 143, 175]
+    }, index=[10, 11, 12])
+
+
+def test_predict_batch_shape(predictor, schedule):
+    """Test one row per flight and one column per beverage."""
+    predictions = predictor.predict_batch(schedule, random_state=0)
+
+    beverages = [b for items in predictor.beverages.values() for b in items]
+    assert list(predictions.columns) == beverages
+    assert list(predictions.index) == [10, 11, 12]
+    assert (predictions.values >= 1).all()
+
+
+def test_predict_batch_matches_scalar_bounds(predictor, schedule):
+    """Test that every quantity falls within the per-flight variation range."""
+    predictions = predictor.predict_batch(schedule, random_state=0)
+    low, high = predictor.VARIATION_RANGE
+
+    for category, beverages in predictor.beverages.items():
+        demand = np.floor(schedule['passenger_count'].values * predictor.CATEGORY_RATIOS[category])
+        share = demand / len(beverages)
+        for beverage in beverages:
+            values = predictions[beverage].values
+            assert (values >= np.maximum(1, np.floor(share * low))).all()
+            assert (values <= np.maximum(1, np.floor(share * high))).all()
+
+
+def test_predict_batch_is_reproducible(predictor, schedule):
+    """Test that a seed gives identical predictions."""
+    first = predictor.predict_batch(schedule, random_state=42)
+    second = predictor.predict_batch(schedule, random_state=np.random.default_rng(42))
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_predict_uses_first_flight(predictor, schedule):
+    """Test that single-flight predictions keep their dictionary format."""
+    predictions = predictor.predict(schedule)
+    assert set(predictions) == set(predictor.predict_batch(schedule).columns)
+    assert all(isinstance(quantity, int) for quantity in predictions.values())
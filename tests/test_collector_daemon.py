@@ -0,0 +1,142 @@
+"""
+Tests for the historical data collector's append-only storage.
+"""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from conftest import make_flight
+from src.data.dataset import flight_dataset
+from src.data_collection.collector_daemon import HistoricalDataCollector
+
+
+@pytest.fixture
+def collector(tmp_path):
+    """Create a collector with a mocked flight source."""
+    with patch('src.data_collection.collector_daemon.FlightDataCollector'):
+        collector = HistoricalDataCollector(data_dir=tmp_path)
+        collector.collector.get_flights_by_airport.side_effect = (
+            lambda airports, start, end: {
+                airport: [make_flight(f"SWA{start.hour}", int(start.timestamp()))]
+                for airport in airports
+            }
+        )
+        yield collector
+
+
+def test_collect_writes_segment_and_compacted_file(collector, tmp_path):
+    """Test that each chunk is appended and the result compacted."""
+    start = datetime(2024, 1, 1)
+    flights = collector.collect_airport_history('KLAS', start, start + timedelta(hours=6), 2024, 1)
+
+    assert [f['callsign'] for f in flights] == ['SWA0', 'SWA2', 'SWA4']
+    stored = flight_dataset(tmp_path).read_partition('KLAS', 2024, 1, columns=['callsign', 'firstSeen'])
+    assert stored.to_dict('records') == [
+        {'callsign': f['callsign'], 'firstSeen': f['firstSeen']} for f in flights
+    ]
+    assert len((tmp_path / 'KLAS_2024_01_flights.jsonl').read_text().splitlines()) == 3
+
+    with open(tmp_path / 'KLAS_2024_01_progress.json') as f:
+        progress = json.load(f)
+    assert progress['intervals'] == [['2024-01-01T00:00:00', '2024-01-01T06:00:00']]
+    assert progress['segment_bytes'] == (tmp_path / 'KLAS_2024_01_flights.jsonl').stat().st_size
+
+
+def test_resume_discards_uncommitted_tail(collector, tmp_path):
+    """Test that flights written after the last checkpoint are dropped on restart."""
+    start = datetime(2024, 1, 1)
+    collector.collect_airport_history('KLAS', start, start + timedelta(hours=4), 2024, 1)
+
+    # Simulate a crash after appending a chunk but before checkpointing it
+    with open(tmp_path / 'KLAS_2024_01_flights.jsonl', 'a') as f:
+        f.write(json.dumps(make_flight('SWA99', 0)) + '\n{"callsign": "SW')
+
+    collector.collector.get_flights_by_airport.reset_mock()
+    flights = collector.collect_airport_history('KLAS', start, start + timedelta(hours=6), 2024, 1)
+
+    assert [f['callsign'] for f in flights] == ['SWA0', 'SWA2', 'SWA4']
+    assert collector.collector.get_flights_by_airport.call_count == 1
+
+
+def test_migrates_legacy_files(collector, tmp_path):
+    """Test resuming from the previous JSON array and progress list format."""
+    start = datetime(2024, 1, 1)
+    with open(tmp_path / 'KLAS_2024_01_flights.json', 'w') as f:
+        json.dump([make_flight('SWA0', int(start.timestamp()))], f, indent=2)
+    with open(tmp_path / 'KLAS_2024_01_progress.json', 'w') as f:
+        json.dump([{'start': start.isoformat(), 'end': (start + timedelta(hours=2)).isoformat()}], f)
+
+    flights = collector.collect_airport_history('KLAS', start, start + timedelta(hours=4), 2024, 1)
+
+    assert [f['callsign'] for f in flights] == ['SWA0', 'SWA2']
+    assert collector.collector.get_flights_by_airport.call_count == 1
+    assert not (tmp_path / 'KLAS_2024_01_flights.json').exists()
+
+
+def test_hubs_share_each_window(collector, tmp_path):
+    """Test that each window is fetched once and only for airports missing it."""
+    start = datetime(2024, 1, 1)
+    collector.collect_airport_history('KLAS', start, start + timedelta(hours=2), 2024, 1)
+    collector.collector.get_flights_by_airport.reset_mock()
+
+    hub_flights = collector.collect_hubs_history(
+        ['KLAS', 'KMDW'], start, start + timedelta(hours=4), 2024, 1
+    )
+
+    calls = collector.collector.get_flights_by_airport.call_args_list
+    assert sorted(call.args[0] for call in calls) == [['KLAS', 'KMDW'], ['KMDW']]
+    assert [f['callsign'] for f in hub_flights['KLAS']] == ['SWA0', 'SWA2']
+    assert [f['callsign'] for f in hub_flights['KMDW']] == ['SWA0', 'SWA2']
+    assert flight_dataset(tmp_path).partitions() == [('KLAS', 2024, 1), ('KMDW', 2024, 1)]
+
+
+def test_missing_windows(collector):
+    """Test listing the windows of a month that still need collecting."""
+    start = datetime(2024, 1, 1)
+    collector.collect_airport_history('KLAS', start, start + timedelta(hours=4), 2024, 1)
+
+    windows = collector.missing_windows('KLAS', 2024, 1)
+    assert len(windows) == 31 * 12 - 2
+    assert windows[0] == (start + timedelta(hours=4), start + timedelta(hours=6))
+    assert windows[-1][1] == datetime(2024, 2, 1)
+
+
+def test_recovers_flights_from_dataset(collector, tmp_path):
+    """Test that a lost segment is rebuilt from the compacted dataset partition."""
+    start = datetime(2024, 1, 1)
+    collector.collect_airport_history('KLAS', start, start + timedelta(hours=4), 2024, 1)
+    (tmp_path / 'KLAS_2024_01_flights.jsonl').unlink()
+
+    flights = collector.collect_airport_history('KLAS', start, start + timedelta(hours=6), 2024, 1)
+    assert [f['callsign'] for f in flights] == ['SWA0', 'SWA2', 'SWA4']
+
+
+def test_yearly_and_monthly_segments_share_partitions(collector, tmp_path):
+    """Test that compacting one segment keeps the flights another segment wrote to a partition."""
+    feb = datetime(2024, 2, 1)
+    monthly = collector.collect_airport_history('KLAS', feb, feb + timedelta(hours=6), 2024, 2)
+    jan = datetime(2024, 1, 1)
+    collector.collect_airport_history('KLAS', jan, jan + timedelta(hours=4), 2024)
+
+    dataset = flight_dataset(tmp_path)
+    assert len(dataset.read_partition('KLAS', 2024, 2)) == len(monthly) == 3
+    assert len(dataset.read_partition('KLAS', 2024, 1)) == 2
+
+    # Compacting again does not duplicate flights
+    collector.compact('KLAS', 2024, 2)
+    assert len(dataset.read_partition('KLAS', 2024, 2)) == 3
+
+
+def test_compacts_closed_months_once(collector, tmp_path):
+    """Test that a yearly run writes each month when it closes and the rest once at the end."""
+    start = datetime(2024, 1, 1)
+    with patch.object(collector, '_save_flights', wraps=collector._save_flights) as save_flights:
+        collector.collect_airport_history('KLAS', start, datetime(2024, 2, 1, 4), 2024)
+
+    assert [call.args[4] for call in save_flights.call_args_list] == [[1], None]
+    dataset = flight_dataset(tmp_path)
+    assert len(dataset.read_partition('KLAS', 2024, 1)) == 31 * 12
+    assert len(dataset.read_partition('KLAS', 2024, 2)) == 2
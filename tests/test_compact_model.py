@@ -0,0 +1,133 @@
+"""
+Tests for the compact tree export of the BeveragePredictor.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from conftest import make_training_data
+from src.models.compact import (
+    CompactForest, CompactPredictor, compact_model_path, export_compact, float32_thresholds, load_predictor
+)
+from src.models.engines import make_engine
+from src.models.predictor import BeveragePredictor
+
+
+@pytest.fixture(params=[('random_forest', {'n_estimators': 10}), ('hist_gradient_boosting', {'max_iter': 20})])
+def predictor(request):
+    """Small trained predictor of each engine."""
+    engine, params = request.param
+    predictor = BeveragePredictor(engine=engine, **params)
+    predictor.train(*make_training_data(500, spread_days=90, noise=0.2))
+    return predictor
+
+
+def test_float32_thresholds_round_down():
+    """Test that float32 values compare against rounded thresholds like against the originals."""
+    thresholds = np.random.default_rng(0).normal(size=1000)
+    rounded = float32_thresholds(thresholds)
+    assert rounded.dtype == np.float32 and np.all(rounded <= thresholds)
+    above = np.nextafter(rounded, np.float32(np.inf))
+    assert np.all(above > thresholds)
+
+
+def test_compact_matches_predictor(predictor):
+    """Test that the compact export predicts like the trained model."""
+    compact = CompactPredictor.from_predictor(predictor)
+    flights, _ = make_training_data(300, seed=1, spread_days=90, noise=0.2)
+
+    np.testing.assert_allclose(compact.predict(flights), predictor.predict(flights), rtol=1e-5, atol=1e-4)
+    assert compact.predict(flights.iloc[:1]).shape == (1, 4)
+    assert compact.get_feature_importance() == predictor.get_feature_importance()
+
+
+@pytest.mark.parametrize('engine, params', [
+    ('random_forest', {'n_estimators': 10}), ('hist_gradient_boosting', {'max_iter': 20})
+])
+def test_compact_routes_missing_values_like_sklearn(engine, params):
+    """Test that NaN features follow each node's missing-value direction."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 3)).astype(np.float32)
+    y = np.column_stack([3 * X[:, 0] + X[:, 1], X[:, 2] - X[:, 0]])
+    # Missing values carry information, so splits send them to either side
+    missing = rng.random(600) < 0.2
+    X[missing, 0] = np.nan
+    y[missing] += 10
+    X[rng.random(600) < 0.1, 2] = np.nan
+    fitted = make_engine(engine, **params)
+    fitted.fit(X, y)
+
+    X_test = rng.normal(size=(300, 3)).astype(np.float32)
+    X_test[rng.random((300, 3)) < 0.3] = np.nan
+    np.testing.assert_allclose(CompactForest.from_engine(fitted).predict(X_test), fitted.predict(X_test),
+                               rtol=1e-5, atol=1e-4)
+
+
+def test_compact_matches_boosting_stages():
+    """Test that the compact export sums the boosting stages added for new data."""
+    predictor = BeveragePredictor(engine='hist_gradient_boosting', max_iter=10)
+    predictor.train(*make_training_data(300, spread_days=90, noise=0.2))
+    predictor.add_trees(*make_training_data(300, seed=1, spread_days=90, noise=0.2), n_new_trees=5)
+    compact = CompactPredictor.from_predictor(predictor)
+    flights, _ = make_training_data(100, seed=2, spread_days=90, noise=0.2)
+
+    np.testing.assert_allclose(compact.predict(flights), predictor.predict(flights), rtol=1e-5, atol=1e-4)
+
+
+def test_compact_artifact_is_smaller_and_memory_mapped(predictor, tmp_path):
+    """Test that the compact artifact is smaller and loads with memory-mapped arrays."""
+    model_path = str(tmp_path / 'model.joblib')
+    predictor.save_model(model_path)
+    export_compact(predictor, compact_model_path(model_path))
+
+    loaded = load_predictor(model_path)
+    assert isinstance(loaded, CompactPredictor)
+    assert isinstance(loaded.forest.left, np.memmap)
+    assert os.path.getsize(compact_model_path(model_path)) < os.path.getsize(model_path)
+    flights, _ = make_training_data(50, seed=2, spread_days=90, noise=0.2)
+    np.testing.assert_allclose(loaded.predict(flights), predictor.predict(flights), rtol=1e-5, atol=1e-4)
+
+
+def test_stale_compact_export_is_rewritten(tmp_path):
+    """Test that a compact export older than the model is re-exported before it is served."""
+    predictor = BeveragePredictor(n_estimators=5)
+    predictor.train(*make_training_data(200, spread_days=90, noise=0.2))
+    model_path = str(tmp_path / 'model.joblib')
+    export_compact(predictor, compact_model_path(model_path))
+    predictor.save_model(model_path)
+    os.utime(compact_model_path(model_path), (0, 0))
+
+    loaded = load_predictor(model_path)
+    assert isinstance(loaded, CompactPredictor)
+    assert os.path.getmtime(compact_model_path(model_path)) >= os.path.getmtime(model_path)
+
+
+def test_missing_compact_export_is_written(tmp_path):
+    """Test that serving a model without a compact export writes one and maps it."""
+    predictor = BeveragePredictor(n_estimators=5)
+    flights, targets = make_training_data(200, spread_days=90, noise=0.2)
+    predictor.train(flights, targets)
+    model_path = str(tmp_path / 'model.joblib')
+    predictor.save_model(model_path)
+
+    loaded = load_predictor(model_path)
+    assert isinstance(loaded, CompactPredictor)
+    assert isinstance(loaded.forest.left, np.memmap)
+    np.testing.assert_allclose(loaded.predict(flights), predictor.predict(flights), rtol=1e-5, atol=1e-4)
+
+
+def test_untrained_model_is_served_without_compact_export(tmp_path):
+    """Test that a model that cannot be exported is served as the full predictor."""
+    model_path = str(tmp_path / 'model.joblib')
+    BeveragePredictor().save_model(model_path)
+
+    assert isinstance(load_predictor(model_path), BeveragePredictor)
+    assert not os.path.exists(compact_model_path(model_path))
+
+
+def test_untrained_model_cannot_be_exported():
+    """Test that exporting an untrained model fails."""
+    with pytest.raises(ValueError):
+        CompactPredictor.from_predictor(BeveragePredictor())
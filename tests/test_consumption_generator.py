@@ -0,0 +1,136 @@
+"""
+Tests for vectorized synthetic consumption generation.
+"""
+
+import json
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_flight
+from src.data.dataset import consumption_dataset, flight_dataset
+from src.data_processing.beverage_data_generator import BeverageDataGenerator, generate_all
+
+
+@pytest.fixture
+def generator(tmp_path):
+    """Create a generator over an empty data directory."""
+    return BeverageDataGenerator(str(tmp_path))
+
+
+@pytest.fixture
+def flights():
+    """Flights covering the duration, time-of-day, route and fleet rules."""
+    return [
+        make_flight('SWA1', datetime(2024, 1, 15, 7, 0), 'KMDW', 'KBWI', hours=1.5),                    # Monday morning business
+        make_flight('SWA2', datetime(2024, 7, 13, 19, 0), 'KMDW', 'KLAS', hours=3.0),                   # Summer weekend evening vacation
+        make_flight('SWA3', datetime(2024, 3, 5, 23, 30), 'KDAL', 'KBWI', hours=4.5, icao24='ae1456'),  # Red-eye on a 737 MAX 8
+        make_flight('SWA4', datetime(2024, 3, 5, 12, 0), 'KDAL', 'KBWI', hours=1.0, icao24=None),       # No ICAO24
+        make_flight('SWA5', datetime(2024, 3, 5, 12, 0), 'KDAL', 'KBWI', hours=1.0, icao24='fff000'),   # Unknown prefix
+    ]
+
+
+def test_frame_matches_per_flight_rules(generator, flights):
+    """Test that the frame applies the per-flight load factor and capacity rules."""
+    frame = generator.generate_consumption_frame(pd.DataFrame(flights), random_state=0)
+    modifiers = generator.LOAD_FACTOR_MODIFIERS
+
+    assert frame['aircraft_type'].tolist() == ['B737-700', 'B737-700', 'B737M8', 'B737', 'B737']
+    assert frame['aircraft_icao24'].tolist()[3] == 'unknown'
+    assert frame['load_factor'].tolist() == [
+        round(0.85 * modifiers['business_route'], 3),
+        round(0.85 * modifiers['weekend'] * modifiers['summer'] * modifiers['vacation_route'], 3),
+        round(0.85 * modifiers['red_eye'], 3),
+        0.85,
+        0.85
+    ]
+    assert frame['estimated_passengers'].tolist() == [
+        int(143 * 0.85 * modifiers['business_route']),
+        int(143 * 0.85 * modifiers['weekend'] * modifiers['summer'] * modifiers['vacation_route']),
+        int(175 * 0.85 * modifiers['red_eye']),
+        int(143 * 0.85),
+        int(143 * 0.85)
+    ]
+
+
+def test_frame_is_reproducible_and_bounded(generator, flights):
+    """Test seeded generation and that quantities stay within the ±10% variation."""
+    df = pd.DataFrame(flights)
+    first = generator.generate_consumption_frame(df, random_state=42)
+    second = generator.generate_consumption_frame(df, random_state=42)
+    pd.testing.assert_frame_equal(first, second)
+
+    # Short daytime flight with no route or time modifiers
+    passengers = first.loc[3, 'estimated_passengers']
+    expected = passengers * generator.FLIGHT_DURATION_RATES['short'] * 0.20
+    assert expected * 0.9 - 0.5 <= first.loc[3, 'Bottled Water'] <= expected * 1.1 + 0.5
+
+
+def test_records_match_single_flight_api(generator, flights):
+    """Test that the frame records equal generate_consumption_data for the same draws."""
+    np.random.seed(7)
+    records = generator.consumption_records(generator.generate_consumption_frame(pd.DataFrame(flights)))
+
+    np.random.seed(7)
+    singles = [generator.generate_consumption_data(flight) for flight in flights]
+
+    assert records == singles
+    assert set(records[0]['consumption']) == {
+        beverage for items in generator.BEVERAGE_DISTRIBUTION.values() for beverage in items
+    }
+
+
+def test_generate_all_processes_every_month_file(tmp_path):
+    """Test that every airport-month file is found, processed and written."""
+    for airport, month in (('KLAS', 1), ('KLAS', 2), ('KMDW', 1)):
+        departure = datetime(2024, month, 10, 12, 0)
+        flights = [
+            make_flight(f'SWA{i}', departure, airport, 'KBWI') for i in range(3)
+        ] + [make_flight('AAL1', departure, airport, 'KBWI')]
+        with open(tmp_path / f'{airport}_2024_{month:02d}_flights.json', 'w') as f:
+            json.dump(flights, f)
+    (tmp_path / 'KLAS_2024_01_progress.json').write_text('{}')
+
+    results = generate_all(str(tmp_path), workers=2)
+
+    assert [(r['airport'], r['month'], r['flights']) for r in results] == [
+        ('KLAS', 1, 3), ('KLAS', 2, 3), ('KMDW', 1, 3)
+    ]
+    saved = consumption_dataset(str(tmp_path)).read_partition('KLAS', 2024, 2, columns=['flight_number'])
+    assert saved['flight_number'].tolist() == ['SWA0', 'SWA1', 'SWA2']
+    assert generate_all(str(tmp_path), airports=['KMDW'], workers=1)[0]['airport'] == 'KMDW'
+
+
+def test_generates_from_flight_dataset(tmp_path):
+    """Test that flight dataset partitions are found and generated alongside legacy files."""
+    departure = datetime(2024, 3, 10, 12, 0)
+    flights = [make_flight(f'SWA{i}', departure, 'KLAS', 'KBWI') for i in range(2)]
+    flight_dataset(str(tmp_path)).write_partition(flights, 'KLAS', 2024, 3)
+
+    generator = BeverageDataGenerator(str(tmp_path))
+    assert generator.find_flight_files() == [('KLAS', 2024, 3)]
+    assert [r['flight_number'] for r in generator.process_airport_data('KLAS', 2024, 3)] == ['SWA0', 'SWA1']
+    assert generate_all(str(tmp_path), workers=1)[0]['flights'] == 2
+    assert consumption_dataset(str(tmp_path)).has_partition('KLAS', 2024, 3)
+
+
+def test_diagnostics_replace_per_flight_logging(generator, flights, caplog):
+    """Test that a frame is counted in the diagnostics without per-flight log lines."""
+    with caplog.at_level(logging.INFO):
+        generator.generate_consumption_frame(pd.DataFrame(flights), random_state=0)
+    assert caplog.records == []
+
+    summary = generator.diagnostics.summary()
+    assert summary['flights'] == 5
+    assert summary['missing_icao24'] == 1
+    assert summary['unknown_prefixes'] == {'FFF': 1}
+    assert summary['fleet_mix'] == {'B737-700': 2, 'B737': 2, 'B737M8': 1}
+    assert sum(summary['load_factor_histogram'].values()) == 5
+
+    generator.trace_sample_rate = 1.0
+    with caplog.at_level(logging.DEBUG, logger='src.data_processing.beverage_data_generator'):
+        generator.generate_consumption_frame(pd.DataFrame(flights), random_state=0)
+    assert len(caplog.records) == 5
@@ -0,0 +1,77 @@
+"""
+Tests for the partitioned Parquet flight and consumption datasets.
+"""
+
+import pandas as pd
+import pytest
+
+from conftest import make_flight
+from src.data.dataset import consumption_dataset, flight_dataset
+from src.data_processing.beverage_data_generator import BeverageDataGenerator
+from src.models.predictor import load_training_data
+
+
+@pytest.fixture
+def flights(tmp_path):
+    """Flight dataset with two airports over two months."""
+    dataset = flight_dataset(str(tmp_path))
+    dataset.write_partition([make_flight('SWA1', 1704103200), make_flight('AAL2', 1704106800)], 'KLAS', 2024, 1)
+    dataset.write_partition([make_flight('SWA3', 1706781600)], 'KLAS', 2024, 2)
+    dataset.write_partition([make_flight('SWA4', 1704103200, origin='KMDW')], 'KMDW', 2024, 1)
+    return dataset
+
+
+def test_write_and_list_partitions(flights):
+    """Test that partitions are listed and written with the fixed schema."""
+    assert flights.partitions() == [('KLAS', 2024, 1), ('KLAS', 2024, 2), ('KMDW', 2024, 1)]
+    table = flights.read_file(flights.partition_path('KLAS', 2024, 1))
+    assert table.schema.field('firstSeen').type == 'int64'
+    assert table.column('estArrivalAirportHorizDistance').null_count == 2
+    assert not list(flights.root.rglob('*.tmp'))
+
+
+def test_read_partition_projects_columns(flights):
+    """Test that only the requested columns of one partition are read."""
+    frame = flights.read_partition('KLAS', 2024, 1, columns=['callsign', 'firstSeen'])
+    assert list(frame.columns) == ['callsign', 'firstSeen']
+    assert frame['callsign'].tolist() == ['SWA1', 'AAL2']
+    assert flights.read_partition('KDAL', 2024, 1, columns=['callsign']).empty
+
+
+def test_read_prunes_partitions_and_filters(flights):
+    """Test that partition restrictions and row filters are applied across partitions."""
+    frame = flights.read(['callsign', 'airport', 'month'], airports=['KLAS'])
+    assert sorted(frame['callsign']) == ['AAL2', 'SWA1', 'SWA3']
+    assert set(frame['month']) == {1, 2}
+
+    frame = flights.read(['callsign'], filters=[('callsign', '>=', 'SWA'), ('month', '==', 1)])
+    assert sorted(frame['callsign']) == ['SWA1', 'SWA4']
+
+
+def test_rewrite_replaces_partition(flights):
+    """Test that writing a partition again replaces its rows."""
+    flights.write_partition([make_flight('SWA9', 1704103200)], 'KLAS', 2024, 1)
+    assert flights.read_partition('KLAS', 2024, 1)['callsign'].tolist() == ['SWA9']
+
+
+def test_load_training_data(tmp_path):
+    """Test that consumption partitions become features and per-category targets."""
+    frame = pd.DataFrame({
+        'departure': ['KBWI', 'KDAL'],
+        'arrival': ['KMDW', 'KLAS'],
+        'timestamp': [1704103200, 1704106800],
+        'duration': [2.0, 3.0],
+        'estimated_passengers': [120, 140]
+    })
+    for items in BeverageDataGenerator.BEVERAGE_DISTRIBUTION.values():
+        for beverage in items:
+            frame[beverage] = [1, 2]
+    consumption_dataset(str(tmp_path)).write_partition(frame, 'KBWI', 2024, 1)
+
+    flight_data, consumption_data = load_training_data(str(tmp_path))
+
+    assert flight_data['is_business_route'].tolist() == [1, 0]
+    assert flight_data['is_vacation_route'].tolist() == [0, 1]
+    assert flight_data['passenger_count'].tolist() == [120, 140]
+    assert consumption_data['soft_drinks'].tolist() == [5, 10]
+    assert list(consumption_data.columns) == ['soft_drinks', 'hot_beverages', 'water_juice', 'alcoholic']
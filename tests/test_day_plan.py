@@ -0,0 +1,88 @@
+"""
+Tests for the batch day plan.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from conftest import make_flight
+from src.data.flight_store import FlightStore
+from src.data_processing.day_plan import DayPlanStore, main, plan_day
+from src.data_processing.fleet_registry import FleetRegistry
+from src.models.beverage_predictor import BeveragePredictor
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Data directory with one day of flights, including a repeated flight number."""
+    historical = tmp_path / "historical"
+    historical.mkdir()
+    flights = [
+        make_flight("SWA100", datetime(2024, 1, 15, 7, 0), "KLAS", "KMDW"),
+        make_flight("SWA100", datetime(2024, 1, 15, 12, 0), "KMDW", "KBUR"),
+        make_flight("SWA200", datetime(2024, 1, 15, 9, 0), "KBUR", "KSMF"),
+        make_flight("SWA300", datetime(2024, 1, 16, 9, 0), "KLAS", "KDAL")
+    ]
+    with open(historical / "KLAS_2024_01_flights.json", "w") as f:
+        json.dump(flights, f)
+    return tmp_path
+
+
+@pytest.fixture
+def plan(data_dir):
+    """Plan for 2024-01-15."""
+    store = FlightStore(data_dir / "historical", refresh_interval=0)
+    yield plan_day(store, BeveragePredictor(), FleetRegistry.default(), "2024-01-15", random_state=0)
+    store.close()
+
+
+def test_plan_matches_batch_prediction(plan):
+    """Test that the plan holds one row per flight and beverage with the batch predictions."""
+    beverages = len(BeveragePredictor().predict_batch(plan.items.iloc[:1]).columns)
+    assert len(plan.items) == 3 * beverages
+    assert plan.items['flight_number'].iloc[::beverages].tolist() == ["WN100", "WN200", "WN100"]
+    assert (plan.items['quantity'] >= 1).all()
+
+
+def test_station_and_hub_totals(plan):
+    """Test that totals add up per departure station and per hub."""
+    items = plan.items
+    totals = plan.stations.groupby('station')['quantity'].sum().to_dict()
+    assert totals == items.groupby('origin_airport')['quantity'].sum().to_dict()
+
+    # KBUR -> KSMF touches no hub; KMDW -> KBUR counts towards KMDW
+    hubs = plan.hubs.groupby('hub')['quantity'].sum().to_dict()
+    assert set(hubs) == {"KLAS", "KMDW"}
+    assert hubs["KMDW"] == items.loc[items['origin_airport'] == "KMDW", 'quantity'].sum()
+    assert set(plan.hubs['hub_name']) == {"Las Vegas McCarran", "Chicago Midway"}
+
+
+def test_store_round_trip(plan, tmp_path):
+    """Test that a written plan reads back and answers per-flight lookups."""
+    store = DayPlanStore(tmp_path / "plans")
+    version = store.version
+    store.write(plan)
+
+    assert store.version != version
+    assert store.dates() == ["2024-01-15"]
+    assert store.read("2024-01-16") is None
+    loaded = store.read("2024-01-15")
+    assert store.read("2024-01-15") is loaded
+
+    second_leg = plan.items.loc[plan.items['origin_airport'] == "KMDW"]
+    expected = dict(zip(second_leg['beverage'], second_leg['quantity']))
+    assert loaded.flight_predictions("WN100", int(second_leg['first_seen'].iloc[0])) == expected
+    assert loaded.flight_predictions("WN100") != expected
+    assert loaded.flight_predictions("WN999") is None
+    assert json.dumps(loaded.to_dict())
+
+
+def test_main_plans_every_date(data_dir):
+    """Test that the command plans every date with flights."""
+    main([
+        "--all", "--data-dir", str(data_dir / "historical"), "--plans-dir", str(data_dir / "plans"),
+        "--model", str(data_dir / "missing.joblib"), "--fleet-registry", str(data_dir / "missing.npz")
+    ])
+    assert DayPlanStore(data_dir / "plans").dates() == ["2024-01-16", "2024-01-15"]
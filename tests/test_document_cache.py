@@ -0,0 +1,101 @@
+"""
+Tests for the rendered markdown document cache.
+"""
+
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.templating import Jinja2Templates
+from fastapi.testclient import TestClient
+
+from src.api.documents import DocumentCache
+
+
+@pytest.fixture
+def doc(tmp_path):
+    """Markdown document with a table."""
+    path = tmp_path / "paper.md"
+    path.write_text("# Paper\n\n| a | b |\n|---|---|\n| 1 | 2 |\n")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Document cache over a minimal page template."""
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "page.html").write_text("<html>{{ title }}{{ content | safe }}</html>")
+    return DocumentCache(Jinja2Templates(directory=str(templates_dir)))
+
+
+@pytest.fixture
+def client(cache, doc):
+    """App serving the document through the cache."""
+    app = FastAPI()
+
+    @app.get("/")
+    async def home(request: Request):
+        page = cache.page("page.html", doc, "content", extras=["tables"], context={"title": "T"})
+        return cache.response(request, page)
+
+    return TestClient(app)
+
+
+def touch(path, content=None):
+    """Optionally rewrite a file and move its mtime forward."""
+    if content is not None:
+        path.write_text(content)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_renders_once_per_version(cache, doc):
+    """Test that a document is only re-rendered when its content changes."""
+    page = cache.page("page.html", doc, "content", extras=["tables"], context={"title": "T"})
+    assert b"<table>" in page.body and page.body.startswith(b"<html>T")
+    assert cache.page("page.html", doc, "content", extras=["tables"], context={"title": "T"}) is page
+
+    touch(doc)
+    assert cache.page("page.html", doc, "content", extras=["tables"], context={"title": "T"}) is page
+    assert cache.renders == 1
+
+    touch(doc, "# Revised\n")
+    revised = cache.page("page.html", doc, "content", extras=["tables"], context={"title": "T"})
+    assert b"Revised" in revised.body
+    assert revised.etag != page.etag
+    assert cache.renders == 2
+
+
+def test_serves_precompressed_body(client):
+    """Test that gzip-accepting clients get the precompressed body."""
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert b"<table>" in response.content
+
+    identity = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.text.startswith("<html>T")
+
+
+def test_not_modified(client, doc):
+    """Test that a matching If-None-Match gets a 304 until the document changes."""
+    etag = client.get("/").headers["etag"]
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    touch(doc, "# Revised\n")
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_missing_document(cache, tmp_path):
+    """Test that missing documents raise and are skipped when prerendering."""
+    with pytest.raises(FileNotFoundError):
+        cache.page("page.html", tmp_path / "missing.md", "content")
+    cache.prerender([{"template": "page.html", "path": tmp_path / "missing.md", "content_key": "content"}])
+    assert cache.renders == 0
@@ -0,0 +1,83 @@
+"""
+Tests for the compiled RandomForest feature pipeline.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.predictor import BeveragePredictor, FeaturePipeline
+
+
+@pytest.fixture
+def flights():
+    """Create flights spanning a weekday, a weekend and a summer month."""
+    timestamps = [
+        datetime(2024, 1, 15, 14, 30, tzinfo=timezone.utc),  # Monday
+        datetime(2024, 7, 13, 6, 5, tzinfo=timezone.utc),    # Saturday, summer
+        datetime(2024, 8, 31, 23, 59, tzinfo=timezone.utc)   # Saturday, summer
+    ]
+    return pd.DataFrame({
+        'timestamp': [int(ts.timestamp()) for ts in timestamps],
+        'duration_hours': [2.5, 3.75, 1.5],
+        'passenger_count': [143, 175, 143],
+        'is_business_route': [True, False, False],
+        'is_vacation_route': [0, 1, 0]
+    })
+
+
+def test_transform_features(flights):
+    """Test derived time features, passthrough columns and zero-filled columns."""
+    columns = BeveragePredictor().feature_columns
+    features = FeaturePipeline(columns).transform(flights)
+
+    assert features.dtype == np.float32
+    assert features.shape == (3, len(columns))
+
+    frame = pd.DataFrame(features, columns=columns)
+    assert frame['is_weekend'].tolist() == [0, 1, 1]
+    assert frame['is_summer'].tolist() == [0, 1, 1]
+    assert frame['hour_of_day'].tolist() == [14, 6, 23]
+    assert frame['is_holiday'].tolist() == [0, 0, 0]
+    assert frame['is_business_route'].tolist() == [1, 0, 0]
+    assert frame['duration_hours'].tolist() == [2.5, 3.75, 1.5]
+
+
+def test_absent_weather_is_missing_not_zero(flights):
+    """Test that absent weather features are NaN while other absent features are zero."""
+    columns = ['passenger_count', 'temperature', 'precipitation', 'is_holiday']
+    features = FeaturePipeline(columns).transform(flights)
+
+    assert np.isnan(features[:, 1:3]).all()
+    assert features[:, 3].tolist() == [0, 0, 0]
+
+    flights['temperature'] = [20.5, 31.0, 28.0]
+    features = FeaturePipeline(columns).transform(flights)
+    assert features[:, 1].tolist() == [20.5, 31.0, 28.0]
+
+
+def test_transform_reuses_buffer(flights):
+    """Test writing into a preallocated buffer larger than the batch."""
+    pipeline = FeaturePipeline(['passenger_count', 'hour_of_day'])
+    buffer = np.full((10, 2), -1, dtype=np.float32)
+
+    features = pipeline.transform(flights, out=buffer)
+    assert np.shares_memory(features, buffer)
+    assert features.shape == (3, 2)
+    assert buffer[3:].min() == -1
+
+    with pytest.raises(ValueError):
+        pipeline.transform(flights, out=np.empty((2, 2), dtype=np.float32))
+
+
+def test_predictor_train_and_predict(flights):
+    """Test that the predictor trains and predicts through the pipeline."""
+    predictor = BeveragePredictor()
+    predictor.model.set_params(n_estimators=5)
+    consumption = pd.DataFrame({'soft_drinks': [50, 70, 40], 'alcoholic': [5, 20, 3]})
+
+    predictor.train(flights, consumption)
+    predictions = predictor.predict(flights)
+    assert predictions.shape == (3, 2)
@@ -0,0 +1,75 @@
+"""
+Tests for the ICAO24 fleet registry.
+"""
+
+import numpy as np
+import pytest
+
+from src.data_processing.fleet_registry import AIRCRAFT_CAPACITY, FleetRegistry, parse_icao24
+
+
+@pytest.fixture
+def registry():
+    """Create a registry with overlapping prefixes and exact airframes."""
+    return FleetRegistry.from_entries(
+        [
+            ('A', 'B737'),
+            ('AB', 'B737-700'),
+            ('ABF', 'B737-800'),
+            ('ABF123', 'B737M8'),
+            ('c0ffee', 'B737-7'),
+            ('XYZ', 'B737-800'),  # Not hex, can never match
+        ],
+        AIRCRAFT_CAPACITY
+    )
+
+
+def test_parse_icao24():
+    """Test hex parsing and validation of addresses."""
+    values, valid = parse_icao24(['abf123', 'ABF123', 'abf12', 'abf12z', None, 'abf1234'])
+    assert valid.tolist() == [True, True, False, False, False, False]
+    assert values[:2].tolist() == [0xABF123, 0xABF123]
+
+
+def test_exact_and_longest_prefix_lookup(registry):
+    """Test that exact addresses win over prefixes and the longest prefix wins."""
+    codes = ['abf123', 'ABF999', 'ab0000', 'a00000', 'c0ffee', 'c0ffef', None, 'zzzzzz']
+    assert registry.aircraft_types(codes).tolist() == [
+        'B737M8', 'B737-800', 'B737-700', 'B737', 'B737-7', None, None, None
+    ]
+    assert registry.capacities(codes).tolist() == [175, 175, 143, 143, 143, 143, 143, 143]
+    assert registry.estimate_passengers(['abf123']).tolist() == [int(175 * 0.85)]
+    assert len(registry) == 5
+
+
+def test_save_and_load_round_trip(registry, tmp_path):
+    """Test that a saved registry loads with identical lookups."""
+    path = tmp_path / 'fleet_registry.npz'
+    registry.save(str(path))
+    loaded = FleetRegistry.load(str(path))
+
+    codes = ['abf123', 'abf999', 'ab0000', 'a00000', 'c0ffee', 'b00000']
+    assert loaded.aircraft_types(codes).tolist() == registry.aircraft_types(codes).tolist()
+    assert loaded.default_capacity == registry.default_capacity
+
+
+def test_csv_and_fallback(tmp_path):
+    """Test loading from CSV with seat overrides and falling back to the built-in fleet."""
+    path = tmp_path / 'fleet.csv'
+    path.write_text("icao24,aircraft_type,seats\nabf123,B737-MAX7,150\nae1,B737M8,\n")
+    registry = FleetRegistry.load_or_default(str(path))
+    assert registry.capacities(['abf123', 'ae1000']).tolist() == [150, 175]
+
+    default = FleetRegistry.load_or_default(str(tmp_path / 'missing.npz'))
+    assert default.aircraft_type('abf000') == 'B737-700'
+
+
+def test_large_registry_lookup():
+    """Test lookups against tens of thousands of exact airframes."""
+    rng = np.random.default_rng(0)
+    codes = [f"{value:06x}" for value in rng.choice(1 << 24, size=50_000, replace=False)]
+    registry = FleetRegistry.from_entries(((code, 'B737-800') for code in codes), AIRCRAFT_CAPACITY)
+
+    types = registry.aircraft_types(codes[::7])
+    assert (types == 'B737-800').all()
+    assert registry.capacities(codes[:3]).tolist() == [175, 175, 175]
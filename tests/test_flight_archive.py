@@ -0,0 +1,107 @@
+"""
+Tests for the memory-mapped flight archive.
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conftest import make_flight, write_flights
+from src.data.flight_archive import FlightArchive, build_archive, open_flights
+from src.data.flight_store import FlightStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a store over a data directory with flights on two days."""
+    jan_15 = int(datetime(2024, 1, 15, 9, 30).timestamp())
+    jan_16 = int(datetime(2024, 1, 16, 7, 0).timestamp())
+    write_flights(tmp_path / "KLAS_2024_01_flights.json", [
+        make_flight("SWA200", jan_15 + 3600),
+        make_flight("SWA100", jan_15),
+        make_flight("AAL500", jan_16),
+        make_flight("SWA100", jan_16, origin="KMDW", destination="KLAS")
+    ])
+    store = FlightStore(tmp_path, refresh_interval=0)
+    yield store
+    store.close()
+
+
+def test_archive_matches_store(store, tmp_path):
+    """Test that the archive answers the same queries as the store it was built from."""
+    archive = FlightArchive(build_archive(store), refresh_interval=0)
+
+    assert len(archive) == 3
+    assert archive.available_dates() == store.available_dates()
+    for date in store.available_dates():
+        assert archive.flights_on(date) == store.flights_on(date)
+    assert archive.find_flights("WN100") == store.find_flights("WN100")
+    assert archive.find_flights("WN100", "2024-01-16") == store.find_flights("WN100", "2024-01-16")
+    assert archive.flights_on("2023-12-31") == []
+    assert archive.find_flights("WN999") == []
+
+
+def test_lookups_are_views(store):
+    """Test that date and flight number lookups do not copy the mapped records."""
+    archive = FlightArchive(build_archive(store), refresh_interval=0)
+
+    records = archive.records_on("2024-01-15")
+    assert len(records) == 2
+    assert np.shares_memory(records, archive.records)
+    assert np.shares_memory(archive.record_positions("WN100"), archive.by_flight_number)
+    assert not records.flags.writeable
+
+
+def test_reloads_rebuilt_archive(store, tmp_path):
+    """Test that a rebuilt archive is remapped while old views stay readable."""
+    path = build_archive(store)
+    archive = FlightArchive(path, refresh_interval=0)
+    old = archive.records_on("2024-01-15")
+
+    day = int(datetime(2024, 1, 17, 8, 0).timestamp())
+    write_flights(tmp_path / "KMDW_2024_01_flights.json", [make_flight("SWA300", day, origin="KMDW")])
+    store.refresh(force=True)
+    build_archive(store, path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert archive.available_dates()[0] == "2024-01-17"
+    assert archive.version == 2
+    assert len(old) == 2
+
+
+def test_open_flights_falls_back_to_store(tmp_path):
+    """Test that the web tier uses the store until an archive is built."""
+    flights = open_flights(tmp_path)
+    assert isinstance(flights, FlightStore)
+    flights.close()
+
+    (tmp_path / "flights.archive").write_bytes(b"not an archive")
+    flights = open_flights(tmp_path)
+    assert isinstance(flights, FlightStore)
+    flights.close()
+
+
+def test_stale_archive_is_served_from_store(store, tmp_path):
+    """Test that flights collected after the build are served until the archive is rebuilt."""
+    build_archive(store)
+    flights = open_flights(tmp_path)
+    assert isinstance(flights, FlightArchive) and not flights.stale
+    flights.refresh_interval = flights.store.refresh_interval = 0
+    version = flights.version
+
+    day = int(datetime(2024, 1, 17, 8, 0).timestamp())
+    write_flights(tmp_path / "KMDW_2024_01_flights.json", [make_flight("SWA300", day, origin="KMDW")])
+
+    assert flights.available_dates()[0] == "2024-01-17"
+    assert flights.find_flights("WN300")[0]["date"] == "2024-01-17"
+    assert flights.stale and flights.version > version
+
+    store.refresh(force=True)
+    build_archive(store)
+    assert flights.refresh(force=True)
+    assert not flights.stale
+    assert flights.flights_on("2024-01-17") == store.flights_on("2024-01-17")
+    flights.store.close()
@@ -108,4 +108,23 @@ def test_collect_time_window_error_handling(collector, mock_opensky_client, db_s
     
     # Verify no database entries were created
     db_flights = db_session.query(Flight).all()
-    assert len(db_flights) == 0 
\ No newline at end of file
+    assert len(db_flights) == 0
+
+
+def test_get_flights_by_airport_partitions_once(collector, mock_opensky_client):
+    """Test that one interval download is partitioned across airports."""
+    collector.client.get_flights_in_time_range.return_value = [
+        {"callsign": "SWA100", "estDepartureAirport": "KLAS", "estArrivalAirport": "KMDW"},
+        {"callsign": "SWA200", "estDepartureAirport": "KMDW", "estArrivalAirport": "KATL"},
+        {"callsign": "AAL300", "estDepartureAirport": "KLAS", "estArrivalAirport": "KDFW"},
+        {"callsign": "SWA400", "estDepartureAirport": "KPHX", "estArrivalAirport": "KDEN"},
+    ]
+
+    start_time = datetime.now()
+    end_time = start_time + timedelta(hours=2)
+    flights = collector.get_flights_by_airport(["KLAS", "KMDW", "KBWI"], start_time, end_time)
+
+    assert collector.client.get_flights_in_time_range.call_count == 1
+    assert [f["callsign"] for f in flights["KLAS"]] == ["SWA100"]
+    assert [f["callsign"] for f in flights["KMDW"]] == ["SWA100", "SWA200"]
+    assert flights["KBWI"] == []
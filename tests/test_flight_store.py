@@ -0,0 +1,108 @@
+"""
+Tests for the indexed historical flight store.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from conftest import make_flight, write_flights
+from src.data.dataset import flight_dataset
+from src.data.flight_store import FlightStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a store over an empty data directory."""
+    store = FlightStore(tmp_path, refresh_interval=0)
+    yield store
+    store.close()
+
+
+def test_dates_and_flights(store, tmp_path):
+    """Test date listing and per-day queries."""
+    jan_15 = int(datetime(2024, 1, 15, 9, 30).timestamp())
+    jan_16 = int(datetime(2024, 1, 16, 7, 0).timestamp())
+    write_flights(tmp_path / "KLAS_2024_01_flights.json", [
+        make_flight("SWA200", jan_15 + 3600),
+        make_flight("SWA100", jan_15),
+        make_flight("AAL500", jan_16),
+        make_flight(None, jan_16),
+        make_flight("SWA300", jan_16, destination=None)
+    ])
+    write_flights(tmp_path / "KLAS_2024_01_progress.json", [{"start": "x", "end": "y"}])
+
+    assert store.available_dates() == ["2024-01-16", "2024-01-15"]
+
+    flights = store.flights_on("2024-01-15")
+    assert [f["flight_number"] for f in flights] == ["WN100", "WN200"]
+    assert flights[0]["departure_time"] == "09:30"
+    assert flights[0]["origin_airport"] == "KLAS"
+
+    # Non-Southwest flights and flights without both airports are not listed
+    assert store.flights_on("2024-01-16") == []
+    assert [f["date"] for f in store.find_flights("WN200")] == ["2024-01-15"]
+
+
+def test_incremental_refresh(store, tmp_path):
+    """Test that only changed files are re-read and removed files are dropped."""
+    day = int(datetime(2024, 1, 15, 12, 0).timestamp())
+    klas = tmp_path / "KLAS_2024_01_flights.json"
+    kmdw = tmp_path / "KMDW_2024_01_flights.json"
+    write_flights(klas, [make_flight("SWA100", day)])
+    write_flights(kmdw, [make_flight("SWA200", day, origin="KMDW")])
+
+    assert store.refresh(force=True)
+    assert not store.refresh(force=True)
+    assert len(store.flights_on("2024-01-15")) == 2
+
+    write_flights(klas, [make_flight("SWA100", day), make_flight("SWA101", day + 60)])
+    assert store.refresh(force=True)
+    assert len(store.flights_on("2024-01-15")) == 3
+
+    kmdw.unlink()
+    assert store.refresh(force=True)
+    assert [f["flight_number"] for f in store.flights_on("2024-01-15")] == ["WN100", "WN101"]
+
+
+def test_unreadable_file_keeps_previous_rows(store, tmp_path):
+    """Test that a partially written file does not wipe its indexed flights."""
+    day = int(datetime(2024, 1, 15, 12, 0).timestamp())
+    klas = tmp_path / "KLAS_2024_01_flights.json"
+    write_flights(klas, [make_flight("SWA100", day)])
+    store.refresh(force=True)
+
+    with open(klas, "w") as f:
+        f.write('[{"callsign": "SWA1')
+    store.refresh(force=True)
+    assert [f["flight_number"] for f in store.flights_on("2024-01-15")] == ["WN100"]
+
+
+def test_index_persists_between_instances(tmp_path):
+    """Test that a new store reuses the on-disk index."""
+    day = int(datetime(2024, 1, 15, 12, 0).timestamp())
+    write_flights(tmp_path / "KLAS_2024_01_flights.json", [make_flight("SWA100", day)])
+
+    first = FlightStore(tmp_path, refresh_interval=0)
+    assert first.refresh()
+    first.close()
+
+    second = FlightStore(tmp_path, refresh_interval=0)
+    assert not second.refresh()
+    assert second.available_dates() == ["2024-01-15"]
+    second.close()
+
+
+def test_indexes_dataset_partitions(store, tmp_path):
+    """Test that Parquet partitions are indexed alongside legacy JSON files."""
+    day = int(datetime(2024, 2, 3, 12, 0).timestamp())
+    dataset = flight_dataset(tmp_path)
+    dataset.write_partition([make_flight("SWA700", day), make_flight("SWA701", day + 60)], "KLAS", 2024, 2)
+    write_flights(tmp_path / "KMDW_2024_02_flights.json", [make_flight("SWA702", day + 120, origin="KMDW")])
+
+    assert store.refresh(force=True)
+    assert [f["flight_number"] for f in store.flights_on("2024-02-03")] == ["WN700", "WN701", "WN702"]
+
+    dataset.write_partition([make_flight("SWA700", day)], "KLAS", 2024, 2)
+    assert store.refresh(force=True)
+    assert [f["flight_number"] for f in store.flights_on("2024-02-03")] == ["WN700", "WN702"]
@@ -0,0 +1,111 @@
+"""
+Tests for parallel, incremental and memory-bounded training.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import JAN_1, make_training_data
+from src.data.dataset import consumption_dataset
+from src.data_processing.beverage_data_generator import BeverageDataGenerator
+from src.models.predictor import (
+    BeveragePredictor, load_training_data, main, sample_within_memory, training_row_bytes
+)
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def predictor():
+    """Small predictor so tests fit quickly."""
+    predictor = BeveragePredictor()
+    predictor.model.set_params(n_estimators=4)
+    return predictor
+
+
+def test_train_records_stats(predictor):
+    """Test that a parallel fit records its statistics and leaves prediction single-threaded."""
+    flights, targets = make_training_data(300, random_targets=True)
+    stats = predictor.train(flights, targets, n_jobs=2)
+
+    assert stats['mode'] == 'full'
+    assert (stats['rows'], stats['trees_added'], stats['n_estimators'], stats['n_jobs']) == (300, 4, 4, 2)
+    assert stats['fit_seconds'] >= 0 and stats['peak_rss_bytes'] > 0
+    assert predictor.model.n_jobs is None
+    assert predictor.trained_until == flights['timestamp'].max()
+
+
+def test_add_trees_keeps_existing_trees(predictor, tmp_path):
+    """Test that warm start grows the saved forest with trees for new data."""
+    flights, targets = make_training_data(300, random_targets=True)
+    predictor.train(flights, targets)
+    first_trees = list(predictor.model.estimators_)
+    scale = predictor.scaler.scale_.copy()
+
+    new_flights, new_targets = make_training_data(100, start=JAN_1 + 31 * DAY, seed=1, random_targets=True)
+    stats = predictor.add_trees(new_flights, new_targets, n_new_trees=3, n_jobs=2)
+
+    assert (stats['mode'], stats['trees_added'], stats['n_estimators']) == ('warm_start', 3, 7)
+    assert predictor.model.estimators_[:4] == first_trees
+    np.testing.assert_array_equal(predictor.scaler.scale_, scale)
+    assert predictor.trained_until == new_flights['timestamp'].max()
+
+    predictor.save_model(str(tmp_path / 'model.joblib'))
+    loaded = BeveragePredictor.load_model(str(tmp_path / 'model.joblib'))
+    assert loaded.trained_until == predictor.trained_until
+    assert loaded.training_stats['trees_added'] == 3
+
+
+def test_add_trees_needs_trained_model(predictor):
+    """Test that warm start refuses to run on an untrained model."""
+    flights, targets = make_training_data(10, random_targets=True)
+    with pytest.raises(ValueError):
+        predictor.add_trees(flights, targets)
+
+
+def test_sample_within_memory():
+    """Test that training rows are sampled down to the memory ceiling."""
+    flights, targets = make_training_data(1000, random_targets=True)
+    row_bytes = training_row_bytes(8, 4, n_jobs=1)
+
+    sampled, sampled_targets = sample_within_memory(flights, targets, 250 * row_bytes, 8, n_jobs=1)
+    assert len(sampled) == len(sampled_targets) == 250
+    assert sampled['timestamp'].is_monotonic_increasing
+    assert (sampled.index == sampled_targets.index).all()
+
+    unchanged, _ = sample_within_memory(flights, targets, 2000 * row_bytes, 8, n_jobs=1)
+    assert len(unchanged) == 1000
+
+
+def write_consumption(data_dir, month, n):
+    """Write n generated consumption rows for January or February 2024."""
+    start = JAN_1 + (month - 1) * 31 * DAY
+    frame = pd.DataFrame({
+        'departure': 'KLAS',
+        'arrival': 'KMDW',
+        'timestamp': start + np.arange(n) * 3600,
+        'duration': 2.0,
+        'estimated_passengers': 140
+    })
+    for items in BeverageDataGenerator.BEVERAGE_DISTRIBUTION.values():
+        for beverage in items:
+            frame[beverage] = 3
+    consumption_dataset(data_dir).write_partition(frame, 'KLAS', 2024, month)
+
+
+def test_time_window_and_incremental_main(tmp_path):
+    """Test windowed loading and growing a saved model with newly generated months."""
+    write_consumption(str(tmp_path), 1, 48)
+    flights, _ = load_training_data(str(tmp_path), window_days=1)
+    assert len(flights) == 25
+
+    model = str(tmp_path / 'model.joblib')
+    main(['--data-dir', str(tmp_path), '--model', model, '--n-jobs', '1'])
+    trees = len(BeveragePredictor.load_model(model).model.estimators_)
+
+    write_consumption(str(tmp_path), 2, 24)
+    main(['--data-dir', str(tmp_path), '--model', model, '--add-trees', '2', '--memory-limit-mb', '1'])
+    loaded = BeveragePredictor.load_model(model)
+    assert len(loaded.model.estimators_) == trees + 2
+    assert loaded.training_stats['rows'] == 24
@@ -0,0 +1,58 @@
+"""
+Tests for memory-mapped model artifacts.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.models.artifacts import load_artifact, resident_memory, save_artifact
+from src.models.predictor import BeveragePredictor
+
+
+def test_arrays_are_memory_mapped(tmp_path):
+    """Test that arrays in an artifact are mapped from the file rather than copied."""
+    path = save_artifact({'weights': np.arange(100_000, dtype=np.float64)}, tmp_path / 'model.joblib')
+
+    loaded, stats = load_artifact(path)
+    assert isinstance(loaded['weights'], np.memmap)
+    assert loaded['weights'][-1] == 99_999
+    assert stats['mmap_mode'] == 'r'
+    assert stats['file_bytes'] == path.stat().st_size
+    assert stats['rss_bytes'] > 0 and stats['seconds'] >= 0
+
+    copied, _ = load_artifact(path, mmap_mode=None)
+    assert not isinstance(copied['weights'], np.memmap)
+
+
+def test_replacing_artifact_keeps_old_mapping(tmp_path):
+    """Test that saving over an artifact leaves processes mapping the old file intact."""
+    path = save_artifact({'weights': np.zeros(1000)}, tmp_path / 'model.joblib')
+    old, _ = load_artifact(path)
+
+    save_artifact({'weights': np.ones(1000)}, path)
+    new, _ = load_artifact(path)
+    assert old['weights'].sum() == 0
+    assert new['weights'].sum() == 1000
+    assert not list(tmp_path.glob('.*.tmp'))
+
+
+def test_predictor_round_trip(tmp_path):
+    """Test that a trained predictor predicts the same after a memory-mapped load."""
+    rng = np.random.default_rng(0)
+    flights = pd.DataFrame({
+        'duration_hours': rng.uniform(1, 5, 200),
+        'passenger_count': rng.integers(100, 175, 200),
+        'timestamp': rng.integers(1704067200, 1735689600, 200),
+        'is_business_route': rng.integers(0, 2, 200),
+        'is_vacation_route': rng.integers(0, 2, 200)
+    })
+    targets = pd.DataFrame(rng.uniform(0, 50, (200, 4)))
+    predictor = BeveragePredictor()
+    predictor.model.set_params(n_estimators=5)
+    predictor.train(flights, targets)
+    predictor.save_model(str(tmp_path / 'model.joblib'))
+
+    loaded = BeveragePredictor.load_model(str(tmp_path / 'model.joblib'))
+    np.testing.assert_allclose(loaded.predict(flights), predictor.predict(flights))
+    assert loaded.load_stats['file_bytes'] > 0
+    assert resident_memory() > 0
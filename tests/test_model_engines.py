@@ -0,0 +1,90 @@
+"""
+Tests for the BeveragePredictor model engines.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import make_training_data
+from src.models.engines import HistGradientBoostingEngine, ModelEngine, RandomForestEngine, make_engine
+from src.models.predictor import BeveragePredictor
+
+
+@pytest.fixture
+def predictor():
+    """Small gradient-boosting predictor so tests fit quickly."""
+    return BeveragePredictor(engine='hist_gradient_boosting', max_iter=20)
+
+
+def test_make_engine():
+    """Test that engines are created by name and unknown names are rejected."""
+    assert isinstance(make_engine(), RandomForestEngine)
+    assert isinstance(make_engine('hist_gradient_boosting'), HistGradientBoostingEngine)
+    with pytest.raises(ValueError):
+        make_engine('xgboost')
+
+
+def test_incomplete_engine_cannot_be_created():
+    """Test that an engine missing part of the interface fails when it is created."""
+    class PredictOnlyEngine(ModelEngine):
+        name = 'predict_only'
+
+        def predict(self, X):
+            return X
+
+    with pytest.raises(TypeError):
+        PredictOnlyEngine()
+
+
+def test_hist_gradient_boosting_trains_and_predicts(predictor):
+    """Test that the gradient-boosting engine fits one model per target."""
+    flights, targets = make_training_data(400)
+    stats = predictor.train(flights, targets)
+
+    assert stats['engine'] == 'hist_gradient_boosting'
+    assert stats['n_estimators'] == 4 * 20
+    predictions = predictor.predict(flights.iloc[:10])
+    assert predictions.shape == (10, 4)
+    assert np.abs(predictions - targets.iloc[:10].to_numpy()).mean() < 5
+    assert predictor.get_feature_importance() == {}
+
+
+def test_hist_gradient_boosting_add_trees(predictor):
+    """Test that added boosting iterations fit the new data for every target."""
+    flights, targets = make_training_data(400)
+    predictor.train(flights, targets)
+    new_flights, new_targets = make_training_data(400, seed=1)
+    new_targets = new_targets * 1.2
+    error_before = np.mean((predictor.predict(new_flights) - new_targets.to_numpy()) ** 2)
+
+    stats = predictor.add_trees(new_flights, new_targets, n_new_trees=5)
+    error_after = np.mean((predictor.predict(new_flights) - new_targets.to_numpy()) ** 2)
+
+    assert stats['mode'] == 'warm_start'
+    assert predictor.engine.n_estimators == 4 * 25
+    assert error_after < error_before / 2
+
+
+def test_hist_gradient_boosting_loads_single_stage_models():
+    """Test that a list of per-target models, as saved before boosting stages, is one stage."""
+    flights, targets = make_training_data(200)
+    engine = HistGradientBoostingEngine(max_iter=5)
+    engine.fit(flights.to_numpy(dtype=float), targets.to_numpy())
+
+    loaded = HistGradientBoostingEngine(engine.model[0])
+    assert loaded.n_estimators == 4 * 5
+    np.testing.assert_allclose(loaded.predict(flights.to_numpy(dtype=float)),
+                               engine.predict(flights.to_numpy(dtype=float)))
+
+
+def test_engine_survives_save_and_load(predictor, tmp_path):
+    """Test that a saved model is loaded back with its engine."""
+    flights, targets = make_training_data(400)
+    predictor.train(flights, targets)
+    path = tmp_path / 'model.joblib'
+    predictor.save_model(str(path))
+
+    loaded = BeveragePredictor.load_model(str(path))
+
+    assert isinstance(loaded.engine, HistGradientBoostingEngine)
+    np.testing.assert_allclose(loaded.predict(flights.iloc[:5]), predictor.predict(flights.iloc[:5]))
@@ -0,0 +1,63 @@
+"""
+Tests for the collected-window interval index.
+"""
+
+from datetime import datetime, timedelta
+
+from src.data_collection.progress import ChunkIndex
+
+START = datetime(2024, 1, 1)
+
+
+def hours(n):
+    """Return the datetime n hours after the start of 2024."""
+    return START + timedelta(hours=n)
+
+
+def test_adjacent_chunks_merge():
+    """Test that contiguous chunks collapse into one interval."""
+    index = ChunkIndex()
+    for h in range(0, 24, 2):
+        index.add(hours(h), hours(h + 2))
+
+    assert list(index) == [(hours(0), hours(24))]
+    assert index.contains(hours(4), hours(6))
+    assert not index.contains(hours(22), hours(26))
+
+
+def test_out_of_order_merge():
+    """Test merging intervals added out of order and bridging a gap."""
+    index = ChunkIndex()
+    index.add(hours(10), hours(12))
+    index.add(hours(0), hours(2))
+    index.add(hours(6), hours(8))
+    assert len(index) == 3
+
+    index.add(hours(2), hours(10))
+    assert list(index) == [(hours(0), hours(12))]
+
+
+def test_missing_gaps_and_windows():
+    """Test gap discovery and alignment of missing windows."""
+    index = ChunkIndex([(hours(0), hours(4)), (hours(8), hours(9))])
+
+    assert index.missing(hours(0), hours(12)) == [(hours(4), hours(8)), (hours(9), hours(12))]
+    assert index.missing_windows(hours(0), hours(12)) == [
+        (hours(4), hours(6)),
+        (hours(6), hours(8)),
+        (hours(8), hours(10)),
+        (hours(10), hours(12))
+    ]
+    assert ChunkIndex().missing(hours(0), hours(3)) == [(hours(0), hours(3))]
+
+
+def test_serialization_round_trip():
+    """Test saving and loading the index, including the legacy chunk list."""
+    index = ChunkIndex([(hours(0), hours(2)), (hours(4), hours(6))])
+    assert list(ChunkIndex.from_list(index.to_list())) == list(index)
+
+    legacy = [
+        {'start': hours(0).isoformat(), 'end': hours(2).isoformat()},
+        {'start': hours(2).isoformat(), 'end': hours(4).isoformat()}
+    ]
+    assert list(ChunkIndex.from_chunks(legacy)) == [(hours(0), hours(4))]
@@ -0,0 +1,75 @@
+"""
+Tests for the in-process response cache.
+"""
+
+from src.api.cache import ResponseCache, file_version
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hits_and_misses():
+    """Test that repeated lookups are served from the cache and counted."""
+    cache = ResponseCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'quantity': 12}
+
+    assert cache.get_or_compute(('2024-01-15', 'WN100'), compute) == {'quantity': 12}
+    assert cache.get_or_compute(('2024-01-15', 'WN100'), compute) == {'quantity': 12}
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size'], stats['hit_rate']) == (1, 1, 1, 0.5)
+
+
+def test_entries_expire_after_ttl():
+    """Test that entries older than the TTL are recomputed."""
+    clock = FakeClock()
+    cache = ResponseCache(ttl=60, clock=clock)
+    cache.set('key', 'old')
+
+    clock.now = 59
+    assert cache.get('key') == (True, 'old')
+    clock.now = 60
+    assert cache.get('key') == (False, None)
+    assert cache.stats()['size'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test that a full cache evicts the least recently used entry."""
+    cache = ResponseCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('c') == (True, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_version_change_invalidates(tmp_path):
+    """Test that a new data version drops every cached entry."""
+    model = tmp_path / 'model.joblib'
+    model.write_bytes(b'v1')
+    cache = ResponseCache()
+    version = (1, file_version(model))
+    cache.set('a', 1, version)
+    assert cache.get('a', version) == (True, 1)
+
+    model.write_bytes(b'v2 model')
+    new_version = (1, file_version(model))
+    assert new_version != version
+    assert cache.get('a', new_version) == (False, None)
+    assert cache.stats()['invalidations'] == 1
+    assert file_version(tmp_path / 'missing') is None
@@ -0,0 +1,85 @@
+"""
+Tests for the OpenSky request budget and fetch scheduler.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.data_collection.scheduler import FetchScheduler, RequestBudget
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep moves time forward."""
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Create a fake clock."""
+    return FakeClock()
+
+
+def test_cooldown_between_requests(clock):
+    """Test that request starts are spaced by the cooldown."""
+    budget = RequestBudget(100, cooldown=10, clock=clock, sleep=clock.sleep)
+    start = clock.now
+    for _ in range(3):
+        budget.acquire()
+    assert clock.now - start == pytest.approx(20)
+    assert budget.remaining == pytest.approx(97 + 20 * 100 / 86400)
+
+
+def test_waits_for_refill_when_exhausted(clock):
+    """Test that an empty bucket waits for a token to accrue."""
+    budget = RequestBudget(24, cooldown=0, clock=clock, sleep=clock.sleep)
+    for _ in range(24):
+        budget.acquire()
+    assert budget.try_acquire() == pytest.approx(3600)
+
+    start = clock.now
+    budget.acquire()
+    assert clock.now - start == pytest.approx(3600)
+
+
+def test_budget_persists_across_restarts(clock, tmp_path):
+    """Test that a restarted budget resumes from its saved state."""
+    state_file = tmp_path / '.request_budget.json'
+    budget = RequestBudget(24, cooldown=5, state_file=state_file, clock=clock, sleep=clock.sleep)
+    for _ in range(20):
+        budget.acquire()
+
+    clock.now += 2 * 3600
+    restarted = RequestBudget(24, cooldown=5, state_file=state_file, clock=clock, sleep=clock.sleep)
+    assert restarted.remaining == pytest.approx(4 + 2 + 95 * 24 / 86400)
+
+
+def test_scheduler_runs_windows_by_priority():
+    """Test that windows are fetched concurrently in priority order."""
+    start = datetime(2024, 1, 1)
+    windows = [(start + timedelta(hours=2 * i), start + timedelta(hours=2 * i + 2)) for i in range(6)]
+    started = []
+    lock = threading.Lock()
+
+    def fetch(window_start, window_end):
+        with lock:
+            started.append(window_start)
+        return window_start.hour
+
+    scheduler = FetchScheduler(RequestBudget(cooldown=0), workers=1)
+    results = dict(scheduler.run(windows, fetch, priority=lambda window: -window[0].hour))
+
+    assert started == [window[0] for window in reversed(windows)]
+    assert results == {window: window[0].hour for window in windows}
+
+    results = dict(FetchScheduler(RequestBudget(cooldown=0), workers=4).run(windows, fetch))
+    assert len(results) == 6
@@ -0,0 +1,80 @@
+"""
+Tests for the vectorized synthetic training data generator.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.models.predictor import CATEGORY_MODEL_PATH, BeveragePredictor
+from train_initial_model import SEEDED_BASE_TIMESTAMP, generate_training_data, main
+
+FLIGHT_COLUMNS = [
+    'flight_number', 'timestamp', 'duration_hours', 'passenger_count', 'is_business_route',
+    'is_vacation_route', 'is_holiday', 'origin_airport', 'destination_airport'
+]
+
+
+def test_columns_and_flight_attributes():
+    """Test the flight columns and the ranges of the drawn attributes."""
+    data = generate_training_data(2000, seed=0)
+
+    assert list(data.columns[:len(FLIGHT_COLUMNS)]) == FLIGHT_COLUMNS
+    assert len(data.columns) == len(FLIGHT_COLUMNS) + 21
+    assert data['flight_number'].iloc[[0, -1]].tolist() == ['SWA1000', 'SWA2999']
+    assert (np.diff(data['timestamp']) == 3600).all()
+    assert set(data['duration_hours']) == {1.5, 2.5, 3.5, 4.5}
+    assert data['passenger_count'].between(100, 179).all()
+    assert not (data['is_business_route'] & data['is_vacation_route']).any()
+
+
+def test_seed_reproduces_data():
+    """Test that a seed reproduces the same flights, timestamps and consumption."""
+    first = generate_training_data(500, seed=7)
+    second = generate_training_data(500, seed=7)
+    other = generate_training_data(500, seed=8)
+
+    assert first.equals(second)
+    assert not first.equals(other)
+    assert first['timestamp'].iloc[0] == SEEDED_BASE_TIMESTAMP
+
+
+def test_base_timestamp():
+    """Test that the first flight departs at the given base timestamp."""
+    data = generate_training_data(10, seed=7, base_timestamp=1700000000)
+
+    assert data['timestamp'].iloc[0] == 1700000000
+    assert data.drop(columns='timestamp').equals(generate_training_data(10, seed=7).drop(columns='timestamp'))
+
+
+def test_cli_writes_data_and_trains_model(tmp_path):
+    """Test that the CLI writes the generated data and trains a per-category model on it."""
+    output = tmp_path / 'flights.csv'
+    model = tmp_path / 'model.joblib'
+    main(['--samples', '200', '--seed', '3', '--output', str(output), '--model', str(model)])
+
+    pd.testing.assert_frame_equal(pd.read_csv(output), generate_training_data(200, seed=3), check_dtype=False)
+    predictor = BeveragePredictor.load_model(str(model))
+    assert predictor.predict(generate_training_data(5, seed=4)).shape == (5, 4)
+
+
+def test_consumption_follows_route_ratios():
+    """Test that beverage amounts scale with passengers and follow the route type ratios."""
+    data = generate_training_data(20000, seed=1)
+    business = data['is_business_route'] == 1
+
+    # Business routes drink more coffee and less hot cocoa (0.60/0.10 vs 0.50/0.20)
+    assert data.loc[business, 'coffee'].mean() > data.loc[~business, 'coffee'].mean()
+    assert data.loc[business, 'hot_cocoa'].mean() < data.loc[~business, 'hot_cocoa'].mean()
+
+    # Upper bound on coffee: 1.2 drinks/passenger, holiday uplift, noise, 20% hot, 60% coffee
+    upper = data['passenger_count'] * 1.2 * 1.15 * 1.1 * 0.20 * 0.60 * 1.1
+    assert (data['coffee'] >= 0).all() and (data['coffee'] <= upper).all()
+
+
+def test_cli_leaves_the_menu_predictor_alone(tmp_path, monkeypatch):
+    """Test that the default model path is the category model, not the web app's menu predictor."""
+    monkeypatch.chdir(tmp_path)
+    main(['--samples', '200', '--seed', '3'])
+
+    assert (tmp_path / CATEGORY_MODEL_PATH).exists()
+    assert not (tmp_path / 'models' / 'beverage_predictor.joblib').exists()
@@ -0,0 +1,145 @@
+"""
+Tests for building and training on out-of-core training shards.
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.dataset import consumption_dataset
+from src.data.weather_collector import WEATHER_COLUMNS, WeatherCollector
+from src.data_processing.beverage_data_generator import BeverageDataGenerator
+from src.models.predictor import BeveragePredictor, FeaturePipeline, load_training_data
+from src.models.training_shards import TrainingShards, build_training_shards, legacy_consumption_files
+
+JAN_1 = 1704067200
+BEVERAGES = [beverage for items in BeverageDataGenerator.BEVERAGE_DISTRIBUTION.values() for beverage in items]
+
+
+def make_consumption(n, start, departure='KLAS', seed=0):
+    """Consumption rows one hour apart with every beverage column."""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'flight_number': [f'SWA{i}' for i in range(n)],
+        'departure': departure,
+        'arrival': 'KMDW',
+        'timestamp': start + np.arange(n) * 3600,
+        'duration': rng.uniform(1, 5, n),
+        'estimated_passengers': rng.integers(100, 175, n)
+    })
+    for beverage in BEVERAGES:
+        frame[beverage] = rng.integers(0, 20, n)
+    return frame
+
+
+def write_legacy(data_dir, name, frame):
+    """Write consumption rows as a legacy JSON file with nested consumption."""
+    records = [
+        {**{k: v for k, v in row.items() if k not in BEVERAGES}, 'consumption': {b: row[b] for b in BEVERAGES}}
+        for row in json.loads(frame.to_json(orient='records'))
+    ]
+    path = data_dir / 'consumption' / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps(records))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Consumption dataset with two partitions plus legacy JSON files."""
+    dataset = consumption_dataset(tmp_path)
+    dataset.write_partition(make_consumption(60, JAN_1), 'KLAS', 2024, 1)
+    dataset.write_partition(make_consumption(40, JAN_1 + 31 * 86400, seed=1), 'KLAS', 2024, 2)
+    write_legacy(tmp_path, 'KMDW_2024_01_consumption.json', make_consumption(30, JAN_1, 'KMDW', seed=2))
+    # Superseded by the KLAS 2024-01 partition
+    write_legacy(tmp_path, 'KLAS_2024_01_consumption.json', make_consumption(5, JAN_1, seed=3))
+    return tmp_path
+
+
+def test_legacy_files_superseded_by_partitions_are_skipped(data_dir):
+    """Test that only JSON files without a matching partition are used."""
+    assert [path.name for path in legacy_consumption_files(data_dir)] == ['KMDW_2024_01_consumption.json']
+    assert legacy_consumption_files(data_dir, airports=['KLAS']) == []
+
+
+def test_build_writes_fixed_size_shards(data_dir, tmp_path):
+    """Test that shards hold every row in order, in fixed-size pieces."""
+    shards = build_training_shards(data_dir, tmp_path / 'shards', shard_rows=45, chunk_rows=25)
+
+    assert [shard['rows'] for shard in shards.manifest['shards']] == [45, 45, 40]
+    assert shards.rows == 130
+    assert shards.max_timestamp == JAN_1 + 31 * 86400 + 39 * 3600
+    assert shards.target_columns == list(BeverageDataGenerator.BEVERAGE_DISTRIBUTION)
+
+    X = np.concatenate([X for X, _ in shards])
+    y = np.concatenate([y for _, y in shards])
+    flight_data, consumption_data = load_training_data(str(data_dir))
+    np.testing.assert_array_equal(X[:100], FeaturePipeline(shards.feature_columns).transform(flight_data))
+    np.testing.assert_array_equal(y[:100], consumption_data.to_numpy())
+    assert X.dtype == np.float32 and y.dtype == np.float64
+
+
+def test_rebuild_writes_a_new_build(data_dir, tmp_path):
+    """Test that a rebuild leaves the previous build intact and removes older ones."""
+    first = build_training_shards(data_dir, tmp_path / 'shards', shard_rows=20)
+    second = build_training_shards(data_dir, tmp_path / 'shards', shard_rows=30)
+    X, _ = first.load(0)
+    assert len(X) == 20
+
+    shards = build_training_shards(data_dir, tmp_path / 'shards', shard_rows=1000)
+
+    assert len(shards) == 1
+    assert len(TrainingShards(tmp_path / 'shards')) == 1
+    current = (shards.root / shards.manifest['shards'][0]['file']).parent
+    previous = (second.root / second.manifest['shards'][0]['file']).parent
+    assert sorted(path.name for path in current.iterdir()) == ['shard-00000.npz']
+    assert set((tmp_path / 'shards').glob('build-*')) == {current, previous}
+
+
+def test_build_joins_departure_weather(data_dir, tmp_path, monkeypatch):
+    """Test that departure weather is added as features, NaN where unknown."""
+    monkeypatch.chdir(tmp_path)
+    collector = WeatherCollector()
+    hours = pd.date_range(datetime(2024, 1, 1), periods=24 * 31, freq='h')
+    pd.DataFrame({
+        'timestamp': hours, 'temperature': np.arange(len(hours), dtype=float),
+        'precipitation': 0.0, 'cloudcover': 50.0, 'windspeed': 5.0, 'airport': 'KLAS'
+    }).to_csv(collector.get_cached_filename('KLAS', datetime(2024, 1, 1)), index=False)
+    # Stop the collector from fetching the months without a cache file
+    monkeypatch.setattr(collector, 'fetch_historical_weather', lambda *args: None)
+
+    shards = build_training_shards(data_dir, tmp_path / 'shards', weather=collector)
+
+    assert shards.feature_columns[-len(WEATHER_COLUMNS):] == WEATHER_COLUMNS
+    X, _ = shards.load(0)
+    temperature = X[:, shards.feature_columns.index('temperature')]
+    np.testing.assert_array_equal(temperature[:60], np.arange(60))
+    assert np.isnan(temperature[60:]).all()
+
+
+def test_train_shards(data_dir, tmp_path):
+    """Test that each shard adds trees and the model predicts with the shard features."""
+    shards = build_training_shards(data_dir, tmp_path / 'shards', shard_rows=45)
+    predictor = BeveragePredictor()
+    stats = predictor.train_shards(shards, trees_per_shard=3, n_jobs=1)
+
+    assert (stats['mode'], stats['shards'], stats['rows']) == ('shards', 3, 130)
+    assert predictor.engine.n_estimators == 9
+    assert predictor.trained_until == shards.max_timestamp
+    flight_data, _ = load_training_data(str(data_dir))
+    assert predictor.predict(flight_data.iloc[:5]).shape == (5, 4)
+
+    with pytest.raises(ValueError):
+        predictor.train_shards(shards)
+
+
+def test_train_shards_gradient_boosting(data_dir, tmp_path):
+    """Test that the gradient-boosting engine adds a boosting stage for every shard."""
+    shards = build_training_shards(data_dir, tmp_path / 'shards', shard_rows=45)
+    predictor = BeveragePredictor(engine='hist_gradient_boosting')
+    predictor.train_shards(shards, trees_per_shard=5)
+
+    assert len(predictor.engine.model) == 3
+    assert predictor.engine.n_estimators == 4 * 15
@@ -0,0 +1,99 @@
+"""
+Tests for the in-memory weather index of the Open-Meteo collector.
+"""
+
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.weather_collector import WEATHER_COLUMNS, WeatherCollector
+
+
+def write_month(collector, airport, month_start, hours):
+    """Write a cached month of hourly weather whose temperature is the hour index."""
+    timestamps = pd.date_range(month_start, periods=hours, freq='h')
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        'temperature': np.arange(hours, dtype=float),
+        'precipitation': 0.0,
+        'cloudcover': 50.0,
+        'windspeed': 5.0,
+        'airport': airport
+    })
+    # Shuffle rows to check the index does not rely on file order
+    df.sample(frac=1, random_state=0).to_csv(
+        collector.get_cached_filename(airport, month_start), index=False
+    )
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    """Create a collector with a cache directory under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    collector = WeatherCollector(max_cached_months=2)
+    write_month(collector, 'KLAS', datetime(2024, 1, 1), 24 * 31)
+    write_month(collector, 'KMDW', datetime(2024, 1, 1), 24 * 31)
+    write_month(collector, 'KLAS', datetime(2024, 2, 1), 24 * 29)
+    return collector
+
+
+def test_nearest_hour_lookup(collector):
+    """Test nearest-hour lookup, including ties and the ends of the month."""
+    weather = collector.get_weather_data('KLAS', datetime(2024, 1, 2, 5, 20))
+    assert weather['temperature'] == 29.0
+    assert set(weather) == set(WEATHER_COLUMNS)
+
+    assert collector.get_weather_data('KLAS', datetime(2024, 1, 2, 5, 30))['temperature'] == 29.0
+    assert collector.get_weather_data('KLAS', datetime(2024, 1, 2, 5, 31))['temperature'] == 30.0
+    assert collector.get_weather_data('KLAS', datetime(2024, 1, 31, 23, 59))['temperature'] == 743.0
+
+
+def test_month_is_read_once_and_evicted(collector):
+    """Test that each airport-month is loaded once and the LRU bound holds."""
+    with patch('src.data.weather_collector.pd.read_csv', wraps=pd.read_csv) as read_csv:
+        for hour in range(5):
+            collector.get_weather_data('KLAS', datetime(2024, 1, 3, hour))
+        assert read_csv.call_count == 1
+
+        collector.get_weather_data('KMDW', datetime(2024, 1, 3))
+        collector.get_weather_data('KLAS', datetime(2024, 1, 3))
+        collector.get_weather_data('KLAS', datetime(2024, 2, 3))
+        assert read_csv.call_count == 3
+        assert list(collector._months) == [('KLAS', '202401'), ('KLAS', '202402')]
+
+
+def test_batch_matches_single_lookups(collector):
+    """Test that the batch API agrees with single lookups and keeps input order."""
+    airports = ['KLAS', 'KMDW', 'KLAS', 'KLAS', 'KDEN']
+    timestamps = [
+        datetime(2024, 1, 2, 5, 20),
+        datetime(2024, 1, 10, 12, 45),
+        datetime(2024, 2, 1, 0, 10),
+        datetime(2024, 1, 2, 5, 30),
+        datetime(2024, 1, 2, 5, 30)
+    ]
+    with patch.object(collector, 'fetch_historical_weather', return_value=None):
+        batch = collector.get_weather_batch(airports, timestamps)
+
+    assert list(batch.columns) == WEATHER_COLUMNS
+    for i, (airport, timestamp) in enumerate(zip(airports[:4], timestamps[:4])):
+        expected = collector.get_weather_data(airport, timestamp)
+        assert batch.iloc[i].to_dict() == expected
+    assert batch.iloc[4].isna().all()
+
+
+def test_failed_month_is_retried_after_ttl(collector):
+    """Test that a failed fetch is not retried at once but is retried once its TTL expires."""
+    with patch.object(collector, 'fetch_historical_weather', return_value=None) as fetch:
+        assert collector.get_weather_data('KLAS', datetime(2024, 3, 5)) == {}
+        assert collector.get_weather_data('KLAS', datetime(2024, 3, 6)) == {}
+        assert fetch.call_count == 1
+
+        with patch('src.data.weather_collector.time.monotonic', return_value=time.monotonic() + 301):
+            collector.get_weather_data('KLAS', datetime(2024, 3, 7))
+        assert fetch.call_count == 2
+    assert ('KLAS', '202403') not in collector._months
@@ -1,121 +1,163 @@
 import pandas as pd
 import numpy as np
-from src.models.beverage_predictor import BeveragePredictor
-from datetime import datetime, timedelta
+from src.models.predictor import CATEGORY_MODEL_PATH, BeveragePredictor
+from datetime import datetime
+import argparse
 import logging
 import os
 
 logging.basicConfig(level=logging.INFO)
 
-def generate_training_data(num_samples=1000):
-    """Generate synthetic training data with realistic patterns"""
-    base_time = datetime.now()
-    flights = []
-    
-    # Define consumption ratios for different conditions
-    consumption_ratios = {
-        'business_route': {
-            'soft_drinks': {'coca_cola': 0.25, 'diet_coke': 0.30, 'sprite': 0.15, 
-                          'dr_pepper': 0.15, 'ginger_ale': 0.15},
-            'hot_beverages': {'coffee': 0.60, 'hot_tea': 0.30, 'hot_cocoa': 0.10},
-            'water_juice': {'bottled_water': 0.40, 'orange_juice': 0.25, 
-                          'cranberry_apple_juice': 0.20, 'tomato_juice': 0.15},
-            'alcoholic': {'miller_lite': 0.20, 'dos_equis': 0.15, 'red_wine': 0.08, 
-                         'white_wine': 0.07, 'jack_daniels': 0.15, 'crown_royal': 0.10,
-                         'bacardi_rum': 0.10, 'titos_vodka': 0.10, 'baileys': 0.05}
-        },
-        'vacation_route': {
-            'soft_drinks': {'coca_cola': 0.30, 'diet_coke': 0.20, 'sprite': 0.20, 
-                          'dr_pepper': 0.15, 'ginger_ale': 0.15},
-            'hot_beverages': {'coffee': 0.50, 'hot_tea': 0.30, 'hot_cocoa': 0.20},
-            'water_juice': {'bottled_water': 0.35, 'orange_juice': 0.30, 
-                          'cranberry_apple_juice': 0.20, 'tomato_juice': 0.15},
-            'alcoholic': {'miller_lite': 0.20, 'dos_equis': 0.15, 'red_wine': 0.08, 
-                         'white_wine': 0.07, 'jack_daniels': 0.15, 'crown_royal': 0.10,
-                         'bacardi_rum': 0.10, 'titos_vodka': 0.10, 'baileys': 0.05}
-        }
+# Share of each beverage within its category, per route type
+CONSUMPTION_RATIOS = {
+    'business_route': {
+        'soft_drinks': {'coca_cola': 0.25, 'diet_coke': 0.30, 'sprite': 0.15, 
+                      'dr_pepper': 0.15, 'ginger_ale': 0.15},
+        'hot_beverages': {'coffee': 0.60, 'hot_tea': 0.30, 'hot_cocoa': 0.10},
+        'water_juice': {'bottled_water': 0.40, 'orange_juice': 0.25, 
+                      'cranberry_apple_juice': 0.20, 'tomato_juice': 0.15},
+        'alcoholic': {'miller_lite': 0.20, 'dos_equis': 0.15, 'red_wine': 0.08, 
+                     'white_wine': 0.07, 'jack_daniels': 0.15, 'crown_royal': 0.10,
+                     'bacardi_rum': 0.10, 'titos_vodka': 0.10, 'baileys': 0.05}
+    },
+    'vacation_route': {
+        'soft_drinks': {'coca_cola': 0.30, 'diet_coke': 0.20, 'sprite': 0.20, 
+                      'dr_pepper': 0.15, 'ginger_ale': 0.15},
+        'hot_beverages': {'coffee': 0.50, 'hot_tea': 0.30, 'hot_cocoa': 0.20},
+        'water_juice': {'bottled_water': 0.35, 'orange_juice': 0.30, 
+                      'cranberry_apple_juice': 0.20, 'tomato_juice': 0.15},
+        'alcoholic': {'miller_lite': 0.20, 'dos_equis': 0.15, 'red_wine': 0.08, 
+                     'white_wine': 0.07, 'jack_daniels': 0.15, 'crown_royal': 0.10,
+                     'bacardi_rum': 0.10, 'titos_vodka': 0.10, 'baileys': 0.05}
     }
+}
+
+CATEGORY_SHARES = {
+    'soft_drinks': 0.40,
+    'hot_beverages': 0.20,
+    'water_juice': 0.25,
+    'alcoholic': 0.15
+}
+
+# First flight of seeded data, so a seed reproduces the timestamps too (2024-01-01 UTC)
+SEEDED_BASE_TIMESTAMP = 1704067200
+
+def generate_training_data(num_samples=1000, seed=None, base_timestamp=None):
+    """
+    Generate synthetic training data with realistic patterns.
     
-    for i in range(num_samples):
-        # Generate flight characteristics
-        duration = np.random.choice([1.5, 2.5, 3.5, 4.5])
-        passengers = np.random.randint(100, 180)
-        is_business = np.random.choice([0, 1])
-        is_vacation = 0 if is_business else np.random.choice([0, 1])
-        is_holiday = np.random.choice([0, 1])
-        
-        # Base consumption rates per passenger
-        base_rate = {
-            1.5: 0.5,  # Short flights
-            2.5: 0.8,  # Medium-short flights
-            3.5: 1.0,  # Medium-long flights
-            4.5: 1.2   # Long flights
-        }[duration]
-        
-        # Generate beverage consumption
-        route_type = 'business_route' if is_business else 'vacation_route'
-        ratios = consumption_ratios[route_type]
-        
-        flight_data = {
-            'flight_number': f'SWA{1000+i}',
-            'timestamp': int((base_time + timedelta(hours=i)).timestamp()),
-            'duration_hours': duration,
-            'passenger_count': passengers,
-            'is_business_route': is_business,
-            'is_vacation_route': is_vacation,
-            'is_holiday': is_holiday,
-            'origin_airport': 'KMDW',
-            'destination_airport': 'KLAS'
-        }
-        
-        # Calculate consumption for each beverage type
-        total_drinks = base_rate * passengers
-        
-        # Add noise to make data more realistic
-        noise_factor = np.random.uniform(0.9, 1.1)
-        total_drinks *= noise_factor
-        
-        # Adjust for holiday
-        if is_holiday:
-            total_drinks *= 1.15
-        
-        # Calculate consumption for each beverage
-        for category, beverages in ratios.items():
-            category_total = total_drinks * {
-                'soft_drinks': 0.40,
-                'hot_beverages': 0.20,
-                'water_juice': 0.25,
-                'alcoholic': 0.15
-            }[category]
-            
-            for beverage, ratio in beverages.items():
-                # Add some randomness to individual beverage amounts
-                amount = int(category_total * ratio * np.random.uniform(0.9, 1.1))
-                flight_data[beverage] = amount
+    All flight attributes and per-beverage noise are drawn as arrays in one
+    pass, so millions of rows take seconds.
+    
+    Args:
+        num_samples: Number of flights to generate
+        seed: Seed for the random generator (None for fresh randomness)
+        base_timestamp: Unix time of the first flight; defaults to the current time,
+            or to ``SEEDED_BASE_TIMESTAMP`` when seeded so the output is reproducible
         
-        flights.append(flight_data)
+    Returns:
+        DataFrame with one row per flight and one integer column per beverage
+    """
+    rng = np.random.default_rng(seed)
+    if base_timestamp is None:
+        base_timestamp = SEEDED_BASE_TIMESTAMP if seed is not None else int(datetime.now().timestamp())
     
-    return pd.DataFrame(flights)
+    # Generate flight characteristics
+    durations = np.array([1.5, 2.5, 3.5, 4.5])
+    base_rates = np.array([0.5, 0.8, 1.0, 1.2])  # Short to long flights
+    duration_index = rng.integers(0, len(durations), num_samples)
+    passengers = rng.integers(100, 180, num_samples)
+    is_business = rng.integers(0, 2, num_samples)
+    is_vacation = np.where(is_business == 1, 0, rng.integers(0, 2, num_samples))
+    is_holiday = rng.integers(0, 2, num_samples)
+    
+    # Total drinks per flight, with noise and the holiday uplift
+    total_drinks = base_rates[duration_index] * passengers * rng.uniform(0.9, 1.1, num_samples)
+    total_drinks = np.where(is_holiday == 1, total_drinks * 1.15, total_drinks)
+    
+    # Share of the total drinks for each beverage, one row per route type
+    beverages = [
+        (category, beverage)
+        for category, items in CONSUMPTION_RATIOS['business_route'].items()
+        for beverage in items
+    ]
+    shares = np.array([
+        [CATEGORY_SHARES[category] * CONSUMPTION_RATIOS[route_type][category][beverage]
+         for category, beverage in beverages]
+        for route_type in ('vacation_route', 'business_route')
+    ])
+    
+    # Add some randomness to individual beverage amounts. Beverages are drawn one
+    # column at a time into a column-major block, so memory stays near the output size.
+    amounts = np.empty((num_samples, len(beverages)), dtype=np.int32, order='F')
+    for i in range(len(beverages)):
+        amounts[:, i] = total_drinks * shares[is_business, i] * rng.uniform(0.9, 1.1, num_samples)
+    
+    data = pd.DataFrame(amounts, columns=[beverage for _, beverage in beverages], copy=False)
+    flight_columns = {
+        'flight_number': 'SWA' + pd.Series(np.arange(1000, 1000 + num_samples)).astype(str),
+        'timestamp': base_timestamp + np.arange(num_samples, dtype=np.int64) * 3600,
+        'duration_hours': durations[duration_index],
+        'passenger_count': passengers,
+        'is_business_route': is_business,
+        'is_vacation_route': is_vacation,
+        'is_holiday': is_holiday,
+        'origin_airport': 'KMDW',
+        'destination_airport': 'KLAS'
+    }
+    for position, (name, values) in enumerate(flight_columns.items()):
+        data.insert(position, name, values)
+    
+    return data
 
-def main():
-    # Create models directory if it doesn't exist
-    os.makedirs('models', exist_ok=True)
+def category_totals(data):
+    """
+    Sum generated beverage amounts per category.
+    
+    Args:
+        data: Output of ``generate_training_data``
+        
+    Returns:
+        DataFrame with one column per beverage category, the targets of
+        ``src.models.predictor.BeveragePredictor``
+    """
+    return pd.DataFrame({
+        category: data[list(items)].sum(axis=1)
+        for category, items in CONSUMPTION_RATIOS['business_route'].items()
+    })
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic flights and train the beverage predictor on them")
+    parser.add_argument('--samples', type=int, default=1000, help="Number of synthetic flights")
+    parser.add_argument('--seed', type=int, help="Seed for reproducible data")
+    parser.add_argument('--output', help="Also write the generated data to this .csv or .parquet file")
+    parser.add_argument('--model', default=CATEGORY_MODEL_PATH,
+                        help="Category model path (the web app's menu predictor is left alone)")
+    parser.add_argument('--no-train', action='store_true', help="Only generate the data")
+    args = parser.parse_args(argv)
     
     # Generate training data
     logging.info("Generating training data...")
-    training_data = generate_training_data(num_samples=1000)
+    training_data = generate_training_data(num_samples=args.samples, seed=args.seed)
     
-    # Initialize and train the model
-    logging.info("Initializing beverage predictor...")
-    predictor = BeveragePredictor()
+    if args.output:
+        logging.info(f"Writing {len(training_data)} flights to {args.output}")
+        if args.output.endswith('.parquet'):
+            training_data.to_parquet(args.output, index=False)
+        else:
+            training_data.to_csv(args.output, index=False)
+    if args.no_train:
+        return
     
+    # Train the per-category model on the summed beverage amounts
     logging.info("Training model...")
-    predictor.train(training_data)
+    predictor = BeveragePredictor()
+    predictor.train(training_data, category_totals(training_data))
     
     # Save the model
-    model_path = 'models/beverage_predictor.joblib'
-    logging.info(f"Saving model to {model_path}")
-    predictor.save_model(model_path)
+    logging.info(f"Saving model to {args.model}")
+    os.makedirs(os.path.dirname(args.model) or '.', exist_ok=True)
+    predictor.save_model(args.model)
     
     # Test predictions
     test_flights = pd.DataFrame({
@@ -130,15 +172,12 @@ def main():
         'destination_airport': ['KLAS', 'KMCO', 'KATL']
     })
     
-    logging.info("\nTesting predictions for sample flights:")
+    logging.info("Testing predictions for sample flights:")
     predictions = predictor.predict(test_flights)
-    for i, pred_str in enumerate(predictions):
-        logging.info(f"\nFlight {test_flights.iloc[i]['flight_number']} predictions:")
-        pred = eval(pred_str)  # Convert string to dict
-        for category, beverages in pred.items():
-            logging.info(f"\n{category}:")
-            for beverage, amount in beverages.items():
-                logging.info(f"  {beverage}: {amount}")
+    for flight_number, prediction in zip(test_flights['flight_number'], predictions):
+        logging.info(f"Flight {flight_number} predictions:")
+        for category, amount in zip(CATEGORY_SHARES, prediction):
+            logging.info(f"  {category}: {amount:.0f}")
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()